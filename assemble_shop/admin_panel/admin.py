@@ -1,9 +1,12 @@
 from django.contrib import admin
 
+from assemble_shop.base.transactions import read_only_view
+
 from .utils import get_extra_context
 
 
 class CustomAdminPanelSite(admin.AdminSite):
+    @read_only_view
     def index(self, request, extra_context=None):
         extra_context = get_extra_context(request, extra_context)
         return super().index(request, extra_context)
@@ -1,10 +1,11 @@
 from dateutil.relativedelta import relativedelta  # type: ignore
-from django.db.models import Count, Sum
+from django.db.models import Count, F, Sum
 from django.db.models.functions import TruncMonth
 from django.utils import timezone
 
+from assemble_shop.base.routers import get_read_replica
 from assemble_shop.orders.enums import OrderStatusEnum
-from assemble_shop.orders.models import Order, Product
+from assemble_shop.orders.models import Order, Product, TopCustomer
 
 
 def get_past_date(month):
@@ -22,7 +23,7 @@ def get_label_months():
 
 
 def get_order_data():
-    orders = Order.objects.filter(
+    orders = Order.objects.using(get_read_replica()).filter(
         created_at__gte=get_past_date(month=4),
         status=OrderStatusEnum.COMPLETED.name,
     )
@@ -44,20 +45,16 @@ def get_order_data():
 
 
 def top_products():
-    return Product.objects.filter(
-        rating__isnull=False, inventory__gte=0
-    ).order_by("-rating")[:5]
+    return (
+        Product.objects.using(get_read_replica())
+        .filter(rating_leaderboard__isnull=False)
+        .order_by("rating_leaderboard__rank")[:5]
+    )
 
 
 def top_customers():
-    return (
-        Order.objects.filter(
-            created_at__gte=get_past_date(month=0),
-            status=OrderStatusEnum.COMPLETED.name,
-        )
-        .values("created_by__email")
-        .annotate(total_cost=Sum("total_price"))
-        .order_by("-total_cost")
+    return TopCustomer.objects.using(get_read_replica()).values(
+        "income", email=F("customer__email")
     )[:5]
 
 
@@ -1,9 +1,89 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+PER_PAGE_VAR = "per_page"
+
+
+def get_estimated_count(model, using) -> int:
+    """
+    Returns the planner's estimate of the rows of a model's table, kept up
+    to date by autovacuum. It is -1 for tables that were never analyzed.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts unfiltered change lists of large tables from pg_class instead of
+    COUNT(*), which reads the whole table. Filtered lists are counted.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if (
+            isinstance(queryset, QuerySet)
+            and not queryset.query.where
+            and not queryset.query.combinator
+        ):
+            estimate = get_estimated_count(queryset.model, queryset.db)
+            if estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class BaseChangeList(ChangeList):
+    """
+    Change list taking its page size from the per_page query parameter and
+    loading only the list_only_fields of the model admin.
+    """
+
+    model_admin: "BaseAdmin"
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(PER_PAGE_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        try:
+            per_page = int(request.GET.get(PER_PAGE_VAR, ""))
+        except ValueError:
+            per_page = None
+        if per_page in settings.ADMIN_LIST_PER_PAGE_CHOICES:
+            self.list_per_page = per_page
+        super().get_results(request)
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        if self.model_admin.list_only_fields:
+            queryset = queryset.only(*self.model_admin.list_only_fields)
+        return queryset
 
 
 class BaseAdmin(admin.ModelAdmin):
     readonly_fields = ("created_by", "updated_by", "created_at", "updated_at")
-    list_per_page = 10
+    list_per_page = settings.ADMIN_LIST_PER_PAGE
+    # Fields of the change list rows, the other fields are deferred.
+    list_only_fields: tuple[str, ...] = ()
+    paginator = EstimatedCountPaginator
+    # Filtered change lists would count the whole table again for the
+    # "(n total)" link.
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return BaseChangeList
 
     def save_model(self, request, obj, form, change) -> None:
         if not change:
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BaseConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "assemble_shop.base"
+
+    def ready(self):
+        try:
+            import assemble_shop.base.signals  # noqa F401
+        except ImportError:
+            pass
@@ -0,0 +1,135 @@
+"""
+PostgreSQL backend that checks connections out of a psycopg_pool pool.
+
+Enabled with OPTIONS["pool"], a dict of ConnectionPool arguments (min_size,
+max_size, timeout, max_idle, max_lifetime...). Django closes connections at
+the end of every request and Celery task, which returns them to the pool of
+the process instead of closing the socket. CONN_HEALTH_CHECKS makes the pool
+check a connection before handing it out.
+"""
+
+import logging
+import os
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Pool statistics are logged at most once per interval by every process.
+POOL_STATS_INTERVAL = 60
+# Waits longer than this are logged on their own.
+POOL_SLOW_WAIT = 0.5
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    _connection_pools: dict[str, ConnectionPool] = {}
+    _pool_stats_logged_at: dict[str, float] = {}
+
+    @property
+    def pool(self) -> ConnectionPool | None:
+        pool_options = self.settings_dict["OPTIONS"].get("pool")
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+
+        if self.alias not in self._connection_pools:
+            if self.settings_dict["CONN_MAX_AGE"] != 0:
+                raise ImproperlyConfigured(
+                    "Pooled connections can't be persistent, "
+                    "set CONN_MAX_AGE to 0."
+                )
+            connect_kwargs = self.get_connection_params()
+            # Django sets the autocommit mode after checkout.
+            connect_kwargs["autocommit"] = True
+            pool = ConnectionPool(
+                name=self.alias,
+                kwargs=connect_kwargs,
+                open=False,
+                check=(
+                    ConnectionPool.check_connection
+                    if self.settings_dict["CONN_HEALTH_CHECKS"]
+                    else None
+                ),
+                **({} if pool_options is True else pool_options),
+            )
+            # Threads racing at startup may build several pools, the first
+            # one stored wins and the others are never opened.
+            self._connection_pools.setdefault(self.alias, pool)
+        return self._connection_pools[self.alias]
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        # Django 5.0 passes unknown OPTIONS on to psycopg.connect().
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        try:
+            self.isolation_level = IsolationLevel(
+                isolation_level
+                if isolation_level is not None
+                else IsolationLevel.READ_COMMITTED
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Invalid transaction isolation level {isolation_level} "
+                f"specified. Use one of the psycopg.IsolationLevel values."
+            )
+
+        pool.open()
+        started_at = time.monotonic()
+        connection = pool.getconn()
+        self.log_pool_wait(pool, time.monotonic() - started_at)
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def log_pool_wait(self, pool: ConnectionPool, wait: float) -> None:
+        if wait > POOL_SLOW_WAIT:
+            logger.warning(
+                "Waited %.0f ms for a connection from the %s pool.",
+                wait * 1000,
+                pool.name,
+            )
+        now = time.monotonic()
+        if now - self._pool_stats_logged_at.get(pool.name, 0) >= (
+            POOL_STATS_INTERVAL
+        ):
+            self._pool_stats_logged_at[pool.name] = now
+            logger.info(
+                "Connection pool %s stats: %s", pool.name, pool.pop_stats()
+            )
+
+    def _close(self):
+        # Connections inherited from a parent process don't belong to the
+        # pool of this one and are closed instead.
+        if (
+            self.connection is not None
+            and self.pool is not None
+            and getattr(self.connection, "_pool", None) is self.pool
+        ):
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
+            self.connection = None
+            return
+        # _close() is private in Django and missing from its stubs.
+        return super()._close()  # type: ignore[misc]
+
+
+def _forget_pools_after_fork():
+    # Pools own sockets and worker threads, a forked child (Celery prefork,
+    # multiprocessing) must build its own.
+    DatabaseWrapper._connection_pools.clear()
+    DatabaseWrapper._pool_stats_logged_at.clear()
+
+
+os.register_at_fork(after_in_child=_forget_pools_after_fork)
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from rest_framework import pagination
 from rest_framework.response import Response
 
@@ -20,3 +21,10 @@ class BasePagination(pagination.PageNumberPagination):
                 "results": data,
             }
         )
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # Django's Paginator has no async API, the count and page queries run
+        # in the thread used by the async ORM.
+        return await sync_to_async(self.paginate_queryset)(
+            queryset, request, view
+        )
@@ -0,0 +1,83 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.decorators import sync_and_async_middleware
+
+REPLICA_DB_ALIAS = "replica"
+
+_pinned_to_primary: ContextVar[bool] = ContextVar(
+    "pinned_to_primary", default=False
+)
+
+
+def get_read_replica() -> str:
+    """
+    Returns the alias for reads that tolerate replication lag: the replica,
+    or the primary when no replica is configured or the current request
+    already wrote.
+    """
+    if REPLICA_DB_ALIAS in settings.DATABASES and not _pinned_to_primary.get():
+        return REPLICA_DB_ALIAS
+    return DEFAULT_DB_ALIAS
+
+
+def pin_to_primary() -> None:
+    _pinned_to_primary.set(True)
+
+
+@contextmanager
+def unpinned() -> Iterator[None]:
+    """
+    Runs a unit of work (a request, a task, a command) unpinned, a write
+    pins the rest of it to the primary. The pin is reset on exit, so it
+    doesn't outlive the unit of work in long-lived worker processes.
+    """
+    token = _pinned_to_primary.set(False)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes and migrations go to the primary. Reads go to the primary too
+    unless a query opts in with .using(get_read_replica()), so replication
+    lag can't leak into code that reads its own writes.
+    """
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+@sync_and_async_middleware
+def replica_pinning_middleware(get_response):
+    """
+    Starts every request unpinned, a write pins the rest of it to the
+    primary.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def async_middleware(request):
+            with unpinned():
+                return await get_response(request)
+
+        markcoroutinefunction(async_middleware)
+        return async_middleware
+
+    def middleware(request):
+        with unpinned():
+            return get_response(request)
+
+    return middleware
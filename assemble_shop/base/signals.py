@@ -0,0 +1,25 @@
+from contextlib import AbstractContextManager
+
+from celery.signals import task_postrun, task_prerun
+
+from .routers import unpinned
+
+# Pins of the running tasks by task id, eagerly applied tasks nest.
+_task_pins: dict[str, AbstractContextManager[None]] = {}
+
+
+@task_prerun.connect
+def unpin_task(task_id, **kwargs):
+    """
+    Starts every task unpinned, a write pins the rest of it to the primary.
+    """
+    pin = unpinned()
+    pin.__enter__()
+    _task_pins[task_id] = pin
+
+
+@task_postrun.connect
+def reset_task_pin(task_id, **kwargs):
+    pin = _task_pins.pop(task_id, None)
+    if pin is not None:
+        pin.__exit__(None, None, None)
@@ -1 +1,217 @@
-# Create your tests here.
+import pytest
+from celery import shared_task
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, InternalError, connection
+
+from assemble_shop.base.admin import (
+    EstimatedCountPaginator,
+    get_estimated_count,
+)
+from assemble_shop.base.db.postgresql_pool.base import (
+    DatabaseWrapper as PooledDatabaseWrapper,
+)
+from assemble_shop.base.routers import (
+    REPLICA_DB_ALIAS,
+    get_read_replica,
+    replica_pinning_middleware,
+)
+from assemble_shop.base.transactions import (
+    TransactionPolicy,
+    atomic_view,
+    read_only_view,
+    snapshot_view,
+)
+
+
+class TestPrimaryReplicaRouter:
+    @pytest.fixture
+    def replica(self, monkeypatch):
+        monkeypatch.setitem(
+            settings.DATABASES,
+            REPLICA_DB_ALIAS,
+            settings.DATABASES[DEFAULT_DB_ALIAS],
+        )
+
+    def test_primary_without_replica(self):
+        """
+        Test that reads stay on the primary when no replica is configured.
+        """
+        assert get_read_replica() == DEFAULT_DB_ALIAS
+
+    def test_pinned_to_primary_after_write(self, create_user, replica, rf):
+        """
+        Test that a request reads from the replica until it writes and the
+        next request starts unpinned again.
+        """
+        aliases = []
+
+        def view(request):
+            aliases.append(get_read_replica())
+            create_user()
+            aliases.append(get_read_replica())
+
+        middleware = replica_pinning_middleware(view)
+        middleware(rf.get("/"))
+        middleware(rf.get("/"))
+
+        assert aliases == [REPLICA_DB_ALIAS, DEFAULT_DB_ALIAS] * 2
+
+    def test_task_pinned_to_primary_after_write(self, create_user, replica):
+        """
+        Test that a task reads from the replica until it writes and the
+        next task in the same worker starts unpinned again.
+        """
+        aliases = []
+
+        @shared_task
+        def write_task():
+            aliases.append(get_read_replica())
+            create_user()
+            aliases.append(get_read_replica())
+
+        write_task.apply().get()
+        write_task.apply().get()
+
+        assert aliases == [REPLICA_DB_ALIAS, DEFAULT_DB_ALIAS] * 2
+
+
+@pytest.mark.django_db
+class TestPooledDatabaseWrapper:
+    @pytest.fixture
+    def pooled_connection(self):
+        wrapper = PooledDatabaseWrapper(
+            {
+                **connection.settings_dict,
+                "CONN_MAX_AGE": 0,
+                "OPTIONS": {"pool": {"min_size": 1, "max_size": 1}},
+            },
+            # contrib.postgres looks its type handlers up by alias.
+            alias=DEFAULT_DB_ALIAS,
+        )
+        pool = wrapper.pool
+        assert pool is not None
+        yield wrapper
+        wrapper.close()
+        pool.close()
+        PooledDatabaseWrapper._connection_pools.pop(DEFAULT_DB_ALIAS)
+
+    def test_connection_returned_to_pool(self, pooled_connection):
+        """
+        Test that closing the connection puts it back in the pool and the
+        next checkout reuses it.
+        """
+        with pooled_connection.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            pid = cursor.fetchone()[0]
+        pooled_connection.close()
+
+        assert pooled_connection.pool.get_stats()["pool_available"] == 1
+        with pooled_connection.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            assert cursor.fetchone()[0] == pid
+
+    def test_persistent_connections_rejected(self):
+        """
+        Test that pooling can't be combined with CONN_MAX_AGE.
+        """
+        wrapper = PooledDatabaseWrapper(
+            {
+                **connection.settings_dict,
+                "CONN_MAX_AGE": 60,
+                "OPTIONS": {"pool": True},
+            },
+            alias=DEFAULT_DB_ALIAS,
+        )
+
+        with pytest.raises(ImproperlyConfigured):
+            wrapper.ensure_connection()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTransactionPolicy:
+    def test_read_only_and_atomic_views(self, rf):
+        """
+        Test that read-only views run in autocommit and atomic views in a
+        transaction.
+        """
+
+        @read_only_view
+        def read_view(request):
+            return connection.in_atomic_block
+
+        @atomic_view
+        def write_view(request):
+            return connection.in_atomic_block
+
+        assert read_view(rf.get("/")) is False
+        assert write_view(rf.post("/")) is True
+        assert read_view.transaction_policy == TransactionPolicy.READ_ONLY
+        assert write_view.transaction_policy == TransactionPolicy.ATOMIC
+
+    def test_snapshot_view_rejects_writes(self, create_user, rf):
+        """
+        Test that snapshot views run in a READ ONLY transaction.
+        """
+
+        @snapshot_view
+        def view(request):
+            create_user()
+
+        with pytest.raises(InternalError, match="read-only transaction"):
+            view(rf.get("/"))
+
+    def test_snapshot_view_is_repeatable_read(self, rf):
+        """
+        Test that every query of a snapshot view reads the same snapshot.
+        """
+
+        @snapshot_view
+        def view(request):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT current_setting('transaction_isolation')"
+                )
+                return cursor.fetchone()[0]
+
+        assert view(rf.get("/")) == "repeatable read"
+
+    def test_async_view_must_be_read_only(self):
+        """
+        Test that async views can't run in a transaction.
+        """
+
+        async def view(request):
+            pass
+
+        with pytest.raises(ImproperlyConfigured):
+            atomic_view(view)
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    def test_estimate_above_threshold(self, create_user, settings):
+        """
+        Test that unfiltered querysets of tables estimated above the
+        threshold are counted from pg_class and filtered ones are counted.
+        """
+        user_model = create_user()._meta.model
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {user_model._meta.db_table}")
+        estimate = get_estimated_count(user_model, DEFAULT_DB_ALIAS)
+
+        settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 0
+        paginator = EstimatedCountPaginator(
+            user_model.objects.order_by("pk"), 10
+        )
+        filtered = EstimatedCountPaginator(
+            user_model.objects.filter(is_staff=True).order_by("pk"), 10
+        )
+        settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = estimate + 1
+        small = EstimatedCountPaginator(user_model.objects.order_by("pk"), 10)
+
+        assert paginator.count == estimate
+        assert (
+            filtered.count == user_model.objects.filter(is_staff=True).count()
+        )
+        assert small.count == user_model.objects.count()
@@ -0,0 +1,95 @@
+"""
+Per-view transaction policies.
+
+Requests don't run in a transaction by default (ATOMIC_REQUESTS is off), so
+read-only views don't hold a transaction and its locks while they render,
+and views that write opt in with atomic_view.
+"""
+
+from collections.abc import Callable
+from enum import Enum
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from assemble_shop.base.routers import get_read_replica
+
+
+class TransactionPolicy(Enum):
+    # Autocommit, every query is its own transaction.
+    READ_ONLY = "read_only"
+    # One REPEATABLE READ, READ ONLY transaction on the read database, for
+    # views that need a consistent snapshot across several queries.
+    SNAPSHOT = "snapshot"
+    # One transaction for the whole view.
+    ATOMIC = "atomic"
+    # The view opens its own transactions where it needs them.
+    MANAGED = "managed"
+
+
+def with_transaction_policy(
+    policy: TransactionPolicy, using: str | None = None
+) -> Callable:
+    """
+    Returns a decorator that runs a view under the given policy and records
+    it on the view as transaction_policy.
+
+    Snapshots default to the database of get_read_replica() at request
+    time, the other policies to the primary.
+    """
+
+    def decorator(view):
+        if policy in (TransactionPolicy.READ_ONLY, TransactionPolicy.MANAGED):
+            # Also opts out of ATOMIC_REQUESTS if it's turned back on.
+            wrapper = transaction.non_atomic_requests(using=using)(view)
+        elif iscoroutinefunction(view):
+            raise ImproperlyConfigured(
+                f"The {policy.value} transaction policy can't be used with "
+                f"async view {view.__qualname__}."
+            )
+        elif policy == TransactionPolicy.ATOMIC:
+            wrapper = transaction.atomic(using=using or DEFAULT_DB_ALIAS)(view)
+        else:
+
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                alias = using or get_read_replica()
+                # Isolation level and access mode can only be set before the
+                # first query of the transaction, a nested snapshot runs in
+                # the outer one.
+                outermost = not connections[alias].in_atomic_block
+                with transaction.atomic(using=alias):
+                    if outermost:
+                        with connections[alias].cursor() as cursor:
+                            cursor.execute(
+                                "SET TRANSACTION ISOLATION LEVEL "
+                                "REPEATABLE READ, READ ONLY"
+                            )
+                    return view(*args, **kwargs)
+
+        wrapper.transaction_policy = policy
+        return wrapper
+
+    return decorator
+
+
+read_only_view = with_transaction_policy(TransactionPolicy.READ_ONLY)
+snapshot_view = with_transaction_policy(TransactionPolicy.SNAPSHOT)
+atomic_view = with_transaction_policy(TransactionPolicy.ATOMIC)
+managed_view = with_transaction_policy(TransactionPolicy.MANAGED)
+
+
+class TransactionPolicyMixin:
+    """
+    Applies the transaction_policy of a class-based view to as_view().
+    """
+
+    transaction_policy: TransactionPolicy = TransactionPolicy.ATOMIC
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return with_transaction_policy(cls.transaction_policy)(
+            super().as_view(**initkwargs)  # type: ignore
+        )
@@ -1 +1,49 @@
-# Create your views here.
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+from assemble_shop.base.transactions import (
+    TransactionPolicy,
+    TransactionPolicyMixin,
+)
+
+
+class AsyncAPIView(TransactionPolicyMixin, APIView):
+    """
+    APIView whose handlers are coroutines, served natively under ASGI.
+
+    Authentication, permissions and throttling still run through the sync
+    APIView machinery in a worker thread; only the handler is awaited.
+    """
+
+    # Transactions can't wrap async views, they are read-only anyway.
+    transaction_policy = TransactionPolicy.READ_ONLY
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self,
+                    request.method.lower(),
+                    self.http_method_not_allowed,
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if hasattr(response, "__await__"):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
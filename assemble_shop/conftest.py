@@ -8,6 +8,7 @@ import pytest
 from django.contrib.auth.models import Group, Permission
 from django.forms.models import inlineformset_factory
 from django.utils import timezone
+from moto import mock_aws
 
 from assemble_shop.orders.enums import OrderStatusEnum
 from assemble_shop.orders.formsets import OrderItemFormset
@@ -15,6 +16,7 @@ from assemble_shop.orders.models import Discount, OrderItem, Product, Review
 from assemble_shop.orders.tests.factories import *
 from assemble_shop.users.groups import *
 from assemble_shop.users.tests.factories import UserFactory
+from assemble_shop.utils import storage
 
 if TYPE_CHECKING:
     from assemble_shop.users.models import User as UserType
@@ -23,6 +25,21 @@ if TYPE_CHECKING:
 @pytest.fixture(autouse=True)
 def _media_storage(settings, tmpdir) -> None:
     settings.MEDIA_ROOT = tmpdir.strpath
+    settings.IMPORT_ARCHIVE_SPOOL_DIR = tmpdir.join("import_spool").strpath
+
+
+@pytest.fixture
+def s3(monkeypatch, settings):
+    """
+    Moto stand-in for the Minio storage with the media bucket created.
+    """
+    # Moto only intercepts custom endpoints it's told about.
+    monkeypatch.setenv("MOTO_S3_CUSTOM_ENDPOINTS", settings.STORAGE_MEDIA_URL)
+    monkeypatch.setattr(storage, "_clients", {})
+    with mock_aws():
+        client = storage.client_storage()
+        client.create_bucket(Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME)
+        yield client
 
 
 @pytest.fixture
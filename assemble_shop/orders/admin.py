@@ -1,33 +1,176 @@
+import mimetypes
+import uuid
+
 from django.contrib import admin, messages
-from django.core.exceptions import ValidationError
-from django.core.files.storage import default_storage
+from django.contrib.admin import helpers
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import IntegrityError, transaction
-from django.http import HttpResponseRedirect
+from django.http import (
+    HttpResponseNotAllowed,
+    HttpResponseRedirect,
+    JsonResponse,
+)
+from django.template.response import TemplateResponse
 from django.urls import path, reverse
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from assemble_shop.base.admin import BaseAdmin
 from assemble_shop.base.enums import BaseFieldsEnum, BaseTitleEnum
+from assemble_shop.base.transactions import (
+    atomic_view,
+    managed_view,
+    read_only_view,
+)
+from assemble_shop.orders.archives import spool_import_file
 from assemble_shop.orders.enums import *
-from assemble_shop.orders.forms import DiscountForm, UploadFileForm
+from assemble_shop.orders.exports import export_response, get_product_export
+from assemble_shop.orders.forms import (
+    CompleteDirectUploadForm,
+    DirectUploadForm,
+    DiscountCampaignForm,
+    DiscountForm,
+    OrderItemForm,
+    ProductsDiscountCampaignForm,
+    UploadFileForm,
+)
 from assemble_shop.orders.formsets import OrderItemFormset
+from assemble_shop.orders.imports import import_products_from_file
 from assemble_shop.orders.models import *
+from assemble_shop.orders.tasks import (
+    archive_import_file,
+    export_orders,
+    import_products_file,
+)
+from assemble_shop.orders.uploads import (
+    MAX_UPLOAD_SIZES,
+    build_upload_key,
+    claim_import_upload,
+)
 from assemble_shop.orders.utils import (
     confirmed_order,
+    create_discount_campaign,
+    delete_discount_campaigns,
     get_extra_context_order,
     regenerate_order,
+    sync_campaign_discounts,
+)
+from assemble_shop.utils.storage import (
+    generate_presigned_download,
+    generate_presigned_upload,
 )
-from assemble_shop.utils import excel_file
 
 
 @admin.register(Product)
 class ProductAdmin(BaseAdmin):
     list_display = ProductFieldsEnum.LIST_DISPLAY_FIELDS.value
+    # Leaves out the description and the search vector.
+    list_only_fields = ProductFieldsEnum.LIST_DISPLAY_FIELDS.value
     search_fields = ProductFieldsEnum.LIST_SEARCH_FIELDS.value
+    actions = (
+        "create_discount_campaign_action",
+        "export_csv_action",
+        "export_xlsx_action",
+    )
+
+    class Media:
+        js = ("js/direct_upload.js",)
 
     def get_readonly_fields(self, request, obj=None):
         return self.readonly_fields + ProductFieldsEnum.READONLY_FIELDS.value
 
+    def get_search_results(self, request, queryset, search_term):
+        # Also serves the product autocomplete of orders, reviews and
+        # discounts, which keeps the ranking.
+        if not search_term.strip():
+            return queryset, False
+        return queryset.search(search_term.strip()), False
+
+    def get_form(self, request, obj=None, change=False, **kwargs):
+        form = super().get_form(request, obj, change, **kwargs)
+        # Images of saved products are uploaded straight to the storage.
+        if obj and "image" in form.base_fields:
+            form.base_fields["image"].widget.attrs.update(
+                self.get_direct_upload_attrs(DirectUploadEnum.IMAGE, obj)
+            )
+        return form
+
+    @admin.action(
+        description=_("Create discount campaign for selected products"),
+        permissions=("add_discount_campaign",),
+    )
+    def create_discount_campaign_action(self, request, queryset):
+        """
+        Creates a discount campaign for the selected products, including
+        every product of the change list when "select all" is used.
+        """
+        form = ProductsDiscountCampaignForm(
+            request.POST if "apply" in request.POST else None,
+            products=queryset,
+        )
+        if form.is_valid():
+            campaign = create_discount_campaign(
+                products=queryset, user=request.user, **form.cleaned_data
+            )
+            self.message_user(
+                request,
+                f'Discount campaign "{campaign}" created for '
+                f"{queryset.count()} products.",
+                level=messages.SUCCESS,
+            )
+            return None
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": _("Create discount campaign"),
+            "opts": self.model._meta,
+            "form": form,
+            "queryset": queryset,
+            "products_count": queryset.count(),
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            "select_across": request.POST.get("select_across", "0"),
+            "action_index": request.POST.get("index", "0"),
+        }
+        return TemplateResponse(
+            request,
+            "admin/orders/product/discount_campaign.html",
+            context,
+        )
+
+    def export_products(self, queryset, export_format):
+        headers, rows = get_product_export(
+            queryset, include_discount=True, include_rating=True
+        )
+        return export_response(headers, rows, export_format, "products")
+
+    @admin.action(
+        description=_("Export selected products as CSV"),
+        permissions=("view",),
+    )
+    def export_csv_action(self, request, queryset):
+        return self.export_products(queryset, ExportFormatEnum.CSV)
+
+    @admin.action(
+        description=_("Export selected products as Excel"),
+        permissions=("view",),
+    )
+    def export_xlsx_action(self, request, queryset):
+        return self.export_products(queryset, ExportFormatEnum.XLSX)
+
+    @admin.display(description=_("Image Thumbnail"))
+    def image_thumbnail(self, obj):
+        # The original can weigh megabytes, the preview waits for the task.
+        if thumbnail := obj.image_renditions.get("thumbnail"):
+            return format_html(
+                '<img src="{}" alt="{}">',
+                obj.image.storage.url(thumbnail["webp"]),
+                obj.name,
+            )
+        return "-"
+
+    def has_add_discount_campaign_permission(self, request):
+        return request.user.has_perm("orders.add_discountcampaign")
+
     def get_fieldsets(self, request, obj=None):
         fieldsets = (
             (
@@ -51,35 +194,24 @@ class ProductAdmin(BaseAdmin):
             )
         return fieldsets
 
-    def save_products(self, products):
-        Product.objects.bulk_create(products)
-
-    def upload_file_to_storage(self, file, user):
-        file_name = f"import_data_product/{user}/{timezone.now().strftime('%Y-%m-%d')}/{file.name}"
-        default_storage.save(file_name, file)
-
-    def process_uploaded_file(self, file, user):
-        headers, rows = excel_file.get_data(file=file)
-        expected_headers = ["name", "price", "description", "inventory"]
-
-        if headers != expected_headers:
-            raise ValidationError(
-                _(
-                    "Headers in the uploaded file are incorrect. "
-                    f"Expected headers are: {', '.join(expected_headers)}. "
-                    "Please ensure the file includes these headers in the exact order."
-                )
+    def archive_file_in_storage(self, file, user):
+        """
+        Spools the file locally and archives it in a task, so the response
+        doesn't wait for the storage.
+        """
+        path, checksum = spool_import_file(file)
+        transaction.on_commit(
+            lambda: archive_import_file.delay(
+                path, checksum, file.name, user.pk
             )
+        )
 
-        for row in rows:
-            yield Product(
-                created_by=user,
-                name=row[0],
-                price=row[1],
-                description=row[2] if row[2] else "",
-                inventory=row[3],
-            )
+    def process_uploaded_file(self, file, user):
+        return import_products_from_file(
+            file, user, content_type=file.content_type
+        )
 
+    @managed_view
     def import_file_view(self, request):
         """
         Handles file upload and data import for products.
@@ -89,20 +221,17 @@ class ProductAdmin(BaseAdmin):
             if form.is_valid():
                 file = form.cleaned_data.get("file")
                 try:
-                    self.save_products(
-                        products=list(
-                            self.process_uploaded_file(file, request.user)
-                        )
-                    )
-                    self.upload_file_to_storage(file, request.user)
+                    report = self.process_uploaded_file(file, request.user)
+                    self.archive_file_in_storage(file, request.user)
                     self.message_user(
                         request,
-                        "File imported successfully!",
+                        f"File imported successfully! {report.row_count} "
+                        "products were created.",
                         level=messages.SUCCESS,
                     )
 
                 except ValidationError as e:
-                    form.add_error("file", e.message)
+                    form.add_error("file", e)
 
                 except IntegrityError as e:
                     form.add_error("file", f"Database error: {str(e)}")
@@ -114,10 +243,13 @@ class ProductAdmin(BaseAdmin):
                     )
         else:
             form = UploadFileForm()
+        form.fields["file"].widget.attrs.update(
+            self.get_direct_upload_attrs(DirectUploadEnum.IMPORT)
+        )
 
-        admin_form = admin.helpers.AdminForm(  # type: ignore
-            form,
-            [("ImportFile", {"fields": ("file",)})],
+        admin_form = admin.helpers.AdminForm(
+            form,  # type: ignore[arg-type]
+            [("ImportFile", {"fields": ["file"]})],
             {},
             model_admin=self,
         )
@@ -128,6 +260,105 @@ class ProductAdmin(BaseAdmin):
         }
         return super().changeform_view(request, extra_context=extra_context)
 
+    def get_direct_upload_attrs(self, kind, product=None) -> dict:
+        """
+        Attributes of a file input that direct_upload.js uploads straight
+        to the storage.
+        """
+        attrs = {
+            "data-direct-upload": kind.name,
+            "data-direct-upload-url": reverse(
+                "admin:orders_product_direct_upload"
+            ),
+            "data-direct-upload-complete-url": reverse(
+                "admin:orders_product_complete_direct_upload"
+            ),
+        }
+        if product:
+            attrs["data-product"] = product.pk
+        return attrs
+
+    def has_direct_upload_permission(self, request, kind) -> bool:
+        if kind == DirectUploadEnum.IMPORT:
+            return self.has_add_permission(request)
+        return self.has_change_permission(request)
+
+    @read_only_view
+    def direct_upload_view(self, request):
+        """
+        Returns a presigned POST for a file the browser uploads straight to
+        the storage, so its bytes never pass through Django.
+        """
+        if request.method != "POST":
+            return HttpResponseNotAllowed(["POST"])
+
+        form = DirectUploadForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        kind = form.cleaned_data["kind"]
+        if not self.has_direct_upload_permission(request, kind):
+            raise PermissionDenied
+
+        key = build_upload_key(
+            kind, request.user, form.cleaned_data["file_name"]
+        )
+        content_type, _encoding = mimetypes.guess_type(key)
+        upload = generate_presigned_upload(
+            key, content_type, MAX_UPLOAD_SIZES[kind]
+        )
+        return JsonResponse({"key": key, **upload})
+
+    @atomic_view
+    def complete_direct_upload_view(self, request):
+        """
+        Starts processing a file once the browser uploaded it: products of
+        an import file are imported in a task, an image replaces the one of
+        its product.
+        """
+        if request.method != "POST":
+            return HttpResponseNotAllowed(["POST"])
+
+        form = CompleteDirectUploadForm(request.POST, user=request.user)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        kind, key = form.cleaned_data["kind"], form.cleaned_data["key"]
+        if not self.has_direct_upload_permission(request, kind):
+            raise PermissionDenied
+
+        if kind == DirectUploadEnum.IMPORT:
+            if not claim_import_upload(key):
+                return JsonResponse(
+                    {
+                        "errors": {
+                            "__all__": [
+                                _("This file is already being imported.")
+                            ]
+                        }
+                    },
+                    status=400,
+                )
+            user_id = request.user.pk
+            transaction.on_commit(
+                lambda: import_products_file.delay(key, user_id)
+            )
+            self.message_user(
+                request,
+                "File uploaded, the products are being imported.",
+                level=messages.SUCCESS,
+            )
+            return JsonResponse(
+                {
+                    "key": key,
+                    "redirect_url": reverse("admin:orders_product_changelist"),
+                }
+            )
+
+        product = form.cleaned_data["product"]
+        product.image = key
+        product.updated_by = request.user
+        product.save(update_fields=["image", "image_renditions", "updated_by"])
+        return JsonResponse({"key": key})
+
     def get_urls(self):
         urls = super().get_urls()
 
@@ -136,7 +367,17 @@ class ProductAdmin(BaseAdmin):
                 "upload-file/",
                 self.admin_site.admin_view(self.import_file_view),
                 name="import_file_add_view",
-            )
+            ),
+            path(
+                "direct-upload/",
+                self.admin_site.admin_view(self.direct_upload_view),
+                name="orders_product_direct_upload",
+            ),
+            path(
+                "direct-upload/complete/",
+                self.admin_site.admin_view(self.complete_direct_upload_view),
+                name="orders_product_complete_direct_upload",
+            ),
         ]
 
         return custom_urls + urls
@@ -144,6 +385,7 @@ class ProductAdmin(BaseAdmin):
 
 class OrderItemInline(admin.StackedInline):
     model = Order.products.through
+    form = OrderItemForm
     formset = OrderItemFormset
     readonly_fields = OrderItemFieldsEnum.READONLY_FIELDS.value
     autocomplete_fields = ("product",)
@@ -168,6 +410,8 @@ class OrderItemInline(admin.StackedInline):
 @admin.register(Order)
 class OrderAdmin(BaseAdmin):
     list_display = OrderFieldsEnum.LIST_DISPLAY_FIELDS.value
+    list_only_fields = OrderFieldsEnum.LIST_ONLY_FIELDS.value
+    list_select_related = ("created_by",)
     search_fields = OrderFieldsEnum.LIST_SEARCH_FIELDS.value
     list_filter = OrderFieldsEnum.LIST_FILTER_FIELDS.value
     inlines = (OrderItemInline,)
@@ -194,6 +438,15 @@ class OrderAdmin(BaseAdmin):
             return queryset.filter(created_by=request.user)
         return queryset
 
+    def get_search_results(self, request, queryset, search_term):
+        # A tracking code is matched exactly on its index instead of
+        # ILIKE on its text.
+        try:
+            tracking_code = uuid.UUID(search_term.strip())
+        except ValueError:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(tracking_code=tracking_code), False
+
     def _changed_status_order(self, request, order_id, status):
         order = self.get_object(request, order_id)
         order.status = status  # type: ignore
@@ -205,7 +458,7 @@ class OrderAdmin(BaseAdmin):
         )
         return HttpResponseRedirect(request.headers.get("referer"))
 
-    @transaction.atomic
+    @atomic_view
     def regenerate_order_view(self, request, order_id):
         new_order = regenerate_order(order_id, request.user)
 
@@ -216,12 +469,13 @@ class OrderAdmin(BaseAdmin):
             reverse("admin:orders_order_change", args=(new_order.id,))
         )
 
+    @atomic_view
     def completed_status_order_view(self, request, order_id):
         return self._changed_status_order(
             request, order_id, OrderStatusEnum.COMPLETED.name
         )
 
-    @transaction.atomic
+    @atomic_view
     def confirmed_order_view(self, request, order_id):
         order = self.get_object(request, order_id)
         products_updated, error_messages = confirmed_order(order)  # type: ignore
@@ -237,7 +491,7 @@ class OrderAdmin(BaseAdmin):
             request, order_id, OrderStatusEnum.CONFIRMED.name
         )
 
-    @transaction.atomic
+    @atomic_view
     def canceled_order_view(self, request, order_id):
         order = self.get_object(request, order_id)
         products_updated = []
@@ -309,9 +563,60 @@ class OrderAdmin(BaseAdmin):
         return super().change_view(request, object_id, form_url, extra_context)
 
 
+@admin.register(OrderExport)
+class OrderExportAdmin(BaseAdmin):
+    list_display = OrderExportFieldsEnum.LIST_DISPLAY_FIELDS.value
+    list_filter = OrderExportFieldsEnum.LIST_FILTER_FIELDS.value
+
+    def get_fieldsets(self, request, obj=None):
+        fieldsets = (
+            (
+                BaseTitleEnum.GENERAL.value,
+                {"fields": OrderExportFieldsEnum.GENERAL_FIELDS.value},
+            ),
+        )
+        if obj:
+            fieldsets += (  # type: ignore
+                (
+                    BaseTitleEnum.INFO.value,
+                    {
+                        "fields": OrderExportFieldsEnum.READONLY_FIELDS.value
+                        + BaseFieldsEnum.BASE.value
+                    },
+                ),
+            )
+        return fieldsets
+
+    def get_readonly_fields(self, request, obj=None):
+        return (
+            self.readonly_fields + OrderExportFieldsEnum.READONLY_FIELDS.value
+        )
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description=_("File"))
+    def download_link(self, obj):
+        if obj.status != ExportStatusEnum.COMPLETED.name:
+            return "-"
+        return format_html(
+            '<a href="{}">{}</a>',
+            generate_presigned_download(
+                obj.file_name, obj.file_name.rsplit("/", 1)[-1]
+            ),
+            _("Download"),
+        )
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        transaction.on_commit(lambda: export_orders.delay(obj.pk))
+
+
 @admin.register(Review)
 class ReviewAdmin(BaseAdmin):
     list_display = ReviewFieldsEnum.LIST_DISPLAY_FIELDS.value
+    list_only_fields = ReviewFieldsEnum.LIST_ONLY_FIELDS.value
+    list_select_related = ("created_by", "product")
     search_fields = ReviewFieldsEnum.LIST_SEARCH_FIELDS.value
     autocomplete_fields = ("product",)
 
@@ -349,6 +654,8 @@ class ReviewAdmin(BaseAdmin):
 @admin.register(Discount)
 class DiscountAdmin(BaseAdmin):
     list_display = DiscountFieldsEnum.LIST_DISPLAY_FIELDS.value
+    list_only_fields = DiscountFieldsEnum.LIST_ONLY_FIELDS.value
+    list_select_related = ("product",)
     search_fields = DiscountFieldsEnum.LIST_SEARCH_FIELDS.value
     list_filter = DiscountFieldsEnum.LIST_FILTER_FIELDS.value
     autocomplete_fields = ("product",)
@@ -369,3 +676,38 @@ class DiscountAdmin(BaseAdmin):
                 ),
             )
         return fieldsets
+
+
+@admin.register(DiscountCampaign)
+class DiscountCampaignAdmin(BaseAdmin):
+    list_display = DiscountCampaignFieldsEnum.LIST_DISPLAY_FIELDS.value
+    search_fields = DiscountCampaignFieldsEnum.LIST_SEARCH_FIELDS.value
+    list_filter = DiscountCampaignFieldsEnum.LIST_FILTER_FIELDS.value
+    autocomplete_fields = ("products",)
+    form = DiscountCampaignForm
+
+    def get_fieldsets(self, request, obj=None):
+        fieldsets = (
+            (
+                BaseTitleEnum.GENERAL.value,
+                {"fields": DiscountCampaignFieldsEnum.GENERAL_FIELDS.value},
+            ),
+        )
+        if obj:
+            fieldsets += (  # type: ignore
+                (
+                    BaseTitleEnum.INFO.value,
+                    {"fields": BaseFieldsEnum.BASE.value},
+                ),
+            )
+        return fieldsets
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        sync_campaign_discounts(form.instance)
+
+    def delete_model(self, request, obj):
+        delete_discount_campaigns(DiscountCampaign.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_discount_campaigns(queryset)
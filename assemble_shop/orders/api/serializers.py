@@ -1,12 +1,17 @@
 from rest_framework import serializers
 
+from assemble_shop.orders.enums import ExportFormatEnum, OrderStatusEnum
+from assemble_shop.orders.images import get_rendition_urls
 from assemble_shop.orders.models import Order, OrderItem, Product
 
 
 class ProductSerializer(serializers.ModelSerializer):
+    image_renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = Product
-        fields = (
+        # Extended by ProductSearchSerializer.
+        fields: tuple[str, ...] = (
             "id",
             "name",
             "price",
@@ -14,8 +19,18 @@ class ProductSerializer(serializers.ModelSerializer):
             "description",
             "rating",
             "image",
+            "image_renditions",
         )
 
+    def get_image_renditions(self, obj) -> dict:
+        """
+        URLs of the resized copies of the image by rendition and format,
+        empty until they are generated.
+        """
+        if not obj.image:
+            return {}
+        return get_rendition_urls(obj.image, obj.image_renditions)
+
 
 class OrderItemSerializer(serializers.ModelSerializer):
     product = ProductSerializer()
@@ -47,3 +62,46 @@ class OrderSerializer(serializers.ModelSerializer):
             "status",
             "items",
         )
+
+
+class ProductSearchSerializer(ProductSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = ProductSerializer.Meta.fields + ("rank",)
+
+
+class ProductSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=2, max_length=100)
+
+
+class TopSellingQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=1, required=False)
+    status = serializers.MultipleChoiceField(
+        choices=OrderStatusEnum.choices(), required=False, source="statuses"
+    )
+    top = serializers.IntegerField(min_value=1, max_value=50, default=6)
+
+
+class ProductExportQuerySerializer(serializers.Serializer):
+    # "format" is taken by DRF to pick the renderer.
+    file_format = serializers.ChoiceField(
+        choices=ExportFormatEnum.choices(), default=ExportFormatEnum.CSV.name
+    )
+    include_discount = serializers.BooleanField(default=False)
+    include_rating = serializers.BooleanField(default=False)
+
+
+class OrderExportQuerySerializer(serializers.Serializer):
+    since = serializers.DateField()
+    until = serializers.DateField()
+    file_format = serializers.ChoiceField(
+        choices=ExportFormatEnum.choices(), default=ExportFormatEnum.CSV.name
+    )
+
+    def validate(self, attrs):
+        if attrs["until"] < attrs["since"]:
+            raise serializers.ValidationError(
+                {"until": "The end date must not be before the start date."}
+            )
+        return attrs
@@ -4,29 +4,54 @@ from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
 from assemble_shop.base.pagination import BasePagination
+from assemble_shop.base.routers import get_read_replica
+from assemble_shop.base.transactions import (
+    TransactionPolicy,
+    TransactionPolicyMixin,
+)
+from assemble_shop.base.views import AsyncAPIView
 from assemble_shop.orders.api.serializers import (
+    OrderExportQuerySerializer,
     OrderSerializer,
+    ProductExportQuerySerializer,
+    ProductSearchQuerySerializer,
+    ProductSearchSerializer,
     ProductSerializer,
+    TopSellingQuerySerializer,
+)
+from assemble_shop.orders.enums import ExportFormatEnum
+from assemble_shop.orders.exports import (
+    OrderItemExport,
+    export_response,
+    file_response,
+    get_product_export,
 )
+from assemble_shop.orders.models import Product
 from assemble_shop.orders.services import OrderService
+from assemble_shop.orders.tracking import get_order_tracking
 
 order_service = OrderService()
 
 
-class GetTopSelling(GenericAPIView):
+class GetTopSelling(TransactionPolicyMixin, GenericAPIView):
     http_method_names = ("get",)
+    transaction_policy = TransactionPolicy.READ_ONLY
     permission_classes = (
         IsAdminUser,
     )  # TODO: must implemented custom permission
 
     def get(self, request):
+        serializer = TopSellingQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
         return Response(
-            order_service.get_top_selling(), status=status.HTTP_200_OK
+            order_service.get_top_selling(**serializer.validated_data),
+            status=status.HTTP_200_OK,
         )
 
 
-class GetMonthlyIncome(GenericAPIView):
+class GetMonthlyIncome(TransactionPolicyMixin, GenericAPIView):
     http_method_names = ("get",)
+    transaction_policy = TransactionPolicy.READ_ONLY
     permission_classes = (
         IsAdminUser,
     )  # TODO: must implemented custom permission
@@ -37,8 +62,10 @@ class GetMonthlyIncome(GenericAPIView):
         )
 
 
-class GetCustomersOrders(ListAPIView):
+class GetCustomersOrders(TransactionPolicyMixin, ListAPIView):
     http_method_names = ("get",)
+    # The count and the page are read from the same snapshot.
+    transaction_policy = TransactionPolicy.SNAPSHOT
     permission_classes = (IsAuthenticated,)
     pagination_class = BasePagination
     serializer_class = OrderSerializer
@@ -49,10 +76,144 @@ class GetCustomersOrders(ListAPIView):
         )
 
 
-class GetTopRatedProducts(ListAPIView):
+class GetTopRatedProducts(TransactionPolicyMixin, ListAPIView):
     http_method_names = ("get",)
+    transaction_policy = TransactionPolicy.READ_ONLY
     permission_classes = (AllowAny,)
     serializer_class = ProductSerializer
 
     def get_queryset(self):
         return order_service.get_top_rated_products()
+
+
+class TrackOrder(TransactionPolicyMixin, GenericAPIView):
+    """
+    Status of an order by its tracking code, the code is the credential.
+    """
+
+    http_method_names = ("get",)
+    transaction_policy = TransactionPolicy.READ_ONLY
+    permission_classes = (AllowAny,)
+
+    def get(self, request, tracking_code):
+        tracking = get_order_tracking(tracking_code)
+        if tracking is None:
+            return Response(
+                {"detail": "No order has this tracking code."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(tracking, status=status.HTTP_200_OK)
+
+
+class SearchProducts(TransactionPolicyMixin, ListAPIView):
+    http_method_names = ("get",)
+    transaction_policy = TransactionPolicy.READ_ONLY
+    permission_classes = (AllowAny,)
+    pagination_class = BasePagination
+    serializer_class = ProductSearchSerializer
+
+    def get_queryset(self):
+        serializer = ProductSearchQuerySerializer(
+            data=self.request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+        return Product.objects.using(get_read_replica()).search(
+            serializer.validated_data["q"]
+        )
+
+
+class ExportProducts(TransactionPolicyMixin, GenericAPIView):
+    http_method_names = ("get",)
+    transaction_policy = TransactionPolicy.READ_ONLY
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        serializer = ProductExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        headers, rows = get_product_export(
+            Product.objects.all(),
+            include_discount=data["include_discount"],
+            include_rating=data["include_rating"],
+        )
+        return export_response(
+            headers, rows, ExportFormatEnum[data["file_format"]], "products"
+        )
+
+
+class ExportOrders(TransactionPolicyMixin, GenericAPIView):
+    """
+    Streams the completed orders of a range of days with their items, the
+    OrderExport admin writes the same file to the storage instead.
+    """
+
+    http_method_names = ("get",)
+    transaction_policy = TransactionPolicy.READ_ONLY
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        serializer = OrderExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        export_format = ExportFormatEnum[data["file_format"]]
+        exporter = OrderItemExport(data["since"], data["until"])
+        return file_response(
+            exporter.iter_file(export_format),
+            export_format,
+            f"orders_{data['since']}_{data['until']}",
+        )
+
+
+class AsyncGetTopSelling(AsyncAPIView):
+    http_method_names = ("get",)
+    permission_classes = (IsAdminUser,)
+
+    async def get(self, request):
+        serializer = TopSellingQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            await order_service.aget_top_selling(**serializer.validated_data),
+            status=status.HTTP_200_OK,
+        )
+
+
+class AsyncGetMonthlyIncome(AsyncAPIView):
+    http_method_names = ("get",)
+    permission_classes = (IsAdminUser,)
+
+    async def get(self, request):
+        return Response(
+            await order_service.aget_monthly_income(),
+            status=status.HTTP_200_OK,
+        )
+
+
+class AsyncGetCustomersOrders(AsyncAPIView):
+    http_method_names = ("get",)
+    permission_classes = (IsAuthenticated,)
+    pagination_class = BasePagination
+
+    async def get(self, request):
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(
+            order_service.get_customers_orders_with_items(
+                customer_id=request.user.id
+            ),
+            request,
+            view=self,
+        )
+        return paginator.get_paginated_response(
+            OrderSerializer(page, many=True).data
+        )
+
+
+class AsyncGetTopRatedProducts(AsyncAPIView):
+    http_method_names = ("get",)
+    permission_classes = (AllowAny,)
+
+    async def get(self, request):
+        products = await order_service.aget_top_rated_products()
+        return Response(
+            ProductSerializer(products, many=True).data,
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,180 @@
+"""
+Archival of product import files.
+
+Requests only spool the upload to IMPORT_ARCHIVE_SPOOL_DIR, a directory the
+web and worker containers share, and a task uploads it to the storage.
+Archives are keyed by the SHA-256 of their content, so the same spreadsheet
+imported again isn't stored twice, and they are purged once they haven't
+been imported for IMPORT_ARCHIVE_RETENTION_DAYS.
+"""
+
+import hashlib
+import os
+import posixpath
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from assemble_shop.orders.models import ImportArchive
+from assemble_shop.utils.storage import (
+    client_storage,
+    delete_stored_file,
+    upload_file_in_storage,
+)
+
+IMPORT_ARCHIVE_PREFIX = "import_data_product/archive"
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+
+def get_archive_key(checksum: str, original_name: str) -> str:
+    extension = posixpath.splitext(original_name)[1].lower()
+    return f"{IMPORT_ARCHIVE_PREFIX}/{checksum[:2]}/{checksum}{extension}"
+
+
+def get_file_checksum(file) -> str:
+    file.seek(0)
+    checksum = hashlib.sha256()
+    while chunk := file.read(CHECKSUM_CHUNK_SIZE):
+        checksum.update(chunk)
+    file.seek(0)
+    return checksum.hexdigest()
+
+
+def spool_import_file(uploaded_file) -> tuple[str, str]:
+    """
+    Copies an uploaded file to the spool directory and returns its path
+    and checksum.
+    """
+    os.makedirs(settings.IMPORT_ARCHIVE_SPOOL_DIR, exist_ok=True)
+    checksum = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(
+        dir=settings.IMPORT_ARCHIVE_SPOOL_DIR, suffix=".spool", delete=False
+    ) as spool:
+        uploaded_file.seek(0)
+        for chunk in uploaded_file.chunks():
+            checksum.update(chunk)
+            spool.write(chunk)
+    return spool.name, checksum.hexdigest()
+
+
+def register_import(checksum: str) -> bool:
+    """
+    Records another import of an archived file, returns False if the file
+    isn't archived yet.
+    """
+    return bool(
+        ImportArchive.objects.filter(checksum=checksum).update(
+            import_count=F("import_count") + 1,
+            last_imported_at=timezone.now(),
+        )
+    )
+
+
+def create_archive(checksum, file_name, original_name, size, user) -> bool:
+    """
+    Records an archived file, returns False if a concurrent import archived
+    the same content first.
+    """
+    try:
+        with transaction.atomic():
+            ImportArchive.objects.create(
+                checksum=checksum,
+                file_name=file_name,
+                original_name=original_name,
+                size=size,
+                created_by=user,
+            )
+    except IntegrityError:
+        register_import(checksum)
+        return False
+    return True
+
+
+def archive_spooled_file(path, checksum, original_name, user) -> bool:
+    """
+    Uploads a spooled import file unless its content is already archived,
+    and removes the spool file. Returns whether the file was uploaded.
+
+    The spool file is kept when the upload fails, so the task can retry.
+    """
+    if register_import(checksum):
+        os.remove(path)
+        return False
+
+    file_name = get_archive_key(checksum, original_name)
+    with open(path, "rb") as file:
+        upload_file_in_storage(file, file_name)
+    # Same content, same key, a concurrent upload wrote the same bytes.
+    create_archive(
+        checksum, file_name, original_name, os.path.getsize(path), user
+    )
+    os.remove(path)
+    return True
+
+
+def delete_unarchived_file(file_name) -> bool:
+    """
+    Deletes an import file from the storage unless an archive refers to it,
+    returns whether it was deleted.
+    """
+    if ImportArchive.objects.filter(file_name=file_name).exists():
+        return False
+    delete_stored_file(file_name)
+    return True
+
+
+def archive_stored_file(file, file_name, user) -> bool:
+    """
+    Records an import file the browser uploaded straight to the storage,
+    the upload is deleted if its content is already archived. Returns
+    whether the upload was kept.
+    """
+    checksum = get_file_checksum(file)
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    if register_import(checksum) or not create_archive(
+        checksum, file_name, posixpath.basename(file_name), size, user
+    ):
+        delete_unarchived_file(file_name)
+        return False
+    return True
+
+
+def purge_expired_archives(now=None) -> int:
+    """
+    Deletes archives not imported within the retention period from the
+    storage and the database, and spool files left behind by failed tasks.
+    """
+    now = now or timezone.now()
+    expired = ImportArchive.objects.filter(
+        last_imported_at__lt=now
+        - timedelta(days=settings.IMPORT_ARCHIVE_RETENTION_DAYS)
+    )
+    count = 0
+    # delete_objects takes at most 1000 keys per call.
+    while batch := list(expired.values_list("id", "file_name")[:1000]):
+        ids, file_names = zip(*batch)
+        client_storage().delete_objects(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            Delete={
+                "Objects": [{"Key": file_name} for file_name in file_names],
+                "Quiet": True,
+            },
+        )
+        count += ImportArchive.objects.filter(id__in=ids).delete()[0]
+
+    if os.path.isdir(settings.IMPORT_ARCHIVE_SPOOL_DIR):
+        stale_before = time.time() - timedelta(days=1).total_seconds()
+        with os.scandir(settings.IMPORT_ARCHIVE_SPOOL_DIR) as entries:
+            for entry in entries:
+                if (
+                    entry.name.endswith(".spool")
+                    and entry.stat().st_mtime < stale_before
+                ):
+                    os.remove(entry.path)
+    return count
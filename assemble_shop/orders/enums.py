@@ -9,9 +9,26 @@ class OrderStatusEnum(BaseEnum):
     CANCELED = "Canceled"
 
 
+class DirectUploadEnum(BaseEnum):
+    IMPORT = "Product Import File"
+    IMAGE = "Product Image"
+
+
+class ExportFormatEnum(BaseEnum):
+    CSV = "CSV"
+    XLSX = "Excel"
+
+
+class ExportStatusEnum(BaseEnum):
+    PENDING = "Pending"
+    COMPLETED = "Completed"
+    FAILED = "Failed"
+
+
 class OrderFieldsEnum(BaseEnum):
     GENERAL_FIELDS = ORDER_FIELDS
     LIST_DISPLAY_FIELDS = ORDER_LIST_DISPLAY_FIELDS
+    LIST_ONLY_FIELDS = ORDER_LIST_ONLY_FIELDS
     TRACKING_FIELDS = ORDER_TRACKING_FIELDS
     READONLY_FIELDS = ORDER_READONLY_FIELDS
     LIST_SEARCH_FIELDS = ORDER_LIST_SEARCH_FIELDS
@@ -27,6 +44,13 @@ class OrderItemFieldsEnum(BaseEnum):
     READONLY_FIELDS = ORDER_ITEM_READONLY_FIELDS
 
 
+class OrderExportFieldsEnum(BaseEnum):
+    GENERAL_FIELDS = ORDER_EXPORT_FIELDS
+    LIST_DISPLAY_FIELDS = ORDER_EXPORT_LIST_DISPLAY_FIELDS
+    READONLY_FIELDS = ORDER_EXPORT_READONLY_FIELDS
+    LIST_FILTER_FIELDS = ORDER_EXPORT_LIST_FILTER_FIELDS
+
+
 class ProductTitleEnum(BaseEnum):
     DISCOUNT_INFO = "Discount Now"
 
@@ -44,11 +68,20 @@ class ProductFieldsEnum(BaseEnum):
 class ReviewFieldsEnum(BaseEnum):
     GENERAL_FIELDS = REVIEW_FIELDS
     LIST_DISPLAY_FIELDS = REVIEW_LIST_DISPLAY_FIELDS
+    LIST_ONLY_FIELDS = REVIEW_LIST_ONLY_FIELDS
     LIST_SEARCH_FIELDS = REVIEW_LIST_SEARCH_FIELDS
 
 
 class DiscountFieldsEnum(BaseEnum):
     GENERAL_FIELDS = DISCOUNT_FIELDS
     LIST_DISPLAY_FIELDS = DISCOUNT_LIST_DISPLAY_FIELDS
+    LIST_ONLY_FIELDS = DISCOUNT_LIST_ONLY_FIELDS
     LIST_SEARCH_FIELDS = DISCOUNT_LIST_SEARCH_FIELDS
     LIST_FILTER_FIELDS = DISCOUNT_LIST_FILTER_FIELDS
+
+
+class DiscountCampaignFieldsEnum(BaseEnum):
+    GENERAL_FIELDS = DISCOUNT_CAMPAIGN_FIELDS
+    LIST_DISPLAY_FIELDS = DISCOUNT_CAMPAIGN_LIST_DISPLAY_FIELDS
+    LIST_SEARCH_FIELDS = DISCOUNT_CAMPAIGN_LIST_SEARCH_FIELDS
+    LIST_FILTER_FIELDS = DISCOUNT_CAMPAIGN_LIST_FILTER_FIELDS
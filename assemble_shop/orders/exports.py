@@ -0,0 +1,248 @@
+"""
+Streaming exports of products and orders as CSV or Excel.
+
+Rows are read with a server-side cursor a chunk at a time and written as
+they arrive, so an export uses the same memory whatever its size. CSV is
+streamed to the client line by line. Excel files are zip archives that
+can only be finished once every row is written, openpyxl's write-only mode
+keeps the rows on disk until then and the file is streamed once saved. A
+sheet holds at most XLSX_MAX_ROWS rows, larger exports continue on new
+sheets.
+"""
+
+import csv
+import tempfile
+from collections.abc import Iterable, Iterator
+from datetime import date, timedelta
+
+import openpyxl
+from django.db import connections
+from django.db.models import OuterRef, Subquery
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from assemble_shop.base.routers import get_read_replica
+from assemble_shop.orders.enums import ExportFormatEnum, OrderStatusEnum
+from assemble_shop.orders.models import Discount
+from assemble_shop.orders.pricing import discounted_price, line_total_sql
+from assemble_shop.orders.utils import get_day_start
+
+ORDER_EXPORT_PREFIX = "exports/orders"
+EXPORT_CHUNK_SIZE = 2000
+CSV_LINES_PER_CHUNK = 500
+XLSX_READ_SIZE = 64 * 1024
+# Rows of an Excel sheet, the header included.
+XLSX_MAX_ROWS = 1_048_576
+COPY_CHUNK_SIZE = 64 * 1024
+# Makes Excel open CSV files as UTF-8.
+UTF8_BOM = "\ufeff"
+
+PRODUCT_EXPORT_FIELDS = ["id", "name", "price", "description", "inventory"]
+
+
+class Echo:
+    """
+    File-like object that returns what is written to it, so csv.writer
+    returns lines instead of writing them.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(headers: list[str], rows: Iterable) -> Iterator[bytes]:
+    writer = csv.writer(Echo())
+    lines = [UTF8_BOM + writer.writerow(headers)]
+    for row in rows:
+        lines.append(writer.writerow(row))
+        if len(lines) >= CSV_LINES_PER_CHUNK:
+            yield "".join(lines).encode()
+            lines = []
+    yield "".join(lines).encode()
+
+
+def iter_xlsx(headers: list[str], rows: Iterable) -> Iterator[bytes]:
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet, sheet_rows = None, XLSX_MAX_ROWS
+    for row in rows:
+        if sheet is None or sheet_rows >= XLSX_MAX_ROWS:
+            sheet, sheet_rows = workbook.create_sheet(), 1
+            sheet.append(headers)
+        sheet.append(row)
+        sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet().append(headers)
+    with tempfile.TemporaryFile() as file:
+        workbook.save(file)
+        file.seek(0)
+        while chunk := file.read(XLSX_READ_SIZE):
+            yield chunk
+
+
+EXPORT_FORMATS = {
+    ExportFormatEnum.CSV: (iter_csv, "text/csv", "csv"),
+    ExportFormatEnum.XLSX: (
+        iter_xlsx,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx",
+    ),
+}
+
+
+def file_response(
+    chunks: Iterable[bytes], export_format: ExportFormatEnum, file_name: str
+) -> StreamingHttpResponse:
+    """
+    Returns a response streaming an exported file as a download, file_name
+    is given without its extension.
+    """
+    _, content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response[
+        "Content-Disposition"
+    ] = f'attachment; filename="{file_name}.{extension}"'
+    return response
+
+
+def export_response(
+    headers: list[str],
+    rows: Iterable,
+    export_format: ExportFormatEnum,
+    file_name: str,
+) -> StreamingHttpResponse:
+    iter_file = EXPORT_FORMATS[export_format][0]
+    return file_response(iter_file(headers, rows), export_format, file_name)
+
+
+def get_product_export(
+    queryset, include_discount=False, include_rating=False
+) -> tuple[list[str], Iterator[tuple]]:
+    """
+    Returns the headers and rows of an export of products, optionally with
+    their rating and current discount.
+    """
+    fields = list(PRODUCT_EXPORT_FIELDS)
+    if include_rating:
+        fields.append("rating")
+    if include_discount:
+        queryset = queryset.annotate(
+            discount_percentage=Subquery(
+                Discount.objects.active()
+                .filter(product=OuterRef("pk"))
+                .values("discount_percentage")[:1]
+            )
+        )
+        fields.append("discount_percentage")
+
+    rows = (
+        queryset.using(get_read_replica())
+        .order_by("pk")
+        .values_list(*fields)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    if not include_discount:
+        return fields, rows
+    return fields + ["discounted_price"], (
+        (*row, discounted_price(row[2], row[-1]) if row[-1] else None)
+        for row in rows
+    )
+
+
+ORDER_EXPORT_QUERY = f"""
+SELECT
+    orders.id AS order_id,
+    orders.tracking_code::text,
+    orders.status,
+    orders.created_at AT TIME ZONE %(time_zone)s AS created_at,
+    users.email AS customer_email,
+    items.product_id,
+    products.name AS product_name,
+    items.quantity,
+    items.price,
+    items.discount_percentage,
+    {line_total_sql("items")} AS line_total,
+    orders.total_price AS order_total
+FROM orders
+JOIN order_items AS items ON items.order_id = orders.id
+JOIN products ON products.id = items.product_id
+LEFT JOIN users ON users.id = orders.created_by_id
+WHERE orders.status = %(status)s
+    AND orders.created_at >= %(since)s
+    AND orders.created_at < %(until)s
+ORDER BY orders.id, items.id
+"""
+
+
+class OrderItemExport:
+    """
+    Orders of a range of days with one row per item, the product and the
+    customer's email. Rows go from Postgres to the output without becoming
+    model instances: CSV is produced by COPY, Excel reads a server-side
+    cursor. row_count is set once the file is read to the end.
+    """
+
+    row_count: int | None = None
+
+    def __init__(
+        self,
+        since: date,
+        until: date,
+        status: str = OrderStatusEnum.COMPLETED.name,
+    ):
+        self.since = since
+        self.until = until
+        self.status = status
+
+    def get_params(self) -> dict:
+        return {
+            "time_zone": timezone.get_current_timezone_name(),
+            "status": self.status,
+            "since": get_day_start(self.since),
+            "until": get_day_start(self.until + timedelta(days=1)),
+        }
+
+    def iter_csv(self) -> Iterator[bytes]:
+        yield UTF8_BOM.encode()
+        buffer = bytearray()
+        with connections[get_read_replica()].cursor() as cursor:
+            with cursor.cursor.copy(
+                f"COPY ({ORDER_EXPORT_QUERY}) TO STDOUT WITH (FORMAT csv, HEADER)",
+                self.get_params(),
+            ) as copy:
+                # COPY sends a row at a time.
+                for data in copy:
+                    buffer += data
+                    if len(buffer) >= COPY_CHUNK_SIZE:
+                        yield bytes(buffer)
+                        buffer.clear()
+            self.row_count = cursor.rowcount
+        yield bytes(buffer)
+
+    def iter_rows(self) -> tuple[list[str], Iterator[tuple]]:
+        cursor = connections[get_read_replica()].chunked_cursor()
+        cursor.execute(ORDER_EXPORT_QUERY, self.get_params())
+        headers = [column.name for column in cursor.description]
+
+        def rows():
+            self.row_count = 0
+            try:
+                while chunk := cursor.fetchmany(EXPORT_CHUNK_SIZE):
+                    self.row_count += len(chunk)
+                    yield from chunk
+            finally:
+                cursor.close()
+
+        return headers, rows()
+
+    def iter_file(self, export_format: ExportFormatEnum) -> Iterator[bytes]:
+        if export_format == ExportFormatEnum.CSV:
+            return self.iter_csv()
+        return iter_xlsx(*self.iter_rows())
+
+
+def get_order_export_key(order_export) -> str:
+    extension = EXPORT_FORMATS[ExportFormatEnum[order_export.file_format]][2]
+    return (
+        f"{ORDER_EXPORT_PREFIX}/{order_export.pk}/"
+        f"orders_{order_export.since}_{order_export.until}.{extension}"
+    )
@@ -3,6 +3,7 @@
 PRODUCT_FIELDS = (
     "name",
     "image",
+    "image_thumbnail",
     "price",
     "discounted_price",
     "inventory",
@@ -15,7 +16,7 @@ PRODUCT_LIST_DISPLAY_FIELDS = (
     "inventory",
     "rating",
 )
-PRODUCT_TAGS = ("discounted_price",)
+PRODUCT_TAGS = ("discounted_price", "image_thumbnail")
 PRODUCT_LIST_SEARCH_FIELDS = ("name",)
 PRODUCT_DISCOUNT_NOW_FIELDS = (
     "get_discount_percentage",
@@ -36,6 +37,13 @@ ORDER_LIST_DISPLAY_FIELDS = (
     "total_price",
     "status",
 )
+# The tracking code is read when deleted orders invalidate their cache.
+ORDER_LIST_ONLY_FIELDS = (
+    "created_by__email",
+    "total_price",
+    "status",
+    "tracking_code",
+)
 ORDER_TRACKING_FIELDS = ("tracking_code",)
 ORDER_LIST_SEARCH_FIELDS = ("created_by__email", "tracking_code")
 ORDER_LIST_FILTER_FIELDS = ("status",)
@@ -55,6 +63,29 @@ ORDER_ITEM_READONLY_FIELDS = (
     "discount_percentage",
     "created_at",
 )
+# OrderExport Fields
+# ------------------------------------------------------------------------------
+ORDER_EXPORT_FIELDS = (
+    "since",
+    "until",
+    "file_format",
+)
+ORDER_EXPORT_READONLY_FIELDS = (
+    "status",
+    "row_count",
+    "finished_at",
+    "download_link",
+)
+ORDER_EXPORT_LIST_DISPLAY_FIELDS = (
+    "since",
+    "until",
+    "file_format",
+    "status",
+    "row_count",
+    "created_at",
+    "download_link",
+)
+ORDER_EXPORT_LIST_FILTER_FIELDS = ("status", "file_format")
 # Review Fields
 # ------------------------------------------------------------------------------
 REVIEW_FIELDS = (
@@ -67,6 +98,11 @@ REVIEW_LIST_DISPLAY_FIELDS = (
     "product",
     "rating",
 )
+REVIEW_LIST_ONLY_FIELDS = (
+    "created_by__email",
+    "product__name",
+    "rating",
+)
 REVIEW_LIST_SEARCH_FIELDS = ("product__name", "rating")
 # Discount Fields
 # ------------------------------------------------------------------------------
@@ -84,5 +120,31 @@ DISCOUNT_LIST_DISPLAY_FIELDS = (
     "end_date",
     "is_active",
 )
+DISCOUNT_LIST_ONLY_FIELDS = (
+    "product__name",
+    "discount_percentage",
+    "start_date",
+    "end_date",
+    "is_active",
+)
 DISCOUNT_LIST_SEARCH_FIELDS = ("product__name",)
 DISCOUNT_LIST_FILTER_FIELDS = ("is_active",)
+# DiscountCampaign Fields
+# ------------------------------------------------------------------------------
+DISCOUNT_CAMPAIGN_FIELDS = (
+    "name",
+    "products",
+    "discount_percentage",
+    "start_date",
+    "end_date",
+    "is_active",
+)
+DISCOUNT_CAMPAIGN_LIST_DISPLAY_FIELDS = (
+    "name",
+    "discount_percentage",
+    "start_date",
+    "end_date",
+    "is_active",
+)
+DISCOUNT_CAMPAIGN_LIST_SEARCH_FIELDS = ("name",)
+DISCOUNT_CAMPAIGN_LIST_FILTER_FIELDS = ("is_active",)
@@ -1,12 +1,70 @@
+import posixpath
+from types import SimpleNamespace
+
 from django import forms
+from django.utils.translation import gettext_lazy as _
 
-from assemble_shop.orders.models import Discount
+from assemble_shop.orders.enums import DirectUploadEnum
+from assemble_shop.orders.models import (
+    Discount,
+    DiscountCampaign,
+    ImportArchive,
+    OrderItem,
+    Product,
+)
+from assemble_shop.orders.uploads import is_upload_key_of
 from assemble_shop.orders.validation_stratgies import (
-    ValidateFileFormatExcel,
-    ValidateFileSizeExcel,
-    ValidateNoOverlappingDiscounts,
+    ValidateFileFormatImage,
+    ValidateFileFormatImport,
+    ValidateFileSizeImage,
+    ValidateFileSizeImport,
+    ValidateNoOverlappingCampaignDiscounts,
     ValidateStartDateBeforeEndDate,
 )
+from assemble_shop.utils import import_file
+from assemble_shop.utils.storage import get_stored_file_size
+
+
+class ProductChoiceField(forms.ModelChoiceField):
+    """
+    Product choice field which resolves its value from the products loaded
+    once for the whole formset when they are given.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.products: dict | None = None
+
+    def to_python(self, value):
+        if self.products is None or value in self.empty_values:
+            return super().to_python(value)
+        try:
+            return self.products[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+
+
+class OrderItemForm(forms.ModelForm):
+    class Meta:
+        model = OrderItem
+        fields = ("product", "quantity")
+        field_classes = {"product": ProductChoiceField}
+
+    def _get_validation_exclusions(self):
+        """
+        Skips model validation of a product resolved from the products loaded
+        by OrderItemFormset, which validates order products in bulk.
+        """
+        # Private in Django and missing from its stubs.
+        exclude = super()._get_validation_exclusions()  # type: ignore[misc]
+        product_field = self.fields.get("product")
+        if getattr(product_field, "products", None) is not None:
+            exclude.add("product")
+        return exclude
 
 
 class DiscountForm(forms.ModelForm):
@@ -20,23 +78,79 @@ class DiscountForm(forms.ModelForm):
         if self.errors:
             raise forms.ValidationError("Please enter the correct data.")
 
-        cleaned_data.update({"instance": self.instance})  # type: ignore
+        # Overlapping discounts are rejected by the exclusion constraint of
+        # Discount, which is validated with the model.
+        validations = (ValidateStartDateBeforeEndDate(),)
+        for validation in validations:
+            validation.validate(data=cleaned_data)
+
+        return cleaned_data
+
+
+class DiscountCampaignForm(forms.ModelForm):
+    class Meta:
+        model = DiscountCampaign
+        fields = "__all__"
+
+    def get_products(self, cleaned_data):
+        return cleaned_data.get("products")
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        if self.errors:
+            raise forms.ValidationError("Please enter the correct data.")
+
+        validation_data = {
+            **cleaned_data,  # type: ignore
+            "instance": self.instance,
+            "products": self.get_products(cleaned_data),
+        }
         validations = (
             ValidateStartDateBeforeEndDate(),
-            ValidateNoOverlappingDiscounts(),
+            ValidateNoOverlappingCampaignDiscounts(),
         )
         for validation in validations:
-            validation.validate(data=cleaned_data)
+            validation.validate(data=validation_data)
 
-        del cleaned_data["instance"]  # type: ignore
         return cleaned_data
 
 
+class ProductsDiscountCampaignForm(DiscountCampaignForm):
+    """
+    Campaign form for products selected in the product change list.
+    """
+
+    class Meta:
+        model = DiscountCampaign
+        fields = (
+            "name",
+            "discount_percentage",
+            "start_date",
+            "end_date",
+            "is_active",
+        )
+        widgets = {
+            "start_date": forms.DateTimeInput(attrs={"type": "datetime-local"}),
+            "end_date": forms.DateTimeInput(attrs={"type": "datetime-local"}),
+        }
+
+    def __init__(self, *args, products=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.products = products
+
+    def get_products(self, cleaned_data):
+        return self.products
+
+
 class UploadFileForm(forms.Form):
     file = forms.FileField(
-        widget=forms.ClearableFileInput(attrs={"accept": ".xls,.xlsx"}),
+        widget=forms.ClearableFileInput(
+            attrs={"accept": import_file.get_accepted_extensions()}
+        ),
         help_text=(
-            "Please upload an Excel file (.xls or .xlsx) containing the required data.<br>"
+            "Please upload an Excel (.xlsx) or CSV (.csv) file containing the required data. "
+            "Large files import much faster as CSV.<br>"
             "The file should include the following headers in the exact order:<br>"
             "<ol>"
             "  <li><strong>name</strong></li>"
@@ -53,10 +167,88 @@ class UploadFileForm(forms.Form):
         file = self.cleaned_data.get("file")
 
         validations = (
-            ValidateFileFormatExcel(),
-            ValidateFileSizeExcel(),
+            ValidateFileFormatImport(),
+            ValidateFileSizeImport(),
         )
         for validation in validations:
             validation.validate(data=file)
 
         return file
+
+
+DIRECT_UPLOAD_VALIDATIONS = {
+    DirectUploadEnum.IMPORT: (ValidateFileFormatImport, ValidateFileSizeImport),
+    DirectUploadEnum.IMAGE: (ValidateFileFormatImage, ValidateFileSizeImage),
+}
+
+
+class DirectUploadForm(forms.Form):
+    """
+    File the browser is about to upload straight to the storage bucket.
+    """
+
+    kind = forms.ChoiceField(choices=DirectUploadEnum.choices())
+    file_name = forms.CharField(max_length=200)
+    size = forms.IntegerField(min_value=1)
+
+    def clean_kind(self):
+        return DirectUploadEnum[self.cleaned_data["kind"]]
+
+    def clean(self):
+        super().clean()
+        cleaned_data = self.cleaned_data
+        if self.errors:
+            return cleaned_data
+
+        file = SimpleNamespace(
+            name=cleaned_data["file_name"], size=cleaned_data["size"]
+        )
+        for validation in DIRECT_UPLOAD_VALIDATIONS[cleaned_data["kind"]]:
+            validation().validate(data=file)
+
+        return cleaned_data
+
+
+class CompleteDirectUploadForm(forms.Form):
+    """
+    Upload the browser finished, identified by the key it was given.
+    """
+
+    kind = forms.ChoiceField(choices=DirectUploadEnum.choices())
+    key = forms.CharField(max_length=500)
+    product = forms.ModelChoiceField(
+        queryset=Product.objects.all(), required=False
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+
+    def clean_kind(self):
+        return DirectUploadEnum[self.cleaned_data["kind"]]
+
+    def clean(self):
+        super().clean()
+        cleaned_data = self.cleaned_data
+        if self.errors:
+            return cleaned_data
+
+        kind, key = cleaned_data["kind"], cleaned_data["key"]
+        if not is_upload_key_of(kind, self.user, key):
+            raise forms.ValidationError(_("Unknown upload."))
+        if (
+            kind == DirectUploadEnum.IMPORT
+            and ImportArchive.objects.filter(file_name=key).exists()
+        ):
+            raise forms.ValidationError(_("This file was already imported."))
+        if kind == DirectUploadEnum.IMAGE and not cleaned_data["product"]:
+            raise forms.ValidationError(_("Field Product is required."))
+
+        size = get_stored_file_size(key)
+        if size is None:
+            raise forms.ValidationError(_("The file was not uploaded."))
+        file = SimpleNamespace(name=posixpath.basename(key), size=size)
+        for validation in DIRECT_UPLOAD_VALIDATIONS[kind]:
+            validation().validate(data=file)
+
+        return cleaned_data
@@ -1,7 +1,12 @@
+from collections import defaultdict
+from functools import cached_property
+
 from django.forms import ValidationError
 from django.forms.models import BaseInlineFormSet
 from django.utils.translation import gettext_lazy as _
 
+from assemble_shop.orders.forms import ProductChoiceField
+from assemble_shop.orders.models import Product
 from assemble_shop.orders.validation_stratgies import (
     ProductRequiredValidation,
     QuantityValidation,
@@ -10,6 +15,27 @@ from assemble_shop.orders.validation_stratgies import (
 
 
 class OrderItemFormset(BaseInlineFormSet):
+    @cached_property
+    def products(self) -> dict:
+        """
+        Loads every product referenced by the submitted forms in one query.
+        """
+        if not self.is_bound:
+            return {}
+
+        product_ids = set()
+        for i in range(self.total_form_count()):
+            value = self.data.get(f"{self.add_prefix(i)}-product")
+            if value and str(value).isdigit():
+                product_ids.add(int(value))
+        return Product.objects.in_bulk(product_ids)
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        product_field = form.fields.get("product")
+        if self.is_bound and isinstance(product_field, ProductChoiceField):
+            product_field.products = self.products
+
     def clean(self):
         super().clean()
 
@@ -21,8 +47,8 @@ class OrderItemFormset(BaseInlineFormSet):
         validations = [
             ProductRequiredValidation(),
             QuantityValidation(),
-            StockValidation(),
         ]
+        forms_by_product = defaultdict(list)
         for form in self.forms:
             if form.cleaned_data.get("DELETE"):
                 continue
@@ -32,3 +58,53 @@ class OrderItemFormset(BaseInlineFormSet):
                     validation_strategy.validate(data=form.cleaned_data)
                 except ValidationError as e:
                     form.add_error(None, e)
+
+            if product := form.cleaned_data.get("product"):
+                forms_by_product[product].append(form)
+
+        self.validate_unique_products(forms_by_product)
+
+        stock_validation = StockValidation()
+        for product, product_forms in forms_by_product.items():
+            quantity = sum(
+                form.cleaned_data.get("quantity") or 0 for form in product_forms
+            )
+            try:
+                stock_validation.validate(
+                    data={"product": product, "quantity": quantity}
+                )
+            except ValidationError as e:
+                for form in product_forms:
+                    form.add_error(None, e)
+
+    def validate_unique_products(self, forms_by_product: dict) -> None:
+        """
+        Checks that no product is repeated in the formset and, in one query,
+        that none is already in the order as an item which is not edited by
+        this formset. Order products aren't part of the model validation of
+        the forms, which would otherwise check this.
+        """
+        for product, product_forms in forms_by_product.items():
+            for form in product_forms[1:]:
+                form.add_error(
+                    None,
+                    _(f"Product {product} is added more than once."),
+                )
+
+        if not self.instance.pk or not forms_by_product:
+            return
+
+        existing_items = dict(
+            self.instance.items.filter(
+                product__in=list(forms_by_product)
+            ).values_list("product_id", "id")
+        )
+        edited_item_ids = {form.instance.pk for form in self.initial_forms}
+        for product, product_forms in forms_by_product.items():
+            item_id = existing_items.get(product.pk)
+            if item_id and item_id not in edited_item_ids:
+                for form in product_forms:
+                    form.add_error(
+                        None,
+                        _(f"Product {product} is already in this order."),
+                    )
@@ -0,0 +1,73 @@
+"""
+Resized renditions of product images.
+
+Renditions are stored next to the original under a key derived from its
+name, image_products/chair.jpg gets image_products/chair.thumbnail.webp,
+image_products/chair.thumbnail.jpeg and so on.
+"""
+
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Bounding boxes, images are scaled down to fit and never scaled up.
+RENDITION_SIZES = {
+    "thumbnail": (150, 150),
+    "small": (400, 400),
+    "medium": (800, 800),
+}
+RENDITION_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+RENDITION_QUALITY = 80
+
+
+def get_rendition_name(image_name: str, rendition: str, extension: str) -> str:
+    stem = posixpath.splitext(image_name)[0]
+    return f"{stem}.{rendition}.{extension}"
+
+
+def encode_rendition(image: Image.Image, image_format: str) -> bytes:
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    output = BytesIO()
+    image.save(output, image_format, quality=RENDITION_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def generate_renditions(image_file) -> dict[str, dict[str, str]]:
+    """
+    Renders every size and format of an image field file into its storage,
+    replacing earlier renditions of the same original, and returns their
+    names by rendition and extension.
+    """
+    storage = image_file.storage
+    with image_file.open("rb"), Image.open(image_file) as original:
+        # Phones store the orientation in EXIF instead of rotating pixels.
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ("RGB", "RGBA"):
+            original = original.convert("RGBA")
+
+        renditions: dict[str, dict[str, str]] = {}
+        for rendition, size in RENDITION_SIZES.items():
+            resized = original.copy()
+            resized.thumbnail(size, Image.Resampling.LANCZOS)
+            renditions[rendition] = {}
+            for extension, image_format in RENDITION_FORMATS.items():
+                name = get_rendition_name(image_file.name, rendition, extension)
+                if storage.exists(name):
+                    storage.delete(name)
+                renditions[rendition][extension] = storage.save(
+                    name, ContentFile(encode_rendition(resized, image_format))
+                )
+    return renditions
+
+
+def get_rendition_urls(image_file, renditions: dict) -> dict[str, dict]:
+    return {
+        rendition: {
+            extension: image_file.storage.url(name)
+            for extension, name in names.items()
+        }
+        for rendition, names in renditions.items()
+    }
@@ -0,0 +1,276 @@
+"""
+Validation and creation of the products of an import file.
+
+Rows are validated a chunk at a time: every column of a chunk is coerced in
+one pass and its names are checked against the database with one query, so
+large files don't pay for model validation and a query per row. Errors are
+collected in an ImportReport with the row they are on, and nothing is
+created unless the whole file is valid.
+"""
+
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import cast
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from assemble_shop.orders.models import Product
+from assemble_shop.utils import import_file
+
+IMPORT_HEADERS = ["name", "price", "description", "inventory"]
+IMPORT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 50
+
+NAME_MAX_LENGTH = cast(int, Product._meta.get_field("name").max_length)
+PRICE_MAX = Decimal(10) ** (
+    Product._meta.get_field("price").max_digits
+    - Product._meta.get_field("price").decimal_places
+)
+CENT = Decimal("0.01")
+INVENTORY_MAX = 2147483647
+
+
+class ImportReport:
+    """
+    Errors of an import file by row, the header is row 1. Only the first
+    MAX_REPORTED_ERRORS errors are kept, all of them are counted.
+    """
+
+    def __init__(self):
+        self.row_count = 0
+        self.error_count = 0
+        self.errors: list[tuple[int, str, str]] = []
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.error_count
+
+    def add_error(self, row: int, column: str, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row, column, message))
+
+    def get_messages(self) -> list[str]:
+        messages = [
+            f"Row {row}, {column}: {message}"
+            # Chunks are validated a column at a time.
+            for row, column, message in sorted(
+                self.errors, key=lambda error: error[0]
+            )
+        ]
+        if self.error_count > len(self.errors):
+            messages.append(
+                f"{self.error_count - len(self.errors)} more errors were "
+                "not listed."
+            )
+        return messages
+
+
+def coerce_names(values, row_numbers, report) -> list[str | None]:
+    names: list[str | None] = []
+    for value, row in zip(values, row_numbers):
+        name: str | None = str(value).strip() if value is not None else ""
+        if not name:
+            report.add_error(row, "name", "This field is required.")
+            name = None
+        elif len(name) > NAME_MAX_LENGTH:
+            report.add_error(
+                row,
+                "name",
+                f"Ensure this value has at most {NAME_MAX_LENGTH} characters.",
+            )
+            name = None
+        names.append(name)
+    return names
+
+
+def coerce_prices(values, row_numbers, report) -> list[Decimal | None]:
+    prices: list[Decimal | None] = []
+    for value, row in zip(values, row_numbers):
+        if value is None:
+            report.add_error(row, "price", "This field is required.")
+            prices.append(None)
+            continue
+        try:
+            # str() keeps Excel floats like 19.99 from turning into
+            # 19.989999999999998436805981327779591083526611328125.
+            price = Decimal(str(value).strip())
+        except InvalidOperation:
+            price = None
+        if price is None or not price.is_finite():
+            report.add_error(row, "price", "Enter a number.")
+            price = None
+        elif price < 0:
+            report.add_error(row, "price", "Price must not be negative.")
+            price = None
+        elif price >= PRICE_MAX:
+            report.add_error(
+                row, "price", f"Price must be less than {PRICE_MAX}."
+            )
+            price = None
+        elif price != price.quantize(CENT):
+            report.add_error(
+                row, "price", "Price must not have more than 2 decimal places."
+            )
+            price = None
+        prices.append(price)
+    return prices
+
+
+def coerce_inventories(values, row_numbers, report) -> list[int | None]:
+    inventories: list[int | None] = []
+    for value, row in zip(values, row_numbers):
+        if value is None:
+            inventories.append(0)
+            continue
+        try:
+            number = Decimal(str(value).strip())
+            inventory: int | None = (
+                int(number) if number == number.to_integral() else None
+            )
+        except (InvalidOperation, OverflowError):
+            inventory = None
+        if inventory is None:
+            report.add_error(row, "inventory", "Enter a whole number.")
+        elif not 0 <= inventory <= INVENTORY_MAX:
+            report.add_error(
+                row,
+                "inventory",
+                f"Inventory must be between 0 and {INVENTORY_MAX}.",
+            )
+            inventory = None
+        inventories.append(inventory)
+    return inventories
+
+
+def check_duplicate_names(names, row_numbers, report, seen_names: set):
+    """
+    Reports names repeated in the file or already taken by a product, with
+    a single query for the chunk.
+    """
+    existing = set(
+        Product.objects.filter(
+            name__in={name for name in names if name}
+        ).values_list("name", flat=True)
+    )
+    for name, row in zip(names, row_numbers):
+        if name is None:
+            continue
+        if name in seen_names:
+            report.add_error(
+                row, "name", f"{name} appears more than once in the file."
+            )
+        elif name in existing:
+            report.add_error(
+                row, "name", f"A product named {name} already exists."
+            )
+        seen_names.add(name)
+
+
+def validate_chunk(chunk, first_row, report, seen_names) -> tuple:
+    """
+    Validates a chunk of rows and returns its coerced columns, which are
+    only complete if the report has no errors. Empty rows are skipped.
+    """
+    row_numbers, rows = [], []
+    for row_number, row in enumerate(chunk, first_row):
+        row = (tuple(row) + (None,) * len(IMPORT_HEADERS))[
+            : len(IMPORT_HEADERS)
+        ]
+        if any(value not in (None, "") for value in row):
+            row_numbers.append(row_number)
+            rows.append(row)
+    if not rows:
+        return [], [], [], []
+
+    report.row_count += len(rows)
+    name_values, price_values, description_values, inventory_values = zip(*rows)
+    names = coerce_names(name_values, row_numbers, report)
+    prices = coerce_prices(price_values, row_numbers, report)
+    descriptions = [str(value) if value else "" for value in description_values]
+    inventories = coerce_inventories(inventory_values, row_numbers, report)
+    check_duplicate_names(names, row_numbers, report, seen_names)
+    return names, prices, descriptions, inventories
+
+
+def iter_valid_chunks(rows, report, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Validates rows a chunk at a time and yields the columns of every chunk
+    until an error is found, the rest of the rows are only validated.
+    """
+    rows = iter(rows)
+    seen_names: set[str] = set()
+    first_row = 2
+    while chunk := list(islice(rows, chunk_size)):
+        columns = validate_chunk(chunk, first_row, report, seen_names)
+        first_row += len(chunk)
+        if report.is_valid and columns[0]:
+            yield columns
+
+
+INSERT_PRODUCTS_QUERY = """
+INSERT INTO products (
+    name, price, description, inventory, image_renditions,
+    created_by_id, created_at, updated_at
+)
+SELECT
+    name, price, description, inventory, '{}'::jsonb,
+    %(user_id)s, %(now)s, %(now)s
+FROM unnest(
+    %(names)s::text[],
+    %(prices)s::numeric[],
+    %(descriptions)s::text[],
+    %(inventories)s::integer[]
+) AS rows (name, price, description, inventory);
+"""
+
+
+def insert_products(columns, user) -> int:
+    """
+    Inserts a chunk of products from its columns with a single statement,
+    without building a model instance per row.
+    """
+    names, prices, descriptions, inventories = columns
+    with connection.cursor() as cursor:
+        cursor.execute(
+            INSERT_PRODUCTS_QUERY,
+            {
+                "user_id": user.pk,
+                "now": timezone.now(),
+                "names": list(names),
+                "prices": list(prices),
+                "descriptions": list(descriptions),
+                "inventories": list(inventories),
+            },
+        )
+        return cursor.rowcount
+
+
+def import_products_from_file(
+    file, user, file_name: str | None = None, content_type=None
+) -> ImportReport:
+    """
+    Creates the products of an import file and returns its report. Raises
+    ValidationError with the errors of the report if any row is invalid,
+    in which case no product is created.
+    """
+    headers, rows = import_file.get_data(file, file_name, content_type)
+    if headers != IMPORT_HEADERS:
+        raise ValidationError(
+            _(
+                "Headers in the uploaded file are incorrect. "
+                f"Expected headers are: {', '.join(IMPORT_HEADERS)}. "
+                "Please ensure the file includes these headers in the exact order."
+            )
+        )
+
+    report = ImportReport()
+    with transaction.atomic():
+        for columns in iter_valid_chunks(rows, report):
+            insert_products(columns, user)
+        if not report.is_valid:
+            raise ValidationError(report.get_messages())
+    return report
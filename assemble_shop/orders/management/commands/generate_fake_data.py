@@ -0,0 +1,364 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from multiprocessing import Pool
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from faker import Faker
+
+from assemble_shop.orders.enums import OrderStatusEnum
+from assemble_shop.orders.models import Discount, Order, Product
+from assemble_shop.orders.utils import (
+    refresh_leaderboards,
+    rollup_product_sales,
+    update_order_total_price_in_range,
+    update_products_rating,
+)
+from assemble_shop.users.models import User
+
+ORDER_COLUMNS = (
+    "id",
+    "created_by_id",
+    "updated_by_id",
+    "created_at",
+    "updated_at",
+    "status",
+    "tracking_code",
+)
+ORDER_ITEM_COLUMNS = (
+    "order_id",
+    "product_id",
+    "quantity",
+    "price",
+    "discount_percentage",
+    "created_at",
+)
+REVIEW_COLUMNS = (
+    "product_id",
+    "created_by_id",
+    "created_at",
+    "updated_at",
+    "rating",
+    "comment",
+)
+
+# Shared read-only data for order workers, filled once per process.
+_worker_context: dict = {}
+
+
+def copy_rows(table: str, columns: tuple, rows: list) -> None:
+    """
+    Writes rows into the table with Postgres COPY.
+    """
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    with connection.cursor() as cursor:
+        with cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def init_order_worker(context: dict) -> None:
+    _worker_context.update(context)
+
+
+def generate_order_chunk(chunk_index: int, size: int) -> tuple[int, int]:
+    """
+    Creates a chunk of orders with their items, seeded by the chunk index
+    so the result doesn't depend on which process runs it.
+    Returns the lowest and highest order id of the chunk.
+    """
+    context = _worker_context
+    rng = random.Random(f"{context['seed']}-orders-{chunk_index}")
+    product_ids = context["product_ids"]
+    max_items = min(context["max_items"], len(product_ids))
+    statuses = [status.name for status in OrderStatusEnum]
+    now = context["now"]
+    orders, items = [], []
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence('orders', 'id')) "
+                "FROM generate_series(1, %s)",
+                [size],
+            )
+            order_ids = [row[0] for row in cursor.fetchall()]
+
+        for order_id in order_ids:
+            customer_id = rng.choice(context["user_ids"])
+            created_at = now - timedelta(
+                seconds=rng.randrange(context["days"] * 86400)
+            )
+            orders.append(
+                (
+                    order_id,
+                    customer_id,
+                    customer_id,
+                    created_at,
+                    created_at,
+                    rng.choice(statuses),
+                    uuid.UUID(int=rng.getrandbits(128), version=4),
+                )
+            )
+            for product_id in rng.sample(
+                product_ids, rng.randint(1, max_items)
+            ):
+                discount_percentage = None
+                if discount := context["discounts"].get(product_id):
+                    percentage, start_date, end_date = discount
+                    if start_date <= created_at <= end_date:
+                        discount_percentage = percentage
+
+                items.append(
+                    (
+                        order_id,
+                        product_id,
+                        rng.randint(1, 5),
+                        context["prices"][product_id],
+                        discount_percentage,
+                        created_at,
+                    )
+                )
+
+        copy_rows("orders", ORDER_COLUMNS, orders)
+        copy_rows("order_items", ORDER_ITEM_COLUMNS, items)
+
+    return min(order_ids), max(order_ids)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates users, products, discounts, orders, order items and "
+        "reviews at a configurable scale for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--discounts", type=int, default=100)
+        parser.add_argument("--orders", type=int, default=10000)
+        parser.add_argument(
+            "--max-items",
+            type=int,
+            default=5,
+            help="Maximum number of items in each order.",
+        )
+        parser.add_argument("--reviews", type=int, default=1000)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Spread orders over this many past days.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes used to generate orders.",
+        )
+        parser.add_argument(
+            "--password",
+            default=None,
+            help="Password of generated users, unusable when not given.",
+        )
+
+    def log(self, message, started_at):
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(self.style.SUCCESS(f"{message} ({elapsed:.2f}s)"))
+
+    def create_users(self, fake, options) -> list[int]:
+        domain = f"seed{options['seed']}.example.com"
+        password = make_password(options["password"])
+        users = (
+            User(
+                email=f"{fake.user_name()}.{i}@{domain}",
+                name=fake.name(),
+                password=password,
+            )
+            for i in range(options["users"])
+        )
+        User.objects.bulk_create(
+            users, batch_size=options["batch_size"], ignore_conflicts=True
+        )
+        return list(
+            User.objects.filter(email__endswith=f"@{domain}")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    def create_products(self, fake, rng, user_ids, options) -> dict:
+        prefix = f"S{options['seed']}-"
+        products = (
+            Product(
+                created_by_id=rng.choice(user_ids),
+                name=f"{prefix}{i} {fake.company()}"[:225],
+                price=Decimal(rng.randrange(100, 100000)) / 100,
+                inventory=rng.randrange(10, 1000),
+                description=fake.sentence(),
+            )
+            for i in range(options["products"])
+        )
+        Product.objects.bulk_create(
+            products, batch_size=options["batch_size"], ignore_conflicts=True
+        )
+        return dict(
+            Product.objects.filter(name__startswith=prefix)
+            .order_by("id")
+            .values_list("id", "price")
+        )
+
+    def create_discounts(self, rng, user_ids, product_ids, options) -> dict:
+        sample = rng.sample(
+            product_ids, min(options["discounts"], len(product_ids))
+        )
+        discounted = set(
+            Discount.objects.filter(product_id__in=sample).values_list(
+                "product_id", flat=True
+            )
+        )
+        now = timezone.now()
+        discounts = []
+        for product_id in sample:
+            if product_id in discounted:
+                continue
+            start_date = now - timedelta(days=rng.randrange(options["days"]))
+            discounts.append(
+                Discount(
+                    created_by_id=rng.choice(user_ids),
+                    product_id=product_id,
+                    discount_percentage=Decimal(rng.randrange(100, 5000)) / 100,
+                    start_date=start_date,
+                    end_date=start_date + timedelta(days=rng.randint(1, 60)),
+                    is_active=True,
+                )
+            )
+        Discount.objects.bulk_create(
+            discounts, batch_size=options["batch_size"]
+        )
+        return {
+            product_id: (percentage, start_date, end_date)
+            for product_id, percentage, start_date, end_date in (
+                Discount.objects.filter(
+                    product_id__in=product_ids, is_active=True
+                ).values_list(
+                    "product_id",
+                    "discount_percentage",
+                    "start_date",
+                    "end_date",
+                )
+            )
+        }
+
+    def create_orders(self, context, options) -> tuple[int, int] | None:
+        total, batch_size = options["orders"], options["batch_size"]
+        jobs = [
+            (index, min(batch_size, total - start))
+            for index, start in enumerate(range(0, total, batch_size))
+        ]
+        if not jobs:
+            return None
+
+        if options["workers"] > 1:
+            # Forked workers must open their own database connections.
+            connections.close_all()
+            with Pool(
+                options["workers"],
+                initializer=init_order_worker,
+                initargs=(context,),
+            ) as pool:
+                ranges = pool.starmap(generate_order_chunk, jobs)
+        else:
+            init_order_worker(context)
+            ranges = [generate_order_chunk(*job) for job in jobs]
+
+        return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+    def create_reviews(self, fake, rng, user_ids, product_ids, options):
+        now = timezone.now()
+        batch = []
+        for _ in range(options["reviews"]):
+            created_at = now - timedelta(
+                seconds=rng.randrange(options["days"] * 86400)
+            )
+            batch.append(
+                (
+                    rng.choice(product_ids),
+                    rng.choice(user_ids),
+                    created_at,
+                    created_at,
+                    rng.randint(1, 5),
+                    fake.sentence(),
+                )
+            )
+            if len(batch) >= options["batch_size"]:
+                copy_rows("reviews", REVIEW_COLUMNS, batch)
+                batch = []
+        copy_rows("reviews", REVIEW_COLUMNS, batch)
+
+    def handle(self, *args, **options):
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1.")
+
+        fake = Faker()
+        fake.seed_instance(options["seed"])
+        rng = random.Random(options["seed"])
+        started_at = time.monotonic()
+
+        with transaction.atomic():
+            user_ids = self.create_users(fake, options)
+            self.log(f"Users ready: {len(user_ids)}", started_at)
+            if not user_ids:
+                return
+            # Orders of a seed get the same tracking codes on every run.
+            if Order.objects.filter(created_by_id__in=user_ids).exists():
+                raise CommandError(
+                    f"Orders for seed {options['seed']} already exist, "
+                    "use another --seed."
+                )
+
+            prices = self.create_products(fake, rng, user_ids, options)
+            product_ids = list(prices)
+            self.log(f"Products ready: {len(product_ids)}", started_at)
+            if not product_ids:
+                return
+
+            discounts = self.create_discounts(
+                rng, user_ids, product_ids, options
+            )
+            self.log(f"Active discounts: {len(discounts)}", started_at)
+
+        order_range = self.create_orders(
+            context={
+                "seed": options["seed"],
+                "days": options["days"],
+                "max_items": options["max_items"],
+                "now": timezone.now(),
+                "user_ids": user_ids,
+                "product_ids": product_ids,
+                "prices": prices,
+                "discounts": discounts,
+            },
+            options=options,
+        )
+        self.log(f"Orders created: {options['orders']}", started_at)
+
+        with transaction.atomic():
+            self.create_reviews(fake, rng, user_ids, product_ids, options)
+            self.log(f"Reviews created: {options['reviews']}", started_at)
+
+            if order_range:
+                update_order_total_price_in_range(*order_range)
+            update_products_rating()
+            self.log("Order totals and product ratings updated", started_at)
+
+            today = timezone.localdate()
+            rollup_product_sales(today - timedelta(days=options["days"]), today)
+            refresh_leaderboards()
+            self.log("Daily product sales and leaderboards ready", started_at)
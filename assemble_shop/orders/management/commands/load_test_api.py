@@ -0,0 +1,95 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+ENDPOINTS = {
+    "top-selling": ("info_top_selling", "async_info_top_selling"),
+    "monthly-income": ("info_monthly_income", "async_info_monthly_income"),
+    "customers-orders": (
+        "info_history_customers_orders",
+        "async_info_history_customers_orders",
+    ),
+    "top-rated-products": ("info_top_products", "async_info_top_products"),
+}
+
+
+def send_request(url: str, token: str | None, timeout: float) -> bool:
+    request = Request(url)
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status == 200
+    except OSError:
+        return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of the sync and async orders API endpoints "
+        "against a running server, e.g. uvicorn with the same worker count."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url", default="http://localhost:8000", type=str
+        )
+        parser.add_argument(
+            "--endpoint",
+            choices=ENDPOINTS,
+            action="append",
+            help="Endpoints to test, all of them by default.",
+        )
+        parser.add_argument(
+            "--token", type=str, default=None, help="JWT access token."
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="Number of requests in flight at the same time.",
+        )
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def measure(self, url: str, options) -> tuple[float, int]:
+        started_at = time.monotonic()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            results = list(
+                executor.map(
+                    lambda _: send_request(
+                        url, options["token"], options["timeout"]
+                    ),
+                    range(options["requests"]),
+                )
+            )
+        elapsed = time.monotonic() - started_at
+        return len(results) / elapsed, results.count(False)
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        base_url = options["base_url"].rstrip("/")
+        for endpoint in options["endpoint"] or ENDPOINTS:
+            rates = []
+            for url_name in ENDPOINTS[endpoint]:
+                url = base_url + reverse(f"orders:{url_name}")
+                # Warm up connections and caches before measuring.
+                send_request(url, options["token"], options["timeout"])
+                rate, failures = self.measure(url, options)
+                rates.append(rate)
+                self.stdout.write(
+                    f"{endpoint} [{url_name}]: {rate:.1f} req/s, "
+                    f"{failures} failed"
+                )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{endpoint}: async/sync throughput "
+                    f"{rates[1] / rates[0]:.2f}x"
+                )
+            )
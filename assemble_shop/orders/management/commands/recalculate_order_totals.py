@@ -0,0 +1,159 @@
+import time
+from collections import defaultdict
+from decimal import Decimal
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min
+
+from assemble_shop.orders.models import Order
+from assemble_shop.orders.pricing import order_total
+from assemble_shop.orders.utils import update_order_total_price_in_range
+
+ORDER_ITEMS_EXPORT_QUERY = """
+COPY (
+    SELECT order_id, quantity, price, discount_percentage
+    FROM order_items
+    WHERE order_id BETWEEN {start_id} AND {end_id}
+) TO STDOUT
+"""
+ORDER_TOTALS_EXPORT_QUERY = """
+COPY (
+    SELECT id, total_price
+    FROM orders
+    WHERE id BETWEEN {start_id} AND {end_id}
+) TO STDOUT
+"""
+
+
+def export_rows(query: str, start_id: int, end_id: int):
+    """
+    Streams the rows of a COPY export for an order id range.
+    """
+    with connection.cursor() as cursor:
+        with cursor.copy(
+            query.format(start_id=int(start_id), end_id=int(end_id))
+        ) as copy:
+            yield from copy.rows()
+
+
+def recalculate_range(start_id: int, end_id: int) -> int:
+    with transaction.atomic():
+        return update_order_total_price_in_range(start_id, end_id)
+
+
+def audit_range(start_id: int, end_id: int) -> list[int]:
+    """
+    Recomputes totals of an order id range with the pricing engine from a
+    COPY export and returns the ids of orders whose stored total doesn't match.
+    """
+    items_by_order: dict = defaultdict(list)
+    for order_id, quantity, price, discount_percentage in export_rows(
+        ORDER_ITEMS_EXPORT_QUERY, start_id, end_id
+    ):
+        items_by_order[int(order_id)].append(
+            (quantity, price, discount_percentage)
+        )
+
+    mismatched_ids = []
+    for order_id, total_price in export_rows(
+        ORDER_TOTALS_EXPORT_QUERY, start_id, end_id
+    ):
+        expected = order_total(items_by_order.get(int(order_id), ()))
+        stored = Decimal(total_price) if total_price is not None else None
+        if stored != expected:
+            mismatched_ids.append(int(order_id))
+    return mismatched_ids
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculates total price of orders in id ranges with set-based "
+        "statements, optionally in parallel worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start-id", type=int, default=None)
+        parser.add_argument("--end-id", type=int, default=None)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of order ids in each range.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes used to recalculate ranges.",
+        )
+        parser.add_argument(
+            "--audit",
+            action="store_true",
+            help="Verify stored totals against a recomputation in Python.",
+        )
+        parser.add_argument(
+            "--skip-update",
+            action="store_true",
+            help="Only audit the stored totals.",
+        )
+
+    def get_ranges(self, options) -> list[tuple[int, int]]:
+        bounds = Order.objects.aggregate(min_id=Min("id"), max_id=Max("id"))
+        start_id = options["start_id"] or bounds["min_id"]
+        end_id = options["end_id"] or bounds["max_id"]
+        if start_id is None or end_id is None:
+            return []
+
+        batch_size = options["batch_size"]
+        return [
+            (range_start, min(range_start + batch_size - 1, end_id))
+            for range_start in range(start_id, end_id + 1, batch_size)
+        ]
+
+    def run(self, function, ranges, workers) -> list:
+        if workers > 1:
+            # Forked workers must open their own database connections.
+            connections.close_all()
+            with Pool(workers) as pool:
+                return pool.starmap(function, ranges)
+        return [function(*id_range) for id_range in ranges]
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        started_at = time.monotonic()
+        ranges = self.get_ranges(options)
+
+        if not options["skip_update"]:
+            updated = sum(
+                self.run(recalculate_range, ranges, options["workers"])
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Recalculated {updated} orders in {len(ranges)} ranges "
+                    f"({time.monotonic() - started_at:.2f}s)."
+                )
+            )
+
+        if options["audit"] or options["skip_update"]:
+            mismatched_ids = [
+                order_id
+                for range_ids in self.run(
+                    audit_range, ranges, options["workers"]
+                )
+                for order_id in range_ids
+            ]
+            if mismatched_ids:
+                raise CommandError(
+                    f"{len(mismatched_ids)} orders have incorrect totals, "
+                    f"first ids: {mismatched_ids[:10]}"
+                )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Audit passed, all stored totals match "
+                    f"({time.monotonic() - started_at:.2f}s)."
+                )
+            )
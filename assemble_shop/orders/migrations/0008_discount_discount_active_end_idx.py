@@ -0,0 +1,18 @@
+# Generated by Django 5.0.9 on 2026-10-19 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0007_discountcampaign"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="discount",
+            index=models.Index(fields=["is_active", "end_date"], name="discount_active_end_idx"),
+        ),
+    ]
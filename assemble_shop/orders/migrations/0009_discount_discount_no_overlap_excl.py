@@ -0,0 +1,69 @@
+# Generated by Django 5.0.9 on 2026-10-19 12:07
+
+import assemble_shop.orders.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.conf import settings
+from django.db import IntegrityError, migrations
+
+OVERLAPPING_DISCOUNTS_SQL = """
+SELECT earlier.product_id, earlier.id, later.id
+FROM discounts AS earlier
+JOIN discounts AS later
+    ON later.product_id = earlier.product_id
+    AND later.id > earlier.id
+    AND tstzrange(earlier.start_date, earlier.end_date, '[]')
+        && tstzrange(later.start_date, later.end_date, '[]')
+ORDER BY 1, 2, 3;
+"""
+
+
+def check_overlapping_discounts(apps, schema_editor):
+    # Overlaps were only rejected by the admin form before. Which discount
+    # of an overlap applies decides past and pending order prices, so they
+    # are reported instead of being changed here.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPPING_DISCOUNTS_SQL)
+        overlaps = cursor.fetchall()
+    if overlaps:
+        raise IntegrityError(
+            "Discounts of the same product overlap, fix or delete them before "
+            "adding discount_no_overlap_excl: "
+            + ", ".join(
+                f"product {product_id}: discounts {first_id} and {second_id}"
+                for product_id, first_id, second_id in overlaps
+            )
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0008_discount_discount_active_end_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(check_overlapping_discounts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="discount",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    ("product", "="),
+                    (
+                        assemble_shop.orders.models.TsTzRange(
+                            "start_date",
+                            "end_date",
+                            django.contrib.postgres.fields.ranges.RangeBoundary(
+                                inclusive_lower=True, inclusive_upper=True
+                            ),
+                        ),
+                        "&&",
+                    ),
+                ],
+                name="discount_no_overlap_excl",
+                violation_error_message="This product already has an overlapping discount.",
+            ),
+        ),
+    ]
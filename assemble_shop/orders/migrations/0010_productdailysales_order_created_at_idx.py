@@ -0,0 +1,88 @@
+# Generated by Django 5.0.9 on 2026-10-19 12:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Fills the rollup with the sales of every existing order, the periodic
+# task only rebuilds the last days.
+BACKFILL_PRODUCT_DAILY_SALES_SQL = """
+INSERT INTO product_daily_sales (product_id, day, status, quantity, revenue)
+SELECT
+    items.product_id,
+    (orders.created_at AT TIME ZONE %s)::date,
+    orders.status,
+    SUM(items.quantity),
+    COALESCE(
+        SUM(
+            items.quantity *
+            CASE
+                WHEN items.discount_percentage IS NOT NULL
+                THEN ROUND(items.price * (1 - items.discount_percentage / 100), 2)
+                ELSE items.price
+            END
+        ),
+        0
+    )
+FROM order_items AS items
+JOIN orders ON orders.id = items.order_id
+GROUP BY 1, 2, 3;
+"""
+
+
+def backfill_product_daily_sales(apps, schema_editor):
+    schema_editor.execute(BACKFILL_PRODUCT_DAILY_SALES_SQL, [settings.TIME_ZONE])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0009_discount_discount_no_overlap_excl"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductDailySales",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField(verbose_name="Day")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("CONFIRMED", "Confirmed"),
+                            ("COMPLETED", "Completed"),
+                            ("CANCELED", "Canceled"),
+                        ],
+                        max_length=50,
+                        verbose_name="Order Status",
+                    ),
+                ),
+                ("quantity", models.PositiveBigIntegerField(default=0)),
+                ("revenue", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                "db_table": "product_daily_sales",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["created_at"], name="order_created_at_idx"),
+        ),
+        migrations.AddField(
+            model_name="productdailysales",
+            name="product",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_sales",
+                to="orders.product",
+                verbose_name="Product",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="productdailysales",
+            constraint=models.UniqueConstraint(fields=("day", "status", "product"), name="product_daily_sales_unique"),
+        ),
+        migrations.RunPython(backfill_product_daily_sales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,143 @@
+# Generated by Django 5.0.9 on 2026-10-19 12:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+TOP_RATED_PRODUCTS_SQL = """
+CREATE MATERIALIZED VIEW top_rated_products_leaderboard AS
+SELECT
+    id AS product_id,
+    ROW_NUMBER() OVER (ORDER BY rating DESC, id) AS rank,
+    rating
+FROM products
+WHERE rating IS NOT NULL
+ORDER BY rank
+LIMIT 100;
+CREATE UNIQUE INDEX top_rated_products_leaderboard_product_idx
+    ON top_rated_products_leaderboard (product_id);
+"""
+
+TOP_SELLING_PRODUCTS_SQL = """
+CREATE MATERIALIZED VIEW top_selling_products_leaderboard AS
+SELECT
+    product_id,
+    ROW_NUMBER() OVER (ORDER BY SUM(quantity) DESC, product_id) AS rank,
+    SUM(quantity)::bigint AS total_quantity,
+    SUM(revenue) AS revenue
+FROM product_daily_sales
+WHERE status <> 'CANCELED'
+GROUP BY product_id
+ORDER BY rank
+LIMIT 100;
+CREATE UNIQUE INDEX top_selling_products_leaderboard_product_idx
+    ON top_selling_products_leaderboard (product_id);
+"""
+
+TOP_CUSTOMERS_SQL = """
+CREATE MATERIALIZED VIEW top_customers_leaderboard AS
+SELECT
+    created_by_id AS customer_id,
+    ROW_NUMBER() OVER (
+        ORDER BY SUM(total_price) DESC NULLS LAST, created_by_id
+    ) AS rank,
+    SUM(total_price) AS income,
+    SUM(SUM(total_price)) OVER () AS total_income
+FROM orders
+WHERE status = 'COMPLETED' AND created_at >= NOW() - INTERVAL '1 month'
+GROUP BY created_by_id
+ORDER BY rank
+LIMIT 100;
+CREATE UNIQUE INDEX top_customers_leaderboard_customer_idx
+    ON top_customers_leaderboard (customer_id);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0010_productdailysales_order_created_at_idx"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TopCustomer",
+            fields=[
+                (
+                    "customer",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="income_leaderboard",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("rank", models.PositiveIntegerField()),
+                ("income", models.DecimalField(decimal_places=2, max_digits=14, null=True)),
+                ("total_income", models.DecimalField(decimal_places=2, max_digits=14, null=True)),
+            ],
+            options={
+                "db_table": "top_customers_leaderboard",
+                "ordering": ["rank"],
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="TopRatedProduct",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="rating_leaderboard",
+                        serialize=False,
+                        to="orders.product",
+                    ),
+                ),
+                ("rank", models.PositiveIntegerField()),
+                ("rating", models.DecimalField(decimal_places=2, max_digits=3)),
+            ],
+            options={
+                "db_table": "top_rated_products_leaderboard",
+                "ordering": ["rank"],
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="TopSellingProduct",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="sales_leaderboard",
+                        serialize=False,
+                        to="orders.product",
+                    ),
+                ),
+                ("rank", models.PositiveIntegerField()),
+                ("total_quantity", models.PositiveBigIntegerField()),
+                ("revenue", models.DecimalField(decimal_places=2, max_digits=14)),
+            ],
+            options={
+                "db_table": "top_selling_products_leaderboard",
+                "ordering": ["rank"],
+                "managed": False,
+            },
+        ),
+        migrations.RunSQL(
+            TOP_RATED_PRODUCTS_SQL,
+            "DROP MATERIALIZED VIEW top_rated_products_leaderboard;",
+        ),
+        migrations.RunSQL(
+            TOP_SELLING_PRODUCTS_SQL,
+            "DROP MATERIALIZED VIEW top_selling_products_leaderboard;",
+        ),
+        migrations.RunSQL(
+            TOP_CUSTOMERS_SQL,
+            "DROP MATERIALIZED VIEW top_customers_leaderboard;",
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.9 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0011_leaderboards"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="image_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name="Image Renditions"),
+        ),
+    ]
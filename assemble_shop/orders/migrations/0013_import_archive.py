@@ -0,0 +1,57 @@
+# Generated by Django 5.0.9 on 2026-10-19 12:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0012_product_image_renditions"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportArchive",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now_add=True)),
+                ("checksum", models.CharField(max_length=64, unique=True, verbose_name="SHA-256 Checksum")),
+                ("file_name", models.CharField(max_length=500, verbose_name="Storage Key")),
+                ("original_name", models.CharField(max_length=255, verbose_name="Original File Name")),
+                ("size", models.PositiveBigIntegerField(verbose_name="Size")),
+                ("import_count", models.PositiveIntegerField(default=1, verbose_name="Import Count")),
+                (
+                    "last_imported_at",
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name="Last Imported At"),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="%(class)s_created_by",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Created By",
+                    ),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="%(class)s_updated_by",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Updated By",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "import_archives",
+                "indexes": [models.Index(fields=["last_imported_at"], name="import_archive_imported_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.0.9 on 2026-10-19 13:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0013_import_archive"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderExport",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now_add=True)),
+                ("since", models.DateField(verbose_name="From")),
+                ("until", models.DateField(verbose_name="Until")),
+                (
+                    "file_format",
+                    models.CharField(
+                        choices=[("CSV", "CSV"), ("XLSX", "Excel")],
+                        default="CSV",
+                        max_length=10,
+                        verbose_name="Format",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PENDING", "Pending"), ("COMPLETED", "Completed"), ("FAILED", "Failed")],
+                        default="PENDING",
+                        editable=False,
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "file_name",
+                    models.CharField(blank=True, editable=False, max_length=500, verbose_name="Storage Key"),
+                ),
+                ("row_count", models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name="Rows")),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, editable=False, null=True, verbose_name="Finished At"),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="%(class)s_created_by",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Created By",
+                    ),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="%(class)s_updated_by",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Updated By",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "order_exports",
+            },
+        ),
+    ]
@@ -1,18 +1,67 @@
 import uuid
-from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    DateTimeRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramSimilarity,
+)
+from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import F, Q
+from django.db.models.functions import Upper
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from assemble_shop.base.models import BaseModel
-from assemble_shop.orders.enums import DiscountFieldsEnum, OrderStatusEnum
+from assemble_shop.orders import pricing
+from assemble_shop.orders.enums import (
+    DiscountFieldsEnum,
+    ExportFormatEnum,
+    ExportStatusEnum,
+    OrderStatusEnum,
+)
 
 User = get_user_model()
 
 
+SEARCH_CONFIG = "english"
+
+
+class ProductQuerySet(models.QuerySet):
+    def search(self, term: str):
+        """
+        Products matching a search term, best matches first. Words are
+        matched against the name and description with full-text search,
+        parts of names and misspelled names with trigrams.
+        """
+        query = SearchQuery(term, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            self.alias(upper_name=Upper("name"))
+            .annotate(
+                rank=SearchRank(F("search_vector"), query),
+                similarity=TrigramSimilarity("name", term),
+            )
+            .filter(
+                Q(search_vector=query)
+                | Q(name__icontains=term)
+                | Q(upper_name__trigram_similar=term.upper())
+            )
+            .order_by("-rank", "-similarity", "pk")
+        )
+
+
 class Product(BaseModel):
     name = models.CharField(
         verbose_name=_("Product Name"), max_length=225, unique=True
@@ -20,6 +69,14 @@ class Product(BaseModel):
     image = models.ImageField(
         upload_to="image_products/", blank=True, null=True
     )
+    # Names of the resized copies of image by rendition and extension,
+    # filled in by the generate_product_image_renditions task.
+    image_renditions = models.JSONField(
+        verbose_name=_("Image Renditions"),
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     price = models.DecimalField(
         verbose_name=_("Price"), max_digits=10, decimal_places=2
     )
@@ -34,21 +91,25 @@ class Product(BaseModel):
         blank=True,
         null=True,
     )
+    search_vector = models.GeneratedField(
+        expression=SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = ProductQuerySet.as_manager()
 
     @property
     def discount_now(self):
-        time_now = timezone.now()
-        return self.discounts.filter(
-            start_date__lte=time_now, end_date__gte=time_now, is_active=True
-        ).first()
+        return self.discounts.active().first()
 
     @property
     def discounted_price(self):
         if discount := self.discount_now:
-            discounted_price = self.price * (
-                1 - (discount.discount_percentage / 100)
+            return pricing.discounted_price(
+                self.price, discount.discount_percentage
             )
-            return Decimal(discounted_price).quantize(Decimal("0.01"))
         return
 
     def get_attribute_discount(self, attribute):
@@ -59,7 +120,16 @@ class Product(BaseModel):
 
     class Meta:
         db_table = "products"
-        indexes = [models.Index(fields=["name"], name="product_name_idx")]
+        indexes = [
+            models.Index(fields=["name"], name="product_name_idx"),
+            GinIndex(fields=["search_vector"], name="product_search_idx"),
+            # icontains compares UPPER(name), trigram lookups in search()
+            # go through the same expression to share the index.
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="product_name_trgm_idx",
+            ),
+        ]
 
 
 # ‌  set attributes discounts for Products
@@ -116,6 +186,7 @@ class Order(BaseModel):
                 fields=["tracking_code"], name="order_tracking_code_idx"
             ),
             models.Index(fields=["status"], name="order_status_idx"),
+            models.Index(fields=["created_at"], name="order_created_at_idx"),
         ]
 
 
@@ -159,6 +230,122 @@ class OrderItem(models.Model):
         unique_together = ("order", "product")
 
 
+class ProductDailySales(models.Model):
+    """
+    Sales of a product per day and order status, rolled up from order items
+    so top-sellers over past days don't scan the whole order history.
+    """
+
+    product = models.ForeignKey(
+        Product,
+        verbose_name=_("Product"),
+        related_name="daily_sales",
+        on_delete=models.CASCADE,
+    )
+    day = models.DateField(verbose_name=_("Day"))
+    status = models.CharField(
+        verbose_name=_("Order Status"),
+        max_length=50,
+        choices=OrderStatusEnum.choices(),
+    )
+    quantity = models.PositiveBigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.product} {self.day} {self.status}"
+
+    class Meta:
+        db_table = "product_daily_sales"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "status", "product"],
+                name="product_daily_sales_unique",
+            )
+        ]
+
+
+class ImportArchive(BaseModel):
+    """
+    Product import file kept in the storage, once per distinct content.
+    Importing the same file again only bumps last_imported_at, which the
+    retention policy counts from.
+    """
+
+    checksum = models.CharField(
+        verbose_name=_("SHA-256 Checksum"), max_length=64, unique=True
+    )
+    file_name = models.CharField(verbose_name=_("Storage Key"), max_length=500)
+    original_name = models.CharField(
+        verbose_name=_("Original File Name"), max_length=255
+    )
+    size = models.PositiveBigIntegerField(verbose_name=_("Size"))
+    import_count = models.PositiveIntegerField(
+        verbose_name=_("Import Count"), default=1
+    )
+    last_imported_at = models.DateTimeField(
+        verbose_name=_("Last Imported At"), default=timezone.now
+    )
+
+    def __str__(self):
+        return self.original_name
+
+    class Meta:
+        db_table = "import_archives"
+        indexes = [
+            models.Index(
+                fields=["last_imported_at"],
+                name="import_archive_imported_idx",
+            )
+        ]
+
+
+class OrderExport(BaseModel):
+    """
+    Export of the completed orders of a range of days with their items,
+    written to the storage by the export_orders task.
+    """
+
+    since = models.DateField(verbose_name=_("From"))
+    until = models.DateField(verbose_name=_("Until"))
+    file_format = models.CharField(
+        verbose_name=_("Format"),
+        max_length=10,
+        choices=ExportFormatEnum.choices(),
+        default=ExportFormatEnum.CSV.name,
+    )
+    status = models.CharField(
+        verbose_name=_("Status"),
+        max_length=10,
+        choices=ExportStatusEnum.choices(),
+        default=ExportStatusEnum.PENDING.name,
+        editable=False,
+    )
+    file_name = models.CharField(
+        verbose_name=_("Storage Key"),
+        max_length=500,
+        blank=True,
+        editable=False,
+    )
+    row_count = models.PositiveIntegerField(
+        verbose_name=_("Rows"), null=True, blank=True, editable=False
+    )
+    finished_at = models.DateTimeField(
+        verbose_name=_("Finished At"), null=True, blank=True, editable=False
+    )
+
+    def clean(self):
+        if self.since and self.until and self.until < self.since:
+            raise ValidationError(
+                {"until": _("The end date must not be before the start date.")}
+            )
+
+    def __str__(self):
+        return f"Orders {self.since} - {self.until}"
+
+    class Meta:
+        db_table = "order_exports"
+
+
 class Review(BaseModel):
     product = models.ForeignKey(
         Product,
@@ -178,6 +365,63 @@ class Review(BaseModel):
         db_table = "reviews"
 
 
+class DiscountCampaign(BaseModel):
+    name = models.CharField(verbose_name=_("Campaign Name"), max_length=225)
+    products = models.ManyToManyField(
+        Product,
+        verbose_name=_("Products"),
+        related_name="campaigns",
+        blank=True,
+    )
+    discount_percentage = models.DecimalField(
+        verbose_name=_("Discount Percentage"),
+        max_digits=5,
+        decimal_places=2,
+        validators=[MaxValueValidator(100), MinValueValidator(1)],
+    )
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    is_active = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.name} - off {self.discount_percentage} %"
+
+    class Meta:
+        db_table = "discount_campaigns"
+
+
+class TsTzRange(models.Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+def discount_period():
+    """
+    Inclusive period of a discount, the expression of the overlap constraint.
+    """
+    return TsTzRange(
+        "start_date",
+        "end_date",
+        RangeBoundary(inclusive_lower=True, inclusive_upper=True),
+    )
+
+
+class DiscountQuerySet(models.QuerySet):
+    def active(self, at=None):
+        """
+        Active discounts at the given time, served by the overlap constraint
+        index.
+        """
+        return self.alias(period=discount_period()).filter(
+            period__contains=at or timezone.now(), is_active=True
+        )
+
+    def overlapping(self, start_date, end_date):
+        return self.alias(period=discount_period()).filter(
+            period__overlap=DateTimeTZRange(start_date, end_date, "[]")
+        )
+
+
 class Discount(BaseModel):
     product = models.ForeignKey(
         Product,
@@ -194,15 +438,124 @@ class Discount(BaseModel):
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     is_active = models.BooleanField(default=False)
+    campaign = models.ForeignKey(
+        DiscountCampaign,
+        verbose_name=_("Campaign"),
+        related_name="discounts",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+
+    objects = DiscountQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.product} - off {self.discount_percentage} %"
 
+    def validate_constraints(self, exclude=None):
+        # A period can't be built when the start date is later than the end
+        # date, the form validation reports that case.
+        if (
+            self.start_date
+            and self.end_date
+            and self.start_date > self.end_date
+        ):
+            exclude = {*(exclude or ()), "start_date", "end_date"}
+        super().validate_constraints(exclude=exclude)
+
     class Meta:
         db_table = "discounts"
+        constraints = [
+            ExclusionConstraint(
+                name="discount_no_overlap_excl",
+                expressions=[
+                    ("product", RangeOperators.EQUAL),
+                    (discount_period(), RangeOperators.OVERLAPS),
+                ],
+                violation_error_message=_(
+                    "This product already has an overlapping discount."
+                ),
+            )
+        ]
         indexes = [
             models.Index(
                 fields=["is_active", "start_date", "end_date"],
                 name="discount_active_idx",
-            )
+            ),
+            models.Index(
+                fields=["is_active", "end_date"],
+                name="discount_active_end_idx",
+            ),
         ]
+
+
+# Rows kept in each leaderboard materialized view.
+LEADERBOARD_SIZE = 100
+
+
+class TopRatedProduct(models.Model):
+    """
+    Products with the best rating, read from a materialized view refreshed
+    by the refresh_leaderboards task.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        related_name="rating_leaderboard",
+        on_delete=models.DO_NOTHING,
+    )
+    rank = models.PositiveIntegerField()
+    rating = models.DecimalField(max_digits=3, decimal_places=2)
+
+    class Meta:
+        managed = False
+        db_table = "top_rated_products_leaderboard"
+        ordering = ["rank"]
+
+
+class TopSellingProduct(models.Model):
+    """
+    Products with the most sold items in orders that weren't canceled, read
+    from a materialized view over the daily product sales rollup.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        related_name="sales_leaderboard",
+        on_delete=models.DO_NOTHING,
+    )
+    rank = models.PositiveIntegerField()
+    total_quantity = models.PositiveBigIntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        managed = False
+        db_table = "top_selling_products_leaderboard"
+        ordering = ["rank"]
+
+
+class TopCustomer(models.Model):
+    """
+    Customers with the highest income of completed orders in the past month,
+    read from a materialized view. total_income is the income of all
+    customers, not only of those in the leaderboard.
+    """
+
+    customer = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name="income_leaderboard",
+        on_delete=models.DO_NOTHING,
+    )
+    rank = models.PositiveIntegerField()
+    income = models.DecimalField(max_digits=14, decimal_places=2, null=True)
+    total_income = models.DecimalField(
+        max_digits=14, decimal_places=2, null=True
+    )
+
+    class Meta:
+        managed = False
+        db_table = "top_customers_leaderboard"
+        ordering = ["rank"]
@@ -0,0 +1,64 @@
+"""
+Pricing rules of order items shared by the Python and SQL paths.
+
+A discounted unit price is rounded to cents (half up, like Postgres ROUND)
+before it is multiplied by the quantity, so the total shown for an item in
+the admin and the total stored on the order always agree.
+"""
+
+from collections.abc import Iterable
+from decimal import ROUND_HALF_UP, Decimal
+
+CENT = Decimal("0.01")
+
+# (quantity, price, discount_percentage)
+LineItem = tuple[int, Decimal | None, Decimal | None]
+
+
+def to_decimal(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def discounted_price(price, discount_percentage=None) -> Decimal:
+    """
+    Returns the unit price after the discount, rounded to cents.
+    """
+    price = to_decimal(price)
+    if discount_percentage is None:
+        return price
+    discounted = price * (1 - to_decimal(discount_percentage) / 100)
+    return discounted.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def line_total(quantity, price, discount_percentage=None) -> Decimal:
+    return int(quantity) * discounted_price(price, discount_percentage)
+
+
+def order_total(items: Iterable[LineItem]) -> Decimal | None:
+    """
+    Returns the total of the order items or None for an order without items,
+    like SUM over no rows in SQL. Items without a price are skipped, as SUM
+    skips their NULL line totals.
+    """
+    total = None
+    for quantity, price, discount_percentage in items:
+        if price is None:
+            continue
+        total = (total or Decimal(0)) + line_total(
+            quantity, price, discount_percentage
+        )
+    return total
+
+
+def line_total_sql(alias: str = "items") -> str:
+    """
+    Returns the SQL expression of line_total for the order items table alias.
+    """
+    return f"""
+    {alias}.quantity *
+    CASE
+        WHEN {alias}.discount_percentage IS NOT NULL
+        THEN ROUND({alias}.price * (1 - {alias}.discount_percentage / 100), 2)
+        ELSE {alias}.price
+    END
+    """
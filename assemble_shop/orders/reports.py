@@ -0,0 +1,157 @@
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from django.db import connections
+from django.utils import timezone
+
+from assemble_shop.base.routers import get_read_replica
+from assemble_shop.orders.enums import OrderStatusEnum
+from assemble_shop.orders.pricing import line_total_sql
+from assemble_shop.orders.utils import get_day_start
+
+CUSTOMER_INCOME_QUERY = """
+SELECT
+    orders.created_by_id,
+    users.email,
+    SUM(orders.total_price) AS income,
+    SUM(SUM(orders.total_price)) OVER () AS total_income
+FROM orders
+LEFT JOIN users ON users.id = orders.created_by_id
+WHERE orders.status = %(status)s
+    AND orders.created_at >= %(since)s
+    AND (%(until)s::timestamptz IS NULL OR orders.created_at < %(until)s)
+GROUP BY orders.created_by_id, users.email
+ORDER BY income DESC NULLS LAST, orders.created_by_id;
+"""
+
+
+class CustomerIncomeReport:
+    """
+    Income of orders created in a period grouped by customer.
+
+    The grand total is a window over the grouped rows, so the total, the
+    top customers and every customer's total come from one query.
+    """
+
+    def __init__(
+        self,
+        since: datetime,
+        until: datetime | None = None,
+        top: int = 5,
+        status: str = OrderStatusEnum.COMPLETED.name,
+    ):
+        self.since = since
+        self.until = until
+        self.top = top
+        self.status = status
+
+    def fetch(self) -> list[tuple]:
+        with connections[get_read_replica()].cursor() as cursor:
+            cursor.execute(
+                CUSTOMER_INCOME_QUERY,
+                {
+                    "status": self.status,
+                    "since": self.since,
+                    "until": self.until,
+                },
+            )
+            return cursor.fetchall()
+
+    def run(self) -> dict:
+        """
+        Returns the total income, the top customers and the totals of all
+        customers ordered by income.
+        """
+        rows = self.fetch()
+        customer_totals = [
+            {"created_by_id": created_by_id, "email": email, "income": income}
+            for created_by_id, email, income, _ in rows
+        ]
+        return {
+            "total_income": rows[0][3] if rows else None,
+            "top_customers": customer_totals[: self.top],
+            "customer_totals": customer_totals,
+        }
+
+
+TOP_SELLING_QUERY = f"""
+WITH sales AS (
+    SELECT product_id, quantity, revenue
+    FROM product_daily_sales
+    WHERE (%(since_day)s::date IS NULL OR day >= %(since_day)s)
+        AND day < %(today)s
+        AND status = ANY(%(statuses)s)
+    UNION ALL
+    SELECT
+        items.product_id,
+        items.quantity,
+        COALESCE({line_total_sql("items")}, 0)
+    FROM order_items AS items
+    JOIN orders ON orders.id = items.order_id
+    WHERE orders.created_at >= %(today_start)s
+        AND orders.status = ANY(%(statuses)s)
+)
+SELECT
+    products.id,
+    products.name,
+    products.price,
+    SUM(sales.quantity)::bigint AS total_quantity,
+    SUM(sales.revenue) AS revenue
+FROM sales
+JOIN products ON products.id = sales.product_id
+GROUP BY products.id
+ORDER BY total_quantity DESC, products.id
+LIMIT %(top)s;
+"""
+
+
+class TopSellingReport:
+    """
+    Best selling products of the last days with their name, price and
+    revenue.
+
+    Past days are read from the product_daily_sales rollup and only today's
+    orders are aggregated from order items.
+    """
+
+    def __init__(
+        self,
+        days: int | None = None,
+        statuses: Iterable[str] | None = None,
+        top: int = 6,
+    ):
+        self.days = days
+        self.statuses = sorted(statuses or ()) or [
+            status.name
+            for status in OrderStatusEnum
+            if status != OrderStatusEnum.CANCELED
+        ]
+        self.top = top
+
+    def fetch(self) -> list[tuple]:
+        today = timezone.localdate()
+        since_day = today - timedelta(days=self.days - 1) if self.days else None
+        with connections[get_read_replica()].cursor() as cursor:
+            cursor.execute(
+                TOP_SELLING_QUERY,
+                {
+                    "since_day": since_day,
+                    "today": today,
+                    "today_start": get_day_start(today),
+                    "statuses": self.statuses,
+                    "top": self.top,
+                },
+            )
+            return cursor.fetchall()
+
+    def run(self) -> list[dict]:
+        return [
+            {
+                "product_id": product_id,
+                "name": name,
+                "price": price,
+                "total_quantity": total_quantity,
+                "revenue": revenue,
+            }
+            for product_id, name, price, total_quantity, revenue in self.fetch()
+        ]
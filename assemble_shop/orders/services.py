@@ -1,45 +1,155 @@
+from collections.abc import Iterable
+
+from asgiref.sync import sync_to_async
 from dateutil.relativedelta import relativedelta  # type: ignore
-from django.db.models import Sum
 from django.utils import timezone
 
-from assemble_shop.orders.enums import OrderStatusEnum
-from assemble_shop.orders.models import Order, OrderItem, Product
+from assemble_shop.base.routers import get_read_replica
+from assemble_shop.orders.models import (
+    LEADERBOARD_SIZE,
+    Order,
+    Product,
+    TopCustomer,
+    TopSellingProduct,
+)
+from assemble_shop.orders.reports import CustomerIncomeReport, TopSellingReport
 
 
 class OrderService:
     @staticmethod
-    def get_top_selling():
-        return (
-            OrderItem.objects.values("product_id")
-            .annotate(total_quantity=Sum("quantity"))
-            .order_by("-total_quantity")[:6]
+    def get_top_selling_leaderboard():
+        return TopSellingProduct.objects.using(
+            get_read_replica()
+        ).select_related("product")
+
+    @staticmethod
+    def format_top_selling(row: TopSellingProduct) -> dict:
+        return {
+            "product_id": row.product_id,
+            "name": row.product.name,
+            "price": row.product.price,
+            "total_quantity": row.total_quantity,
+            "revenue": row.revenue,
+        }
+
+    @staticmethod
+    def get_top_selling(
+        days: int | None = None,
+        statuses: Iterable[str] | None = None,
+        top: int = 6,
+    ):
+        if days or statuses or top > LEADERBOARD_SIZE:
+            return TopSellingReport(days=days, statuses=statuses, top=top).run()
+        return [
+            OrderService.format_top_selling(row)
+            for row in OrderService.get_top_selling_leaderboard()[:top]
+        ]
+
+    @staticmethod
+    def get_top_customers_leaderboard():
+        return TopCustomer.objects.using(get_read_replica()).select_related(
+            "customer"
         )
 
-    def get_monthly_income(self):
-        past_month = timezone.now() - relativedelta(months=1)
-        query_income_path_month = (
-            Order.objects.filter(
-                created_at__gte=past_month,
-                status=OrderStatusEnum.COMPLETED.name,
-            )
-            .values("created_by_id")
-            .annotate(month_income=Sum("total_price"))
-            .order_by("-month_income")
-        )
-        sum_income_orders_path_month = query_income_path_month.aggregate(
-            total_income=Sum("total_price")
-        )["total_income"]
-        top_five_customers = query_income_path_month[:5]
+    @staticmethod
+    def format_monthly_income(total_income, top_customers: list[dict]) -> dict:
         return {
-            "income_path_month": sum_income_orders_path_month,
-            "top_five_customers": top_five_customers,
+            "income_path_month": total_income,
+            "top_five_customers": [
+                {
+                    "created_by_id": customer["created_by_id"],
+                    "email": customer["email"],
+                    "month_income": customer["income"],
+                }
+                for customer in top_customers
+            ],
         }
 
+    @staticmethod
+    def format_top_customers(top_customers: list[TopCustomer]) -> dict:
+        return OrderService.format_monthly_income(
+            top_customers[0].total_income if top_customers else None,
+            [
+                {
+                    "created_by_id": row.customer_id,
+                    "email": row.customer.email,
+                    "income": row.income,
+                }
+                for row in top_customers
+            ],
+        )
+
+    @staticmethod
+    def get_customer_income_report(months: int, top: int):
+        return CustomerIncomeReport(
+            since=timezone.now() - relativedelta(months=months), top=top
+        )
+
+    def get_monthly_income(self, months: int = 1, top: int = 5):
+        if months == 1 and top <= LEADERBOARD_SIZE:
+            return self.format_top_customers(
+                list(self.get_top_customers_leaderboard()[:top])
+            )
+
+        report = self.get_customer_income_report(months, top).run()
+        return self.format_monthly_income(
+            report["total_income"], report["top_customers"]
+        )
+
     def get_customers_orders(self, customer_id):
-        return Order.objects.filter(created_by_id=customer_id)
+        return Order.objects.using(get_read_replica()).filter(
+            created_by_id=customer_id
+        )
 
     def get_top_rated_products(self):
-        return Product.objects.all().order_by("-rating")[:5]
+        return (
+            Product.objects.using(get_read_replica())
+            .filter(rating_leaderboard__isnull=False)
+            .order_by("rating_leaderboard__rank")[:5]
+        )
+
+    async def aget_top_selling(
+        self,
+        days: int | None = None,
+        statuses: Iterable[str] | None = None,
+        top: int = 6,
+    ):
+        if days or statuses or top > LEADERBOARD_SIZE:
+            # Reports run raw SQL, which has no async interface.
+            report = TopSellingReport(days=days, statuses=statuses, top=top)
+            return await sync_to_async(report.run)()
+        return [
+            self.format_top_selling(row)
+            async for row in self.get_top_selling_leaderboard()[:top]
+        ]
+
+    async def aget_monthly_income(self, months: int = 1, top: int = 5):
+        if months == 1 and top <= LEADERBOARD_SIZE:
+            return self.format_top_customers(
+                [
+                    row
+                    async for row in self.get_top_customers_leaderboard()[:top]
+                ]
+            )
+
+        report = await sync_to_async(
+            self.get_customer_income_report(months, top).run
+        )()
+        return self.format_monthly_income(
+            report["total_income"], report["top_customers"]
+        )
+
+    def get_customers_orders_with_items(self, customer_id):
+        # Prefetched up front, nested serializers can't query lazily in
+        # an async context.
+        return (
+            self.get_customers_orders(customer_id)
+            .prefetch_related("items__product")
+            .order_by("-created_at")
+        )
+
+    async def aget_top_rated_products(self):
+        return [product async for product in self.get_top_rated_products()]
 
     def recent_orders(self):
         pass
@@ -1,10 +1,13 @@
 from decimal import Decimal
 
+from django.db import transaction
 from django.db.models import Avg
 from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from .models import *
+from .tasks import generate_product_image_renditions
+from .tracking import invalidate_order_tracking
 from .utils import (
     get_pending_order_ids_for_product,
     update_order_total_price,
@@ -90,6 +93,10 @@ def capture_old_product_instance(sender, instance, **kwargs):
     before saving any changes.
     """
     instance._old_instance = Product.objects.filter(pk=instance.pk).first()
+    old_image = instance._old_instance.image if instance._old_instance else None
+    if old_image != instance.image:
+        # Renditions of the previous image must not be served for this one.
+        instance.image_renditions = {}
 
 
 @receiver(post_save, sender=Product)
@@ -107,3 +114,28 @@ def update_orders_after_product_change(sender, instance, **kwargs):
                 data={"price": instance.price},
                 order_ids=order_ids,
             )
+
+
+@receiver(post_save, sender=Product)
+def generate_renditions_after_image_change(sender, instance, **kwargs):
+    """
+    Queues the resized renditions of a new or replaced product image once
+    the product is committed.
+    """
+    old_instance = getattr(instance, "_old_instance", None)
+    old_image = old_instance.image if old_instance else None
+    if instance.image and old_image != instance.image:
+        transaction.on_commit(
+            lambda: generate_product_image_renditions.delay(instance.pk)
+        )
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_tracking_after_order_change(sender, instance, **kwargs):
+    """
+    Drops the cached tracking status of a saved or deleted order.
+    """
+    update_fields = kwargs.get("update_fields")
+    if update_fields is None or "status" in update_fields:
+        invalidate_order_tracking([instance.tracking_code])
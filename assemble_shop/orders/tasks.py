@@ -1,11 +1,40 @@
+import tempfile
 from datetime import timedelta
 
 from celery import shared_task
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.utils import timezone
 
-from .enums import OrderStatusEnum
-from .models import Order
+from assemble_shop.users.models import User
+from assemble_shop.utils.storage import (
+    download_file_from_storage,
+    upload_stream_in_storage,
+)
+
+from .archives import (
+    archive_spooled_file,
+    archive_stored_file,
+    delete_unarchived_file,
+    purge_expired_archives,
+)
+from .enums import ExportFormatEnum, ExportStatusEnum, OrderStatusEnum
+from .exports import EXPORT_FORMATS, OrderItemExport, get_order_export_key
+from .images import generate_renditions
+from .imports import import_products_from_file
+from .models import Order, OrderExport, Product
+from .tracking import invalidate_order_tracking
+from .utils import (
+    apply_active_discounts_to_pending_orders,
+    get_product_ids_with_scheduled_discount_changes,
+    refresh_leaderboards,
+    rollup_product_sales,
+)
+
+DISCOUNT_SCHEDULE_LAST_TICK_KEY = "orders:discount_schedule:last_tick"
+DISCOUNT_SCHEDULE_LOOKBACK = timedelta(hours=1)
+PRODUCT_SALES_ROLLUP_DAYS = 7
 
 
 @shared_task
@@ -13,10 +42,143 @@ def cancel_old_pending_order():
     time_threshold = timezone.now() - timedelta(hours=5)  # 5 hours ago
 
     with transaction.atomic():
-        count = Order.objects.filter(
+        orders = Order.objects.select_for_update().filter(
             created_at__lte=time_threshold, status=OrderStatusEnum.PENDING.name
-        ).update(
-            status=OrderStatusEnum.CANCELED.name
         )  # orders 5 hours ago
+        tracking_codes = list(orders.values_list("tracking_code", flat=True))
+        count = Order.objects.filter(tracking_code__in=tracking_codes).update(
+            status=OrderStatusEnum.CANCELED.name
+        )
+        # update() sends no post_save.
+        invalidate_order_tracking(tracking_codes)
 
     return f"{count} old pending orders were canceled."
+
+
+@shared_task
+def apply_scheduled_discounts():
+    """
+    Applies discounts that started and removes discounts that ended since
+    the last run on the items of pending orders.
+    """
+    now = timezone.now()
+    last_tick = cache.get(DISCOUNT_SCHEDULE_LAST_TICK_KEY)
+    if not last_tick or last_tick > now:
+        last_tick = now - DISCOUNT_SCHEDULE_LOOKBACK
+
+    with transaction.atomic():
+        product_ids = get_product_ids_with_scheduled_discount_changes(
+            since=last_tick, until=now
+        )
+        if product_ids:
+            apply_active_discounts_to_pending_orders(product_ids)
+
+    cache.set(DISCOUNT_SCHEDULE_LAST_TICK_KEY, now, timeout=None)
+    return f"Discounts of {len(product_ids)} products were applied to pending orders."
+
+
+@shared_task
+def rollup_daily_product_sales(days=PRODUCT_SALES_ROLLUP_DAYS):
+    """
+    Rebuilds the daily product sales of the past days and today, so orders
+    whose status changed after their day was rolled up are counted again.
+    """
+    today = timezone.localdate()
+    count = rollup_product_sales(today - timedelta(days=days), today)
+    return f"{count} daily product sales rows were rolled up."
+
+
+@shared_task
+def refresh_leaderboards_views():
+    refresh_leaderboards()
+    return "Leaderboards were refreshed."
+
+
+@shared_task
+def generate_product_image_renditions(product_id):
+    product = Product.objects.filter(pk=product_id).first()
+    if not product or not product.image:
+        return "Product has no image."
+
+    renditions = generate_renditions(product.image)
+    # Skipped if the image was replaced while rendering, the task queued by
+    # the new image renders that one.
+    Product.objects.filter(pk=product_id, image=product.image.name).update(
+        image_renditions=renditions
+    )
+    return f"Image renditions of product {product_id} were generated."
+
+
+@shared_task
+def import_products_file(file_name, user_id):
+    """
+    Imports the products of a file the browser uploaded straight to the
+    storage, the upload is kept as the archive of the file.
+    """
+    user = User.objects.get(pk=user_id)
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as file:
+        download_file_from_storage(file_name, file)
+        try:
+            report = import_products_from_file(file, user, file_name)
+        except (ValidationError, ValueError) as e:
+            delete_unarchived_file(file_name)
+            errors = " ".join(getattr(e, "messages", [str(e)]))
+            return f"Products of {file_name} were not imported: {errors}"
+
+        archive_stored_file(file, file_name, user)
+    return f"{report.row_count} products were imported from {file_name}."
+
+
+@shared_task(
+    autoretry_for=(Exception,),
+    # Retrying can't bring back a spool file that is gone.
+    dont_autoretry_for=(FileNotFoundError,),
+    retry_backoff=True,
+    max_retries=5,
+)
+def archive_import_file(path, checksum, original_name, user_id):
+    """
+    Moves a spooled import file to the storage unless the same content is
+    already archived.
+    """
+    user = User.objects.get(pk=user_id)
+    if archive_spooled_file(path, checksum, original_name, user):
+        return f"{original_name} was archived."
+    return f"{original_name} is already archived."
+
+
+@shared_task
+def purge_import_archives():
+    count = purge_expired_archives()
+    return f"{count} import archives were purged."
+
+
+@shared_task(soft_time_limit=30 * 60, time_limit=35 * 60)
+def export_orders(export_id):
+    """
+    Streams an order export to the storage, the rows go from the database
+    cursor to a multipart upload without being held in memory.
+    """
+    order_export = OrderExport.objects.get(pk=export_id)
+    export_format = ExportFormatEnum[order_export.file_format]
+    file_name = get_order_export_key(order_export)
+    exporter = OrderItemExport(order_export.since, order_export.until)
+    try:
+        upload_stream_in_storage(
+            exporter.iter_file(export_format),
+            file_name,
+            content_type=EXPORT_FORMATS[export_format][1],
+        )
+    except Exception:
+        OrderExport.objects.filter(pk=export_id).update(
+            status=ExportStatusEnum.FAILED.name, finished_at=timezone.now()
+        )
+        raise
+
+    OrderExport.objects.filter(pk=export_id).update(
+        status=ExportStatusEnum.COMPLETED.name,
+        file_name=file_name,
+        row_count=exporter.row_count,
+        finished_at=timezone.now(),
+    )
+    return f"{exporter.row_count} rows were exported to {file_name}."
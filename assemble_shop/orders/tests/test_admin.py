@@ -1,13 +1,27 @@
+from decimal import Decimal
 from http import HTTPStatus
 from io import BytesIO
 
 import openpyxl
 import pytest
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from assemble_shop.orders.enums import OrderStatusEnum
-from assemble_shop.orders.models import Order, Product, Review
+from assemble_shop.orders.enums import DirectUploadEnum, OrderStatusEnum
+from assemble_shop.orders.models import (
+    DiscountCampaign,
+    ImportArchive,
+    Order,
+    OrderExport,
+    Product,
+    Review,
+)
+from assemble_shop.orders.tasks import export_orders, import_products_file
+from assemble_shop.orders.uploads import build_upload_key
+from config.celery_app import app as celery_app
 
 
 class TestReviewAdmin:
@@ -217,6 +231,40 @@ class TestOrderViewsAdmin:
         for instance in instances:
             instance.refresh_from_db()
 
+    def test_search_by_tracking_code(self, client, user_admin, create_order):
+        """
+        Test that searching a tracking code finds only its order.
+        """
+        client.force_login(user_admin)
+        order, _other = create_order(), create_order()
+        url = reverse("admin:orders_order_changelist")
+
+        response = client.get(url, {"q": f" {order.tracking_code} "})
+
+        assert list(response.context["cl"].result_list) == [order]
+
+    def test_changelist_queries_and_per_page(
+        self, client, user_admin, create_order
+    ):
+        """
+        Test that the order change list runs the same queries whatever the
+        number of rows and takes its page size from per_page.
+        """
+        client.force_login(user_admin)
+        url = reverse("admin:orders_order_changelist")
+        create_order()
+        with CaptureQueriesContext(connection) as one_order:
+            client.get(url)
+        for _ in range(29):
+            create_order()
+
+        with CaptureQueriesContext(connection) as many_orders:
+            response = client.get(url, {"per_page": 25})
+
+        assert len(many_orders) == len(one_order)
+        assert len(response.context["cl"].result_list) == 25
+        assert response.context["cl"].paginator.count == 30
+
     def test_confirm_and_cancel_view(
         self, client_authenticated, create_order, create_product
     ):
@@ -344,9 +392,18 @@ class TestProductAdmin:
 
         return output
 
-    def test_successful_import_file(self, client, user_admin):
+    def test_successful_import_file(
+        self,
+        client,
+        user_admin,
+        s3,
+        settings,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
         """
-        Tests that a valid Excel file successfully imports products into the database.
+        Tests that a valid Excel file successfully imports products into the database
+        and is archived once in a task when it's imported twice.
         """
         client.force_login(user_admin)
 
@@ -355,18 +412,83 @@ class TestProductAdmin:
             ["Product A", 10.5, "Description A", 100],
             ["Product B", 20.0, "Description B", 50],
         ]
-        excel_file = self.create_file_excel(headers, rows)
+        excel_file = self.create_file_excel(headers, rows).read()
+        url = reverse("admin:import_file_add_view")
+        with django_capture_on_commit_callbacks() as callbacks:
+            client.post(
+                url,
+                {"file": SimpleUploadedFile("products.xlsx", excel_file)},
+                follow=True,
+            )
+
+        assert Product.objects.count() == 2
+        assert Product.objects.filter(name="Product A").exists()
+        assert Product.objects.filter(name="Product B").exists()
+
+        Product.objects.all().delete()
+        with django_capture_on_commit_callbacks() as callbacks_again:
+            client.post(
+                url,
+                {"file": SimpleUploadedFile("again.xlsx", excel_file)},
+                follow=True,
+            )
+        monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+        for callback in callbacks + callbacks_again:
+            callback()
+
+        archive = ImportArchive.objects.get()
+        uploads = s3.list_objects_v2(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            Prefix="import_data_product/",
+        )
+        assert archive.original_name == "products.xlsx"
+        assert archive.import_count == 2
+        assert [obj["Key"] for obj in uploads["Contents"]] == [
+            archive.file_name
+        ]
+
+    def test_successful_import_csv_file(self, client, user_admin):
+        """
+        Tests that a CSV file imports products like an Excel file, whatever
+        content type the browser sends for it.
+        """
+        client.force_login(user_admin)
+
         uploaded_file = SimpleUploadedFile(
-            "products.xlsx",
-            excel_file.read(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            "products.csv",
+            b"name,price,description,inventory\r\n"
+            b"Product A,10.5,Description A,100\r\n"
+            b"Product B,20.0,,50\r\n",
+            content_type="application/vnd.ms-excel",
         )
         url = reverse("admin:import_file_add_view")
         client.post(url, {"file": uploaded_file}, follow=True)
 
         assert Product.objects.count() == 2
-        assert Product.objects.filter(name="Product A").exists()
-        assert Product.objects.filter(name="Product B").exists()
+        product = Product.objects.get(name="Product B")
+        assert product.price == Decimal("20.00")
+        assert product.inventory == 50
+
+    def test_import_file_with_invalid_rows(self, client, user_admin):
+        """
+        Tests that the errors of invalid rows are shown on the form and no
+        product is imported.
+        """
+        client.force_login(user_admin)
+
+        uploaded_file = SimpleUploadedFile(
+            "products.csv",
+            b"name,price,description,inventory\r\n"
+            b"Product A,10.5,,100\r\n"
+            b"Product B,-1,,50\r\n",
+        )
+        url = reverse("admin:import_file_add_view")
+        response = client.post(url, {"file": uploaded_file})
+
+        assert Product.objects.count() == 0
+        assert "Row 3, price: Price must not be negative." in (
+            response.content.decode()
+        )
 
     def test_invalid_headers(self, client, user_admin):
         """
@@ -432,3 +554,254 @@ class TestProductAdmin:
         client.post(url, {"file": uploaded_file}, follow=True)
 
         assert Product.objects.count() == 0
+
+    def test_create_discount_campaign_action(
+        self, client, user_admin, create_product
+    ):
+        """
+        Tests that the change list action creates a discount campaign for
+        every product when all products are selected across pages.
+        """
+        client.force_login(user_admin)
+        products = [create_product(name=f"Product {i}") for i in range(3)]
+        url = reverse("admin:orders_product_changelist")
+        data = {
+            "action": "create_discount_campaign_action",
+            "index": 0,
+            "select_across": 1,
+            "_selected_action": [products[0].pk],
+        }
+
+        response = client.post(url, data)
+        assert response.status_code == HTTPStatus.OK
+        assert not DiscountCampaign.objects.exists()
+
+        data.update(
+            {
+                "apply": "yes",
+                "name": "Storewide",
+                "discount_percentage": "20",
+                "start_date": "2024-01-01T00:00",
+                "end_date": "2024-01-07T00:00",
+            }
+        )
+        response = client.post(url, data)
+        campaign = DiscountCampaign.objects.get()
+
+        assert response.status_code == HTTPStatus.FOUND
+        assert campaign.products.count() == 3
+        assert campaign.discounts.count() == 3
+
+    def test_export_csv_action(self, client, user_admin, create_product):
+        """
+        Tests that the change list action streams the selected products as
+        CSV.
+        """
+        client.force_login(user_admin)
+        products = [
+            create_product(name=name, price=Decimal("10.00"), inventory=5)
+            for name in ("Chair", "Desk", "Lamp")
+        ]
+        url = reverse("admin:orders_product_changelist")
+
+        response = client.post(
+            url,
+            {
+                "action": "export_csv_action",
+                "_selected_action": [products[0].pk, products[2].pk],
+            },
+        )
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+
+        assert response["Content-Type"] == "text/csv"
+        assert content.splitlines() == [
+            "id,name,price,description,inventory,rating,"
+            "discount_percentage,discounted_price",
+            f"{products[0].pk},Chair,10.00,,5,,,",
+            f"{products[2].pk},Lamp,10.00,,5,,,",
+        ]
+
+    def test_autocomplete_uses_search(self, client, user_admin, create_product):
+        """
+        Tests that the product autocomplete of discounts finds misspelled
+        names.
+        """
+        client.force_login(user_admin)
+        create_product(name="Oak Chair")
+        create_product(name="Chair Cushion")
+        create_product(name="Rug")
+        url = reverse("admin:autocomplete")
+
+        response = client.get(
+            url,
+            {
+                "term": "oak chiar",
+                "app_label": "orders",
+                "model_name": "discount",
+                "field_name": "product",
+            },
+        )
+
+        assert [result["text"] for result in response.json()["results"]] == [
+            "Oak Chair"
+        ]
+
+    def test_direct_upload_presigned_post(self, client, user_admin, s3):
+        """
+        Tests that the browser gets a presigned POST for a key of the user
+        and unsupported files are refused.
+        """
+        client.force_login(user_admin)
+        url = reverse("admin:orders_product_direct_upload")
+
+        response = client.post(
+            url, {"kind": "IMPORT", "file_name": "products.xlsx", "size": 100}
+        )
+        upload = response.json()
+
+        assert response.status_code == HTTPStatus.OK
+        assert upload["key"].startswith(f"import_data_product/{user_admin.pk}/")
+        assert upload["key"].endswith("/products.xlsx")
+        assert upload["fields"]["key"] == upload["key"]
+        assert "policy" in upload["fields"]
+
+        response = client.post(
+            url, {"kind": "IMPORT", "file_name": "products.exe", "size": 100}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_complete_direct_upload_import(
+        self,
+        client,
+        user_admin,
+        s3,
+        settings,
+        django_capture_on_commit_callbacks,
+    ):
+        """
+        Tests that completing an uploaded import file queues the import and
+        the task imports its products from the storage.
+        """
+        client.force_login(user_admin)
+        key = build_upload_key(
+            DirectUploadEnum.IMPORT, user_admin, "products.xlsx"
+        )
+        s3.put_object(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            Key=key,
+            Body=self.create_file_excel(
+                ["name", "price", "description", "inventory"],
+                [["Product A", 10.5, "Description A", 100]],
+            ).read(),
+        )
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = client.post(
+                reverse("admin:orders_product_complete_direct_upload"),
+                {"kind": "IMPORT", "key": key},
+            )
+        import_products_file.apply(args=[key, user_admin.pk]).get()
+
+        assert response.status_code == HTTPStatus.OK
+        assert len(callbacks) == 1
+        assert Product.objects.get().name == "Product A"
+        assert ImportArchive.objects.get().file_name == key
+
+    def test_complete_direct_upload_import_twice(
+        self, client, user_admin, s3, settings
+    ):
+        """
+        Tests that an upload is only queued once and that importing it
+        again doesn't delete its archive.
+        """
+        client.force_login(user_admin)
+        key = build_upload_key(
+            DirectUploadEnum.IMPORT, user_admin, "products.xlsx"
+        )
+        s3.put_object(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            Key=key,
+            Body=self.create_file_excel(
+                ["name", "price", "description", "inventory"],
+                [["Product A", 10.5, "Description A", 100]],
+            ).read(),
+        )
+        url = reverse("admin:orders_product_complete_direct_upload")
+
+        responses = [
+            client.post(url, {"kind": "IMPORT", "key": key}) for _ in range(2)
+        ]
+        import_products_file.apply(args=[key, user_admin.pk]).get()
+        import_products_file.apply(args=[key, user_admin.pk]).get()
+        cache.clear()
+        response = client.post(url, {"kind": "IMPORT", "key": key})
+
+        assert [r.status_code for r in responses] == [
+            HTTPStatus.OK,
+            HTTPStatus.BAD_REQUEST,
+        ]
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert Product.objects.count() == 1
+        s3.head_object(Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME, Key=key)
+
+    def test_complete_direct_upload_image(
+        self, client, user_admin, create_product, create_user, s3, settings
+    ):
+        """
+        Tests that a completed image upload replaces the product image and
+        keys of other users or missing files are refused.
+        """
+        client.force_login(user_admin)
+        product = create_product()
+        url = reverse("admin:orders_product_complete_direct_upload")
+        key = build_upload_key(DirectUploadEnum.IMAGE, user_admin, "chair.png")
+        data = {"kind": "IMAGE", "key": key, "product": product.pk}
+
+        assert client.post(url, data).status_code == HTTPStatus.BAD_REQUEST
+
+        s3.put_object(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            Key=key,
+            Body=b"png",
+        )
+        other_key = build_upload_key(
+            DirectUploadEnum.IMAGE, create_user(), "chair.png"
+        )
+        response = client.post(url, {**data, "key": other_key})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = client.post(url, data)
+        product.refresh_from_db()
+
+        assert response.status_code == HTTPStatus.OK
+        assert product.image.name == key
+
+
+class TestOrderExportAdmin:
+    def test_add_export_queues_task(
+        self,
+        client,
+        user_admin,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        """
+        Tests that adding an export queues the task that writes its file.
+        """
+        client.force_login(user_admin)
+        queued: list[int] = []
+        monkeypatch.setattr(export_orders, "delay", queued.append)
+        url = reverse("admin:orders_orderexport_add")
+        data = {
+            "since": "2024-03-01",
+            "until": "2024-03-31",
+            "file_format": "CSV",
+        }
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(url, data)
+        order_export = OrderExport.objects.get()
+
+        assert response.status_code == HTTPStatus.FOUND
+        assert order_export.created_by == user_admin
+        assert queued == [order_export.pk]
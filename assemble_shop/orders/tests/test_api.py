@@ -0,0 +1,296 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+import openpyxl
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from assemble_shop.orders.enums import OrderStatusEnum
+from assemble_shop.orders.models import Order, OrderItem
+from assemble_shop.orders.tasks import cancel_old_pending_order
+from assemble_shop.orders.utils import (
+    refresh_leaderboards,
+    rollup_product_sales,
+)
+
+
+@pytest.mark.django_db
+class TestAsyncOrdersApi:
+    @pytest.mark.parametrize(
+        "url_name, params",
+        [
+            ("info_top_selling", {}),
+            ("info_top_selling", {"days": 7}),
+            ("info_monthly_income", {}),
+            ("info_history_customers_orders", {}),
+            ("info_top_products", {}),
+        ],
+    )
+    def test_async_matches_sync(
+        self, url_name, params, client, user_admin, create_order, create_product
+    ):
+        """
+        Test that every async endpoint returns the same data as its sync
+        counterpart, from the leaderboards and from the reports.
+        """
+        product = create_product(name="Product", price=Decimal("10"), rating=4)
+        create_order(products=[product], created_by=user_admin)
+        Order.objects.update(status=OrderStatusEnum.COMPLETED.name)
+        today = timezone.localdate()
+        rollup_product_sales(today - timedelta(days=1), today)
+        refresh_leaderboards()
+
+        client.force_login(user_admin)
+        async_response = client.get(reverse(f"orders:async_{url_name}"), params)
+        response = client.get(reverse(f"orders:{url_name}"), params)
+
+        assert async_response.status_code == 200
+        assert async_response.json() == response.json()
+        assert response.json()
+
+    def test_requires_admin(self, client, user):
+        """
+        Test that permissions are checked before the async handler runs.
+        """
+        client.force_login(user)
+        response = client.get(reverse("orders:async_info_monthly_income"))
+
+        assert response.status_code == 403
+
+    def test_top_selling_rejects_unknown_status(self, client, user_admin):
+        """
+        Test that the top-selling filters are validated.
+        """
+        client.force_login(user_admin)
+        response = client.get(
+            reverse("orders:info_top_selling"), {"status": "UNKNOWN"}
+        )
+
+        assert response.status_code == 400
+        assert "status" in response.json()
+
+
+@pytest.mark.django_db
+class TestExportProductsApi:
+    def test_export_xlsx_with_discount(
+        self, client, user_admin, create_product, create_discount
+    ):
+        """
+        Test that products are streamed as an Excel file with their current
+        discount.
+        """
+        chair = create_product(name="Chair", price=Decimal("10.00"))
+        desk = create_product(name="Desk", price=Decimal("25.00"))
+        create_discount(
+            product=chair,
+            discount_percentage=Decimal("15"),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=1),
+            is_active=True,
+        )
+        client.force_login(user_admin)
+
+        response = client.get(
+            reverse("orders:export_products"),
+            {"file_format": "XLSX", "include_discount": "true"},
+        )
+        content = b"".join(response.streaming_content)
+        sheet = openpyxl.load_workbook(BytesIO(content)).active
+        rows = list(sheet.iter_rows(values_only=True))
+
+        assert response.status_code == 200
+        assert response["Content-Disposition"] == (
+            'attachment; filename="products.xlsx"'
+        )
+        assert rows[0] == (
+            "id",
+            "name",
+            "price",
+            "description",
+            "inventory",
+            "discount_percentage",
+            "discounted_price",
+        )
+        assert [
+            (row[0], row[1], row[2], row[5], row[6]) for row in rows[1:]
+        ] == [
+            (chair.pk, "Chair", 10, 15, 8.5),
+            (desk.pk, "Desk", 25, None, None),
+        ]
+
+    def test_requires_admin(self, client, user):
+        """
+        Test that only staff can export products.
+        """
+        client.force_login(user)
+        response = client.get(reverse("orders:export_products"))
+
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestExportOrdersApi:
+    def test_export_csv(self, client, user_admin, create_order, create_product):
+        """
+        Test that the completed orders of the range are streamed as CSV with
+        one row per item.
+        """
+        product = create_product(name="Chair", price=Decimal("10.00"))
+        order = create_order(
+            products=[product],
+            created_by=user_admin,
+            status=OrderStatusEnum.COMPLETED.name,
+        )
+        OrderItem.objects.update(quantity=3, discount_percentage=Decimal("10"))
+        today = timezone.localdate()
+        client.force_login(user_admin)
+
+        response = client.get(
+            reverse("orders:export_orders"),
+            {"since": today, "until": today},
+        )
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        header, row = content.splitlines()
+
+        assert response["Content-Disposition"] == (
+            f'attachment; filename="orders_{today}_{today}.csv"'
+        )
+        assert header.split(",")[:5] == [
+            "order_id",
+            "tracking_code",
+            "status",
+            "created_at",
+            "customer_email",
+        ]
+        assert row.split(",")[:3] == [
+            str(order.pk),
+            str(order.tracking_code),
+            "COMPLETED",
+        ]
+        assert row.split(",")[5:11] == [
+            str(product.pk),
+            "Chair",
+            "3",
+            "10.00",
+            "10.00",
+            "27.00",
+        ]
+
+    def test_rejects_reversed_range(self, client, user_admin):
+        """
+        Test that the end date can't be before the start date.
+        """
+        client.force_login(user_admin)
+        response = client.get(
+            reverse("orders:export_orders"),
+            {"since": "2024-03-02", "until": "2024-03-01"},
+        )
+
+        assert response.status_code == 400
+        assert "until" in response.json()
+
+
+@pytest.mark.django_db
+class TestSearchProductsApi:
+    def test_search_ranked(self, client, create_product):
+        """
+        Test that products are searched by anyone and returned best match
+        first with their rank.
+        """
+        create_product(name="Rug", description="Wool rug to put under a desk")
+        create_product(name="Standing Desk", description="Adjustable desk")
+
+        response = client.get(reverse("orders:search_products"), {"q": "desk"})
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data["count"] == 2
+        assert [product["name"] for product in data["results"]] == [
+            "Standing Desk",
+            "Rug",
+        ]
+        assert data["results"][0]["rank"] > data["results"][1]["rank"]
+
+    def test_requires_query(self, client):
+        """
+        Test that the search term is required.
+        """
+        response = client.get(reverse("orders:search_products"), {"q": "a"})
+
+        assert response.status_code == 400
+        assert "q" in response.json()
+
+
+@pytest.mark.django_db
+class TestTrackOrderApi:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def test_lookup_cached(
+        self, client, create_order, django_assert_num_queries
+    ):
+        """
+        Test that anyone with the tracking code gets the order status and
+        repeated lookups don't query the database.
+        """
+        order = create_order()
+        url = reverse("orders:track_order", args=(order.tracking_code,))
+
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        with django_assert_num_queries(0):
+            cached_response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "tracking_code": str(order.tracking_code),
+            "status": "PENDING",
+            "status_display": "Pending",
+            "created_at": order.created_at.isoformat(),
+        }
+        assert cached_response.json() == response.json()
+
+    def test_status_change_invalidates(
+        self, client, create_order, django_capture_on_commit_callbacks
+    ):
+        """
+        Test that saving a new status or canceling pending orders in bulk
+        drops the cached status.
+        """
+        confirmed, pending = create_order(), create_order()
+        urls = [
+            reverse("orders:track_order", args=(order.tracking_code,))
+            for order in (confirmed, pending)
+        ]
+        for url in urls:
+            client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            confirmed.status = OrderStatusEnum.CONFIRMED.name
+            confirmed.save(update_fields=["status"])
+            Order.objects.filter(pk=pending.pk).update(
+                created_at=timezone.now() - timedelta(hours=6)
+            )
+            cancel_old_pending_order.apply().get()
+
+        assert [client.get(url).json()["status"] for url in urls] == [
+            "CONFIRMED",
+            "CANCELED",
+        ]
+
+    def test_unknown_code(self, client):
+        """
+        Test that an unknown tracking code is not found.
+        """
+        response = client.get(
+            reverse(
+                "orders:track_order",
+                args=("00000000-0000-4000-8000-000000000000",),
+            )
+        )
+
+        assert response.status_code == 404
@@ -0,0 +1,146 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from assemble_shop.orders.models import Order, OrderItem, Product, Review
+from assemble_shop.users.models import User
+
+
+@pytest.mark.django_db
+class TestGenerateFakeDataCommand:
+    def call(self, **options):
+        defaults = {
+            "users": 5,
+            "products": 20,
+            "discounts": 5,
+            "orders": 30,
+            "reviews": 10,
+            "batch_size": 7,
+            "seed": 1,
+        }
+        defaults.update(options)
+        call_command("generate_fake_data", stdout=StringIO(), **defaults)
+
+    def test_generate_counts(self):
+        """
+        Test that the requested number of rows is generated for each model.
+        """
+        self.call()
+
+        assert User.objects.count() == 5
+        assert Product.objects.count() == 20
+        assert Order.objects.count() == 30
+        assert Review.objects.count() == 10
+        assert OrderItem.objects.exists()
+
+    def test_totals_and_ratings_computed(self):
+        """
+        Test that order totals and product ratings are filled after generation.
+        """
+        self.call()
+
+        for order in Order.objects.all():
+            expected = sum(
+                (
+                    item.quantity
+                    * (item.price or Decimal(0))
+                    * (1 - (item.discount_percentage or 0) / Decimal(100))
+                    for item in order.items.all()
+                ),
+                Decimal(0),
+            )
+            assert order.total_price == pytest.approx(expected)
+        assert not Product.objects.filter(
+            reviews__isnull=False, rating__isnull=True
+        ).exists()
+
+    def test_rerun_and_invalid_days(self):
+        """
+        Test that rerunning a seed and generating over no days are rejected
+        without creating anything.
+        """
+        self.call()
+
+        with pytest.raises(CommandError):
+            self.call()
+        with pytest.raises(CommandError):
+            self.call(seed=2, days=0)
+
+        assert Order.objects.count() == 30
+        assert Review.objects.count() == 10
+
+    def test_deterministic_with_seed(self):
+        """
+        Test that the same seed generates the same orders.
+        """
+        self.call()
+        first = list(
+            OrderItem.objects.values_list("product__name", "quantity").order_by(
+                "order__tracking_code", "product__name"
+            )
+        )
+        tracking_codes = set(Order.objects.values_list("tracking_code"))
+
+        Order.objects.all().delete()
+        self.call()
+
+        assert set(Order.objects.values_list("tracking_code")) == (
+            tracking_codes
+        )
+        assert (
+            list(
+                OrderItem.objects.values_list(
+                    "product__name", "quantity"
+                ).order_by("order__tracking_code", "product__name")
+            )
+            == first
+        )
+
+
+@pytest.mark.django_db
+class TestRecalculateOrderTotalsCommand:
+    def test_recalculate_and_audit(self, create_order, create_product):
+        """
+        Test that stale totals are recalculated over several id ranges and
+        the audit then passes.
+        """
+        product = create_product(name="Product", price=Decimal("10.05"))
+        orders = [create_order(products=[product]) for _ in range(5)]
+        Order.objects.update(total_price=Decimal("1"))
+
+        with pytest.raises(CommandError):
+            call_command(
+                "recalculate_order_totals", skip_update=True, stdout=StringIO()
+            )
+
+        call_command(
+            "recalculate_order_totals",
+            batch_size=2,
+            audit=True,
+            stdout=StringIO(),
+        )
+
+        for order in orders:
+            order.refresh_from_db()
+            assert order.total_price == Decimal("10.05")
+
+    def test_audit_items_without_price(self, create_order, create_product):
+        """
+        Test that the audit skips items without a price like the SQL
+        recalculation does.
+        """
+        products = [
+            create_product(name=name, price=Decimal("10.05"))
+            for name in ("Chair", "Desk")
+        ]
+        order = create_order(products=products)
+        OrderItem.objects.filter(order=order, product=products[1]).update(
+            price=None
+        )
+
+        call_command("recalculate_order_totals", audit=True, stdout=StringIO())
+
+        order.refresh_from_db()
+        assert order.total_price == Decimal("10.05")
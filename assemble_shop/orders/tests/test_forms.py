@@ -2,7 +2,7 @@ from decimal import Decimal
 
 from django.utils import timezone
 
-from assemble_shop.orders.forms import DiscountForm
+from assemble_shop.orders.forms import DiscountCampaignForm, DiscountForm
 
 
 class TestProductForm:
@@ -69,3 +69,31 @@ class TestProductForm:
 
         assert discount_form.is_valid()
         assert len(errors) == 0
+
+
+class TestDiscountCampaignForm:
+    def test_overlapping_discounts(
+        self, user, product_with_discount, create_product
+    ):
+        """
+        Test that the campaign form lists the products which already have an
+        overlapping discount, checked in one query for the whole product set.
+        """
+        product = create_product(name="ProductWithoutDiscount")
+        campaign_data = {
+            "created_by": user.pk,
+            "name": "Campaign",
+            "products": [product.pk, product_with_discount.pk],
+            "discount_percentage": Decimal("20"),
+            "start_date": timezone.now(),
+            "end_date": (timezone.now() + timezone.timedelta(days=3)),  # type: ignore
+        }
+        campaign_form = DiscountCampaignForm(data=campaign_data)
+        errors = campaign_form.non_field_errors()
+
+        assert not campaign_form.is_valid()
+        assert len(errors) == 1
+        assert str(errors[0]) == (
+            "These products already have an overlapping discount: "
+            f"{product_with_discount}."
+        )
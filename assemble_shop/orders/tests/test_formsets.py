@@ -1,3 +1,10 @@
+from django.forms.models import inlineformset_factory
+
+from assemble_shop.orders.forms import OrderItemForm
+from assemble_shop.orders.formsets import OrderItemFormset
+from assemble_shop.orders.models import Order, OrderItem
+
+
 class TestOrderItemFormset:
     def test_without_items_validation(self, orderitem_inline_formset):
         """
@@ -81,3 +88,65 @@ class TestOrderItemFormset:
         assert formset.is_valid()
         formset.save()
         assert order.items.count() == 2
+
+    def test_validate_in_constant_queries(
+        self, create_order, create_product, django_assert_num_queries
+    ):
+        """
+        Test that products of every line are loaded in one query and stock
+        and uniqueness are validated for all lines together.
+        """
+        products = [
+            create_product(name=f"ProductTest{i}", inventory=5)
+            for i in range(20)
+        ]
+        data = {
+            "items-TOTAL_FORMS": str(len(products)),
+            "items-INITIAL_FORMS": "0",
+        }
+        for i, product in enumerate(products):
+            data[f"items-{i}-product"] = product.pk
+            data[f"items-{i}-quantity"] = "10" if i == 0 else "1"
+        inline_formset = inlineformset_factory(
+            Order,
+            OrderItem,
+            form=OrderItemForm,
+            formset=OrderItemFormset,
+        )
+        formset = inline_formset(data=data, instance=create_order())
+        msg_error = (
+            f"Insufficient stock for the selected product {products[0]} "
+            "quantity."
+        )
+
+        with django_assert_num_queries(2):
+            assert not formset.is_valid()
+        assert msg_error in str(formset.forms[0].non_field_errors())
+        assert not any(errors for errors in formset.errors[1:])
+
+    def test_repeated_product_validation(self, create_order, create_product):
+        """
+        Test that the formset rejects a product added on two lines instead
+        of failing on the unique constraint when saved.
+        """
+        product = create_product(inventory=10)
+        data = {
+            "items-TOTAL_FORMS": "2",
+            "items-INITIAL_FORMS": "0",
+            "items-0-product": str(product.pk),
+            "items-0-quantity": "1",
+            "items-1-product": str(product.pk),
+            "items-1-quantity": "2",
+        }
+        inline_formset = inlineformset_factory(
+            Order,
+            OrderItem,
+            form=OrderItemForm,
+            formset=OrderItemFormset,
+        )
+        formset = inline_formset(data=data, instance=create_order())
+        msg_error = f"Product {product} is added more than once."
+
+        assert not formset.is_valid()
+        assert not formset.forms[0].non_field_errors()
+        assert msg_error in str(formset.forms[1].non_field_errors())
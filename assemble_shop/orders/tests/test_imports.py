@@ -0,0 +1,91 @@
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.core.exceptions import ValidationError
+
+from assemble_shop.orders.imports import (
+    ImportReport,
+    import_products_from_file,
+    iter_valid_chunks,
+)
+from assemble_shop.orders.models import Product
+
+
+def create_csv(*rows):
+    lines = ["name,price,description,inventory", *rows]
+    return BytesIO("\r\n".join(lines).encode())
+
+
+class TestImportProductsFromFile:
+    def test_coerces_columns(self, user):
+        """
+        Test that prices and inventories are coerced and empty rows and
+        cells are allowed.
+        """
+        file = create_csv("Chair,19.99,,", "", "Desk,5,Oak desk,3.0")
+
+        report = import_products_from_file(file, user, "products.csv")
+
+        assert report.row_count == 2
+        chair, desk = Product.objects.order_by("name")
+        assert (chair.price, chair.description, chair.inventory) == (
+            Decimal("19.99"),
+            "",
+            0,
+        )
+        assert (desk.price, desk.description, desk.inventory) == (
+            Decimal("5"),
+            "Oak desk",
+            3,
+        )
+
+    def test_reports_every_invalid_row(self, user, create_product):
+        """
+        Test that the errors of every row are reported with their row
+        number and no product is created.
+        """
+        create_product(name="Lamp")
+        file = create_csv(
+            "Chair,10,,1",
+            "Lamp,10,,1",
+            "Chair,10,,1",
+            "Desk,1.005,,-1",
+            f"{'x' * 226},abc,,1.5",
+        )
+
+        with pytest.raises(ValidationError) as error:
+            import_products_from_file(file, user, "products.csv")
+
+        assert error.value.messages == [
+            "Row 3, name: A product named Lamp already exists.",
+            "Row 4, name: Chair appears more than once in the file.",
+            "Row 5, price: Price must not have more than 2 decimal places.",
+            "Row 5, inventory: Inventory must be between 0 and 2147483647.",
+            "Row 6, name: Ensure this value has at most 225 characters.",
+            "Row 6, price: Enter a number.",
+            "Row 6, inventory: Enter a whole number.",
+        ]
+        assert list(Product.objects.values_list("name", flat=True)) == ["Lamp"]
+
+
+class TestIterValidChunks:
+    def test_one_query_per_chunk(self, db, django_assert_num_queries):
+        """
+        Test that names are checked against the database once per chunk and
+        duplicates are found across chunks.
+        """
+        rows = [(f"Product {i}", "1.00", "", "1") for i in range(5)]
+        rows.append(("Product 0", "1.00", "", "1"))
+        report = ImportReport()
+
+        with django_assert_num_queries(3):
+            chunks = list(iter_valid_chunks(rows, report, chunk_size=2))
+
+        assert [names for names, *_ in chunks] == [
+            ["Product 0", "Product 1"],
+            ["Product 2", "Product 3"],
+        ]
+        assert report.get_messages() == [
+            "Row 7, name: Product 0 appears more than once in the file."
+        ]
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+import pytest
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+BEFORE_EXCLUSION = ("orders", "0008_discount_discount_active_end_idx")
+EXCLUSION = ("orders", "0009_discount_discount_no_overlap_excl")
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDiscountOverlapMigration:
+    @pytest.fixture
+    def executor(self):
+        executor = MigrationExecutor(connection)
+        latest = executor.loader.graph.leaf_nodes("orders")
+        executor.migrate([BEFORE_EXCLUSION])
+        executor.loader.build_graph()
+        yield executor
+        executor.loader.build_graph()
+        executor.migrate(latest)
+
+    def test_overlapping_discounts_reported(self, executor, create_user):
+        """
+        Test that the constraint isn't added over overlapping discounts and
+        the error lists them.
+        """
+        apps = executor.loader.project_state([BEFORE_EXCLUSION]).apps
+        Product = apps.get_model("orders", "Product")
+        Discount = apps.get_model("orders", "Discount")
+        user_id = create_user().pk
+        product = Product.objects.create(
+            name="Chair", price=10, inventory=1, created_by_id=user_id
+        )
+        now = timezone.now()
+        first, second = (
+            Discount.objects.create(
+                product=product,
+                discount_percentage=10,
+                start_date=now + timedelta(days=start),
+                end_date=now + timedelta(days=start + 5),
+                created_by_id=user_id,
+            )
+            for start in (0, 3)
+        )
+
+        with pytest.raises(IntegrityError) as error:
+            executor.migrate([EXCLUSION])
+
+        assert (
+            f"product {product.pk}: discounts {first.pk} and {second.pk}"
+            in str(error.value)
+        )
+        second.start_date = now + timedelta(days=6)
+        second.save()
+        executor.loader.build_graph()
+        executor.migrate([EXCLUSION])
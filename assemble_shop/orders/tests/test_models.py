@@ -1,7 +1,11 @@
 from decimal import Decimal
 
+import pytest
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
+from assemble_shop.orders.models import Discount, Product
+
 
 class TestProductModel:
     def test_no_discount(self, create_product):
@@ -57,3 +61,89 @@ class TestProductModel:
 
         assert product.discount_now == discount_now
         assert product.discounted_price == Decimal("80")
+
+
+class TestProductSearch:
+    @pytest.fixture
+    def products(self, create_product):
+        return {
+            name: create_product(name=name, description=description)
+            for name, description in (
+                ("Oak Chair", "Solid wood dining chair"),
+                ("Desk Lamp", "Reading light"),
+                ("Standing Desk", "Adjustable desk"),
+                ("Rug", "Wool rug to put under a desk"),
+            )
+        }
+
+    def test_ranks_name_over_description(self, products):
+        """
+        Test that words in the name rank above words in the description and
+        stemmed words match.
+        """
+        results = list(Product.objects.search("desks"))
+
+        assert results == [
+            products["Standing Desk"],
+            products["Desk Lamp"],
+            products["Rug"],
+        ]
+
+    def test_partial_and_misspelled_names(self, products):
+        """
+        Test that parts of names and misspelled names match by trigrams.
+        """
+        assert list(Product.objects.search("cha")) == [products["Oak Chair"]]
+        assert list(Product.objects.search("Standng Dek")) == [
+            products["Standing Desk"]
+        ]
+
+
+class TestDiscountModel:
+    def test_overlap_rejected_by_database(self, user, product_with_discount):
+        """
+        Test that overlapping discounts can't be created even in bulk,
+        bypassing form validation.
+        """
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Discount.objects.bulk_create(
+                [
+                    Discount(
+                        created_by=user,
+                        product=product_with_discount,
+                        discount_percentage=Decimal("10"),
+                        start_date=timezone.now(),
+                        end_date=timezone.now() + timezone.timedelta(days=1),  # type: ignore
+                    )
+                ]
+            )
+
+    def test_adjacent_discounts_allowed(self, user, create_product):
+        """
+        Test that a discount may start right after another one ends.
+        """
+        product = create_product(name="P1")
+        end_date = timezone.now()
+        Discount.objects.bulk_create(
+            [
+                Discount(
+                    created_by=user,
+                    product=product,
+                    discount_percentage=Decimal("10"),
+                    start_date=end_date - timezone.timedelta(days=1),  # type: ignore
+                    end_date=end_date,
+                ),
+                Discount(
+                    created_by=user,
+                    product=product,
+                    discount_percentage=Decimal("20"),
+                    start_date=end_date + timezone.timedelta(seconds=1),  # type: ignore
+                    end_date=end_date + timezone.timedelta(days=1),  # type: ignore
+                    is_active=True,
+                ),
+            ]
+        )
+
+        assert Discount.objects.active(
+            at=end_date + timezone.timedelta(hours=1)  # type: ignore
+        ).get().discount_percentage == Decimal("20")
@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+
+from assemble_shop.orders.pricing import (
+    discounted_price,
+    line_total,
+    line_total_sql,
+    order_total,
+)
+
+
+class TestPricing:
+    def test_discounted_price_rounds_half_up(self):
+        assert discounted_price(Decimal("0.05"), Decimal("50")) == Decimal(
+            "0.03"
+        )
+        assert discounted_price(Decimal("10"), None) == Decimal("10")
+
+    def test_line_total_uses_rounded_unit_price(self):
+        assert line_total(3, Decimal("173.49"), Decimal("50.50")) == Decimal(
+            "257.64"
+        )
+
+    def test_order_total(self):
+        items = [
+            (1, Decimal("150.83"), None),
+            (2, Decimal("173.49"), Decimal("50.50")),
+        ]
+
+        assert order_total(items) == Decimal("322.59")
+        assert order_total([]) is None
+
+    def test_order_total_skips_items_without_price(self):
+        items = [(1, Decimal("150.83"), None), (2, None, None)]
+
+        assert order_total(items) == Decimal("150.83")
+        assert order_total([(2, None, Decimal("10"))]) is None
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "quantity, price, discount_percentage",
+        [
+            (1, "0.05", "50"),
+            (3, "173.49", "50.50"),
+            (7, "999.99", "99.99"),
+            (2, "10.00", None),
+        ],
+    )
+    def test_sql_matches_python(self, quantity, price, discount_percentage):
+        """
+        Test that the generated SQL expression gives the same line total.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {line_total_sql('items')} FROM (VALUES "
+                "(%s::integer, %s::numeric, %s::numeric)) "
+                "AS items (quantity, price, discount_percentage)",
+                [quantity, price, discount_percentage],
+            )
+            sql_total = cursor.fetchone()[0]
+
+        assert sql_total == line_total(quantity, price, discount_percentage)
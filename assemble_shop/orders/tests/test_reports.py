@@ -0,0 +1,127 @@
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from assemble_shop.orders.enums import OrderStatusEnum
+from assemble_shop.orders.models import Order
+from assemble_shop.orders.reports import CustomerIncomeReport, TopSellingReport
+from assemble_shop.orders.utils import get_day_start, rollup_product_sales
+
+
+@pytest.mark.django_db
+class TestCustomerIncomeReport:
+    def test_run_in_one_query(
+        self,
+        create_user,
+        create_order,
+        create_product,
+        django_assert_num_queries,
+    ):
+        """
+        Test that the total, top customers and per-customer totals of the
+        period are computed in a single query.
+        """
+        product = create_product(name="Product", price=Decimal("10"))
+        first, second, third = (create_user() for _ in range(3))
+        for customer, count in ((first, 1), (second, 3), (third, 2)):
+            for _ in range(count):
+                create_order(products=[product], created_by=customer)
+        Order.objects.update(status=OrderStatusEnum.COMPLETED.name)
+        # Pending and older orders are left out of the report.
+        create_order(products=[product], created_by=first)
+        old_order = create_order(products=[product], created_by=first)
+        Order.objects.filter(id=old_order.id).update(
+            created_at=timezone.now() - timezone.timedelta(days=60)  # type: ignore
+        )
+
+        with django_assert_num_queries(1):
+            report = CustomerIncomeReport(
+                since=timezone.now() - timezone.timedelta(days=30),  # type: ignore
+                top=2,
+            ).run()
+
+        assert report["total_income"] == Decimal("60")
+        assert [
+            (customer["email"], customer["income"])
+            for customer in report["top_customers"]
+        ] == [(second.email, Decimal("30")), (third.email, Decimal("20"))]
+        assert len(report["customer_totals"]) == 3
+
+    def test_empty_period(self, db):
+        """
+        Test that a period without orders has no total and no customers.
+        """
+        report = CustomerIncomeReport(since=timezone.now()).run()
+
+        assert report == {
+            "total_income": None,
+            "top_customers": [],
+            "customer_totals": [],
+        }
+
+
+@pytest.mark.django_db
+class TestTopSellingReport:
+    @pytest.fixture
+    def sales(self, create_order, create_product):
+        """
+        Three completed orders of the first product and a canceled one of
+        the second product yesterday, two pending orders of the second
+        product today.
+        """
+        first = create_product(name="First", price=Decimal("10"))
+        second = create_product(name="Second", price=Decimal("5"))
+        for _ in range(3):
+            create_order(
+                products=[first], status=OrderStatusEnum.COMPLETED.name
+            )
+        create_order(products=[second], status=OrderStatusEnum.CANCELED.name)
+        today = timezone.localdate()
+        Order.objects.update(
+            created_at=get_day_start(today) - timezone.timedelta(hours=12)  # type: ignore
+        )
+        rollup_product_sales(today - timezone.timedelta(days=1), today)  # type: ignore
+        for _ in range(2):
+            create_order(products=[second])
+        return first, second
+
+    def test_rollup_and_today_combined(self, sales):
+        """
+        Test that rolled up past days and today's orders are combined with
+        product names and revenue, and canceled orders are left out.
+        """
+        first, second = sales
+
+        assert TopSellingReport(days=2).run() == [
+            {
+                "product_id": first.id,
+                "name": "First",
+                "price": Decimal("10"),
+                "total_quantity": 3,
+                "revenue": Decimal("30"),
+            },
+            {
+                "product_id": second.id,
+                "name": "Second",
+                "price": Decimal("5"),
+                "total_quantity": 2,
+                "revenue": Decimal("10"),
+            },
+        ]
+
+    def test_window_and_status_filters(self, sales):
+        """
+        Test that the time window and the status filter limit the sales.
+        """
+        first, second = sales
+
+        assert [
+            row["product_id"] for row in TopSellingReport(days=1).run()
+        ] == [second.id]
+        assert [
+            row["product_id"]
+            for row in TopSellingReport(
+                statuses=[OrderStatusEnum.COMPLETED.name]
+            ).run()
+        ] == [first.id]
@@ -1,7 +1,27 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+import openpyxl
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
 from freezegun import freeze_time
+from PIL import Image
 
-from assemble_shop.orders.enums import OrderStatusEnum
-from assemble_shop.orders.tasks import cancel_old_pending_order
+from assemble_shop.orders.api.serializers import ProductSerializer
+from assemble_shop.orders.enums import ExportStatusEnum, OrderStatusEnum
+from assemble_shop.orders.models import ImportArchive, OrderExport
+from assemble_shop.orders.tasks import (
+    apply_scheduled_discounts,
+    archive_import_file,
+    cancel_old_pending_order,
+    export_orders,
+    generate_product_image_renditions,
+    purge_import_archives,
+)
 
 
 class TestOrderTasks:
@@ -20,3 +40,251 @@ class TestOrderTasks:
 
         assert old_order.status == OrderStatusEnum.CANCELED.name
         assert recent_order.status == OrderStatusEnum.PENDING.name
+
+
+class TestApplyScheduledDiscounts:
+    def test_discount_start_and_end(
+        self, create_product, create_order, create_discount
+    ):
+        """
+        Test that pending orders get a discount when it starts and lose it
+        when it ends, without saving the discount again.
+        """
+        cache.clear()
+        with freeze_time("2024-02-09 12:00:00"):
+            product = create_product(name="Product", price=Decimal("100"))
+            order = create_order(products=[product])
+            create_discount(
+                product=product,
+                discount_percentage=Decimal("10"),
+                start_date=timezone.now() + timedelta(minutes=30),
+                end_date=timezone.now() + timedelta(hours=2),
+                is_active=True,
+            )
+            apply_scheduled_discounts.apply().get()
+            order.refresh_from_db()
+            assert order.total_price == pytest.approx(Decimal("100"))
+
+        with freeze_time("2024-02-09 12:31:00"):
+            apply_scheduled_discounts.apply().get()
+            order.refresh_from_db()
+            assert order.total_price == pytest.approx(Decimal("90"))
+
+        with freeze_time("2024-02-09 14:01:00"):
+            apply_scheduled_discounts.apply().get()
+            order.refresh_from_db()
+            assert order.total_price == pytest.approx(Decimal("100"))
+
+
+class TestGenerateProductImageRenditions:
+    @pytest.fixture(autouse=True)
+    def _file_storage(self, settings):
+        settings.STORAGES = {
+            **settings.STORAGES,
+            "default": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage"
+            },
+        }
+
+    def create_image(self, name="chair.png", size=(1000, 500)):
+        output = BytesIO()
+        Image.new("RGBA", size, (200, 100, 50, 255)).save(output, "PNG")
+        return SimpleUploadedFile(name, output.getvalue())
+
+    def test_renditions_of_new_image(
+        self, create_product, django_capture_on_commit_callbacks
+    ):
+        """
+        Test that saving an image queues the task and the task stores
+        scaled down WebP and JPEG copies next to the original.
+        """
+        with django_capture_on_commit_callbacks() as callbacks:
+            product = create_product(image=self.create_image())
+        assert len(callbacks) == 1
+
+        generate_product_image_renditions.apply(args=[product.id]).get()
+
+        product.refresh_from_db()
+        assert product.image_renditions["thumbnail"] == {
+            "webp": "image_products/chair.thumbnail.webp",
+            "jpeg": "image_products/chair.thumbnail.jpeg",
+        }
+        with product.image.storage.open(
+            product.image_renditions["medium"]["jpeg"]
+        ) as file, Image.open(file) as rendition:
+            assert (rendition.format, rendition.size) == ("JPEG", (800, 400))
+        assert ProductSerializer(product).data["image_renditions"]["small"][
+            "webp"
+        ] == ("http://media.testserver/image_products/chair.small.webp")
+
+    def test_replaced_image_drops_renditions(self, create_product):
+        """
+        Test that replacing the image clears the renditions of the old one.
+        """
+        product = create_product(image=self.create_image())
+        generate_product_image_renditions.apply(args=[product.id]).get()
+        product.refresh_from_db()
+
+        product.image = self.create_image(name="table.png")
+        product.save()
+
+        product.refresh_from_db()
+        assert product.image_renditions == {}
+
+
+class TestArchiveImportFile:
+    def test_spool_kept_until_uploaded(
+        self, create_user, s3, settings, tmp_path
+    ):
+        """
+        Test that a failed upload keeps the spool file for the retry, which
+        archives it and removes the spool file.
+        """
+        user = create_user()
+        spool = tmp_path / "import.spool"
+        spool.write_bytes(b"name,price")
+        args = [str(spool), "checksum", "products.csv", user.pk]
+
+        with mock.patch(
+            "assemble_shop.orders.archives.upload_file_in_storage",
+            side_effect=Exception("Storage is down"),
+        ):
+            result = archive_import_file.apply(args=args)
+
+        assert result.failed()
+        assert spool.exists()
+        assert not ImportArchive.objects.exists()
+
+        archive_import_file.apply(args=args).get()
+
+        assert not spool.exists()
+        assert ImportArchive.objects.get().original_name == "products.csv"
+
+
+class TestPurgeImportArchives:
+    def test_expired_archives_purged(self, create_user, s3, settings):
+        """
+        Test that archives not imported within the retention period are
+        deleted from the storage and the database.
+        """
+        user = create_user()
+        now = timezone.now()
+        for name, imported_days_ago in (("old.xlsx", 91), ("recent.xlsx", 89)):
+            s3.put_object(
+                Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+                Key=name,
+                Body=name.encode(),
+            )
+            ImportArchive.objects.create(
+                checksum=name,
+                file_name=name,
+                original_name=name,
+                size=len(name),
+                created_by=user,
+                last_imported_at=now - timedelta(days=imported_days_ago),
+            )
+
+        purge_import_archives.apply().get()
+
+        uploads = s3.list_objects_v2(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME
+        )
+        assert [obj["Key"] for obj in uploads["Contents"]] == ["recent.xlsx"]
+        assert list(
+            ImportArchive.objects.values_list("file_name", flat=True)
+        ) == ["recent.xlsx"]
+
+
+class TestExportOrders:
+    def test_export_written_to_storage(
+        self, user, create_order, create_product, s3, settings
+    ):
+        """
+        Test that the completed orders of the range are written to the
+        storage as Excel with one row per item.
+        """
+        products = [
+            create_product(name=name, price=Decimal("10.00"))
+            for name in ("Chair", "Desk")
+        ]
+        with freeze_time("2024-03-10 12:00:00"):
+            order = create_order(
+                products=products,
+                created_by=user,
+                status=OrderStatusEnum.COMPLETED.name,
+            )
+            create_order(products=products, created_by=user)
+        with freeze_time("2024-04-01 12:00:00"):
+            create_order(
+                products=products,
+                created_by=user,
+                status=OrderStatusEnum.COMPLETED.name,
+            )
+        order_export = OrderExport.objects.create(
+            since="2024-03-01",
+            until="2024-03-31",
+            file_format="XLSX",
+            created_by=user,
+        )
+
+        export_orders.apply(args=[order_export.pk]).get()
+
+        order_export.refresh_from_db()
+        obj = s3.get_object(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            Key=order_export.file_name,
+        )
+        sheet = openpyxl.load_workbook(BytesIO(obj["Body"].read())).active
+        rows = list(sheet.iter_rows(min_row=2, values_only=True))
+
+        assert order_export.status == ExportStatusEnum.COMPLETED.name
+        assert order_export.row_count == 2
+        assert order_export.file_name == (
+            f"exports/orders/{order_export.pk}/orders_2024-03-01_2024-03-31.xlsx"
+        )
+        assert [(row[0], row[4], row[6]) for row in rows] == [
+            (order.pk, user.email, "Chair"),
+            (order.pk, user.email, "Desk"),
+        ]
+
+    def test_xlsx_split_into_sheets(
+        self, user, create_order, create_product, s3, settings, monkeypatch
+    ):
+        """
+        Test that Excel exports with more rows than a sheet holds continue
+        on new sheets, each with the headers.
+        """
+        monkeypatch.setattr("assemble_shop.orders.exports.XLSX_MAX_ROWS", 3)
+        products = [
+            create_product(name=f"Product {i}", price=Decimal("10.00"))
+            for i in range(5)
+        ]
+        with freeze_time("2024-03-10 12:00:00"):
+            create_order(
+                products=products,
+                created_by=user,
+                status=OrderStatusEnum.COMPLETED.name,
+            )
+        order_export = OrderExport.objects.create(
+            since="2024-03-01",
+            until="2024-03-31",
+            file_format="XLSX",
+            created_by=user,
+        )
+
+        export_orders.apply(args=[order_export.pk]).get()
+
+        order_export.refresh_from_db()
+        obj = s3.get_object(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            Key=order_export.file_name,
+        )
+        workbook = openpyxl.load_workbook(BytesIO(obj["Body"].read()))
+        sheets = [
+            list(sheet.iter_rows(values_only=True))
+            for sheet in workbook.worksheets
+        ]
+
+        assert order_export.row_count == 5
+        assert [len(rows) for rows in sheets] == [3, 3, 2]
+        assert all(rows[0][0] == "order_id" for rows in sheets)
@@ -0,0 +1,150 @@
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from assemble_shop.orders.enums import OrderStatusEnum
+from assemble_shop.orders.models import (
+    Discount,
+    DiscountCampaign,
+    Order,
+    Product,
+)
+from assemble_shop.orders.services import OrderService
+from assemble_shop.orders.utils import (
+    create_discount_campaign,
+    delete_discount_campaigns,
+    refresh_leaderboards,
+    rollup_product_sales,
+)
+
+
+class TestDiscountCampaign:
+    def create_campaign(self, user, products, **kwargs):
+        data = {
+            "name": "Storewide",
+            "discount_percentage": Decimal("20"),
+            "start_date": timezone.now() - timezone.timedelta(days=1),  # type: ignore
+            "end_date": timezone.now() + timezone.timedelta(days=1),  # type: ignore
+            "is_active": True,
+        }
+        data.update(kwargs)
+        return create_discount_campaign(products=products, user=user, **data)
+
+    def test_create_campaign_discounts(self, user, create_product):
+        """
+        Test that a campaign creates one discount for every selected product.
+        """
+        create_product(name="Product1")
+        create_product(name="Product2")
+
+        campaign = self.create_campaign(user, Product.objects.all())
+
+        assert campaign.products.count() == 2
+        assert Discount.objects.filter(campaign=campaign).count() == 2
+        assert not Discount.objects.exclude(
+            discount_percentage=Decimal("20")
+        ).exists()
+
+    def test_campaign_reprices_pending_orders(
+        self, user, create_product, create_order
+    ):
+        """
+        Test that pending orders get the campaign discount and the other
+        orders keep their prices.
+        """
+        product1 = create_product(name="Product1", price=Decimal("100"))
+        product2 = create_product(name="Product2", price=Decimal("50"))
+        pending_order = create_order(products=[product1, product2])
+        confirmed_order = create_order(
+            products=[product1], status=OrderStatusEnum.CONFIRMED.name
+        )
+        confirmed_order.refresh_from_db()
+        confirmed_total_price = confirmed_order.total_price
+
+        self.create_campaign(user, Product.objects.all())
+        pending_order.refresh_from_db()
+        confirmed_order.refresh_from_db()
+
+        assert pending_order.total_price == pytest.approx(Decimal("120"))
+        assert confirmed_order.total_price == confirmed_total_price
+
+    def test_future_campaign_does_not_reprice(
+        self, user, create_product, create_order
+    ):
+        """
+        Test that a campaign which has not started keeps pending prices.
+        """
+        product = create_product(name="Product", price=Decimal("100"))
+        order = create_order(products=[product])
+
+        self.create_campaign(
+            user,
+            Product.objects.all(),
+            start_date=timezone.now() + timezone.timedelta(days=1),  # type: ignore
+            end_date=timezone.now() + timezone.timedelta(days=2),  # type: ignore
+        )
+        order.refresh_from_db()
+
+        assert order.total_price == pytest.approx(Decimal("100"))
+
+    def test_delete_campaign_restores_prices(
+        self, user, create_product, create_order
+    ):
+        """
+        Test that deleting a campaign removes its discounts from pending orders.
+        """
+        product = create_product(name="Product", price=Decimal("100"))
+        order = create_order(products=[product])
+        self.create_campaign(user, Product.objects.all())
+
+        delete_discount_campaigns(DiscountCampaign.objects.all())
+        order.refresh_from_db()
+
+        assert not Discount.objects.exists()
+        assert order.total_price == pytest.approx(Decimal("100"))
+        assert order.items.filter(discount_percentage__isnull=True).exists()
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+    def test_refresh_leaderboards(
+        self, create_user, create_product, create_order
+    ):
+        """
+        Test that the service reads the leaderboards only after they are
+        refreshed.
+        """
+        customer = create_user()
+        best = create_product(name="Best", price=Decimal("10"), rating=5)
+        other = create_product(name="Other", price=Decimal("5"), rating=3)
+        create_product(name="Unrated")
+        for products in ([best, other], [best]):
+            create_order(
+                products=products,
+                created_by=customer,
+                status=OrderStatusEnum.COMPLETED.name,
+            )
+        Order.objects.update(total_price=Decimal("10"))
+        today = timezone.localdate()
+        rollup_product_sales(today, today)
+        order_service = OrderService()
+
+        assert not order_service.get_top_rated_products()
+        refresh_leaderboards()
+
+        assert list(order_service.get_top_rated_products()) == [best, other]
+        assert [
+            (row["name"], row["total_quantity"], row["revenue"])
+            for row in order_service.get_top_selling()
+        ] == [("Best", 2, Decimal("20")), ("Other", 1, Decimal("5"))]
+        assert order_service.get_monthly_income() == {
+            "income_path_month": Decimal("20"),
+            "top_five_customers": [
+                {
+                    "created_by_id": customer.id,
+                    "email": customer.email,
+                    "month_income": Decimal("20"),
+                }
+            ],
+        }
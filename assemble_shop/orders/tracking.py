@@ -0,0 +1,62 @@
+"""
+Order status lookups by tracking code.
+
+Lookups are served from the cache and only go to the database on a miss,
+as an exact match on order_tracking_code_idx. Saving or deleting an order
+deletes its entry once the transaction commits, the timeout bounds how long
+a lookup racing with a status change can keep the previous status.
+"""
+
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from assemble_shop.orders.enums import OrderStatusEnum
+from assemble_shop.orders.models import Order
+
+TRACKING_CACHE_TIMEOUT = 5 * 60
+# Unknown codes are cached too, so guessing codes doesn't reach the database.
+TRACKING_MISS_CACHE_TIMEOUT = 60
+
+
+def get_tracking_cache_key(tracking_code) -> str:
+    return f"orders:tracking:{tracking_code}"
+
+
+def get_order_tracking(tracking_code: uuid.UUID) -> dict | None:
+    """
+    Returns the status of the order with the tracking code, or None if
+    there is no such order.
+    """
+    key = get_tracking_cache_key(tracking_code)
+    # None is cached for unknown codes, the default tells a miss apart.
+    tracking = cache.get(key, default=False)
+    if tracking is not False:
+        return tracking
+
+    # Read from the primary, a lagging replica read right after a status
+    # change would be cached.
+    order = (
+        Order.objects.filter(tracking_code=tracking_code)
+        .values("tracking_code", "status", "created_at")
+        .first()
+    )
+    if order is None:
+        cache.set(key, None, TRACKING_MISS_CACHE_TIMEOUT)
+        return None
+
+    tracking = {
+        "tracking_code": str(order["tracking_code"]),
+        "status": order["status"],
+        "status_display": OrderStatusEnum[order["status"]].value,
+        "created_at": order["created_at"].isoformat(),
+    }
+    cache.set(key, tracking, TRACKING_CACHE_TIMEOUT)
+    return tracking
+
+
+def invalidate_order_tracking(tracking_codes):
+    keys = [get_tracking_cache_key(code) for code in tracking_codes]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
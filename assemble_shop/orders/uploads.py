@@ -0,0 +1,63 @@
+"""
+Presigned uploads that go from the browser straight to the storage bucket.
+
+The admin asks for a presigned POST, the browser uploads the file to the
+bucket and then reports the key back, which starts the processing. Keys
+start with the prefix of the upload kind and the id of the user, so a user
+can only complete their own uploads.
+"""
+
+import posixpath
+import uuid
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from assemble_shop.orders.enums import DirectUploadEnum
+from assemble_shop.utils import import_file
+
+UPLOAD_PREFIXES = {
+    DirectUploadEnum.IMPORT: "import_data_product",
+    DirectUploadEnum.IMAGE: "image_products",
+}
+MAX_UPLOAD_SIZES = {
+    # The validation of the completed upload applies the limit of the reader.
+    DirectUploadEnum.IMPORT: max(
+        reader.max_size for reader in import_file.READERS
+    ),
+    DirectUploadEnum.IMAGE: 10 * 1024 * 1024,
+}
+# Keys are only claimed for a day, they contain the day they were made for.
+IMPORT_CLAIM_TIMEOUT = 24 * 60 * 60
+
+
+def get_upload_prefix(kind: DirectUploadEnum, user) -> str:
+    return f"{UPLOAD_PREFIXES[kind]}/{user.pk}/"
+
+
+def build_upload_key(kind: DirectUploadEnum, user, file_name: str) -> str:
+    """
+    Returns a new key for an upload, the random part keeps uploads of files
+    with the same name apart.
+    """
+    file_name = get_valid_filename(posixpath.basename(file_name))
+    if kind == DirectUploadEnum.IMAGE:
+        extension = posixpath.splitext(file_name)[1].lower()
+        return f"{get_upload_prefix(kind, user)}{uuid.uuid4().hex}{extension}"
+    return (
+        f"{get_upload_prefix(kind, user)}"
+        f"{timezone.localdate():%Y-%m-%d}/{uuid.uuid4().hex}/{file_name}"
+    )
+
+
+def is_upload_key_of(kind: DirectUploadEnum, user, key: str) -> bool:
+    return key.startswith(get_upload_prefix(kind, user)) and ".." not in key
+
+
+def claim_import_upload(key: str) -> bool:
+    """
+    Marks an uploaded import file as queued, returns False if it already
+    was, so completing the same upload twice doesn't import it twice.
+    """
+    return cache.add(f"uploads:import:{key}", True, IMPORT_CLAIM_TIMEOUT)
@@ -1,10 +1,18 @@
 from django.urls import path
 
 from assemble_shop.orders.api.views import (
+    AsyncGetCustomersOrders,
+    AsyncGetMonthlyIncome,
+    AsyncGetTopRatedProducts,
+    AsyncGetTopSelling,
+    ExportOrders,
+    ExportProducts,
     GetCustomersOrders,
     GetMonthlyIncome,
     GetTopRatedProducts,
     GetTopSelling,
+    SearchProducts,
+    TrackOrder,
 )
 
 app_name = "orders"
@@ -25,4 +33,30 @@ urlpatterns = [
         GetTopRatedProducts.as_view(),
         name="info_top_products",
     ),
+    path(
+        "track/<uuid:tracking_code>/", TrackOrder.as_view(), name="track_order"
+    ),
+    path("search-products/", SearchProducts.as_view(), name="search_products"),
+    path("export-products/", ExportProducts.as_view(), name="export_products"),
+    path("export-orders/", ExportOrders.as_view(), name="export_orders"),
+    path(
+        "async/info-top-selling/",
+        AsyncGetTopSelling.as_view(),
+        name="async_info_top_selling",
+    ),
+    path(
+        "async/info-monthly-income/",
+        AsyncGetMonthlyIncome.as_view(),
+        name="async_info_monthly_income",
+    ),
+    path(
+        "async/info-history-customers-orders/",
+        AsyncGetCustomersOrders.as_view(),
+        name="async_info_history_customers_orders",
+    ),
+    path(
+        "async/info-top-rated-products/",
+        AsyncGetTopRatedProducts.as_view(),
+        name="async_info_top_products",
+    ),
 ]
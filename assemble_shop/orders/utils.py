@@ -1,9 +1,18 @@
+from datetime import date, datetime, time, timedelta
+
 from django.db import connection, transaction
 from django.db.models import FilteredRelation, Q
 from django.utils import timezone
 
 from assemble_shop.orders.enums import OrderStatusEnum
-from assemble_shop.orders.models import Order, OrderItem, Product
+from assemble_shop.orders.models import (
+    Discount,
+    DiscountCampaign,
+    Order,
+    OrderItem,
+    Product,
+)
+from assemble_shop.orders.pricing import line_total_sql
 from assemble_shop.users.models import User
 
 
@@ -16,35 +25,125 @@ def get_pending_order_ids_for_product(product: Product):
     ).values_list("id", flat=True)
 
 
+ORDER_TOTALS_UPDATE_QUERY = f"""
+WITH order_totals AS (
+    SELECT
+        orders.id AS order_id,
+        SUM({line_total_sql("items")}) AS total_price_updated
+    FROM orders
+    LEFT JOIN order_items AS items ON orders.id = items.order_id
+    WHERE {{orders_condition}}
+    GROUP BY orders.id
+)
+UPDATE orders
+SET total_price = order_totals.total_price_updated
+FROM order_totals
+WHERE orders.id = order_totals.order_id;
+"""
+
+
 def update_order_total_price(order_ids: list[int]):
     """Updates total price for orders using raw SQL with CTE."""
 
-    query = """
-    WITH order_totals AS (
-        SELECT
-            orders.id AS order_id,
-            SUM(
-                items.quantity *
-                CASE
-                    WHEN items.discount_percentage IS NOT NULL
-                    THEN items.price * (1 - items.discount_percentage / 100)
-                    ELSE items.price
-                END
-            ) AS total_price_updated
-        FROM orders
-        LEFT JOIN order_items AS items ON orders.id = items.order_id
-        WHERE orders.id = ANY(%s)
-        GROUP BY orders.id
+    query = ORDER_TOTALS_UPDATE_QUERY.format(
+        orders_condition="orders.id = ANY(%s)"
     )
-    UPDATE orders
-    SET total_price = order_totals.total_price_updated
-    FROM order_totals
-    WHERE orders.id = order_totals.order_id;
-    """
     with connection.cursor() as cursor:
         cursor.execute(query, [list(order_ids)])
 
 
+def update_order_total_price_in_range(start_id: int, end_id: int) -> int:
+    """
+    Updates total price for every order whose id is between start_id and
+    end_id (inclusive) in one set-based statement. Returns updated rows.
+    """
+
+    query = ORDER_TOTALS_UPDATE_QUERY.format(
+        orders_condition="orders.id BETWEEN %s AND %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(query, [start_id, end_id])
+        return cursor.rowcount
+
+
+def update_products_rating() -> int:
+    """
+    Recalculates the average rating of every reviewed product in one statement.
+    """
+
+    query = """
+    UPDATE products
+    SET rating = ROUND(reviews_avg.avg_rating, 2)
+    FROM (
+        SELECT product_id, AVG(rating) AS avg_rating
+        FROM reviews
+        GROUP BY product_id
+    ) AS reviews_avg
+    WHERE products.id = reviews_avg.product_id;
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(query)
+        return cursor.rowcount
+
+
+PRODUCT_SALES_ROLLUP_QUERY = f"""
+INSERT INTO product_daily_sales (product_id, day, status, quantity, revenue)
+SELECT
+    items.product_id,
+    (orders.created_at AT TIME ZONE %(time_zone)s)::date,
+    orders.status,
+    SUM(items.quantity),
+    COALESCE(SUM({line_total_sql("items")}), 0)
+FROM order_items AS items
+JOIN orders ON orders.id = items.order_id
+WHERE orders.created_at >= %(start)s AND orders.created_at < %(end)s
+GROUP BY 1, 2, 3;
+"""
+
+
+def get_day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+@transaction.atomic
+def rollup_product_sales(start_day: date, end_day: date) -> int:
+    """
+    Rebuilds the daily product sales of the days between start_day and
+    end_day (inclusive) from order items. Returns inserted rows.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM product_daily_sales WHERE day BETWEEN %s AND %s;",
+            [start_day, end_day],
+        )
+        cursor.execute(
+            PRODUCT_SALES_ROLLUP_QUERY,
+            {
+                "time_zone": timezone.get_current_timezone_name(),
+                "start": get_day_start(start_day),
+                "end": get_day_start(end_day + timedelta(days=1)),
+            },
+        )
+        return cursor.rowcount
+
+
+LEADERBOARD_VIEWS = (
+    "top_rated_products_leaderboard",
+    "top_selling_products_leaderboard",
+    "top_customers_leaderboard",
+)
+
+
+def refresh_leaderboards() -> None:
+    """
+    Refreshes the leaderboard materialized views without locking out
+    readers, which keep seeing the previous rows until a refresh commits.
+    """
+    with connection.cursor() as cursor:
+        for view in LEADERBOARD_VIEWS:
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view};")
+
+
 @transaction.atomic
 def update_orders_pending(
     product: Product, data: dict, order_ids: list[int]
@@ -60,6 +159,140 @@ def update_orders_pending(
     update_order_total_price(order_ids=order_ids)
 
 
+def apply_active_discounts_to_pending_orders(product_ids) -> None:
+    """
+    Sets the active discount percentage on pending order items of the given
+    products in one statement and recalculates totals of affected orders.
+    """
+
+    query = """
+    UPDATE order_items AS items
+    SET discount_percentage = (
+        SELECT discounts.discount_percentage
+        FROM discounts
+        WHERE discounts.product_id = items.product_id
+            AND discounts.is_active
+            AND TSTZRANGE(discounts.start_date, discounts.end_date, '[]')
+                @> %(now)s::timestamptz
+        ORDER BY discounts.start_date DESC
+        LIMIT 1
+    )
+    FROM orders
+    WHERE orders.id = items.order_id
+        AND orders.status = %(status)s
+        AND items.product_id = ANY(%(product_ids)s)
+    RETURNING items.order_id;
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            query,
+            {
+                "now": timezone.now(),
+                "status": OrderStatusEnum.PENDING.name,
+                "product_ids": list(product_ids),
+            },
+        )
+        order_ids = {row[0] for row in cursor.fetchall()}
+
+    if order_ids:
+        update_order_total_price(order_ids=list(order_ids))
+
+
+def get_product_ids_with_scheduled_discount_changes(since, until) -> set[int]:
+    """
+    Retrieves the products whose active discounts started or ended between
+    since and until, using the is_active/start_date and is_active/end_date
+    indexes.
+    """
+    return set(
+        Discount.objects.filter(
+            Q(start_date__gt=since, start_date__lte=until)
+            | Q(end_date__gte=since, end_date__lt=until),
+            is_active=True,
+        )
+        .values_list("product_id", flat=True)
+        .distinct()
+    )
+
+
+def delete_campaign_discounts(campaign_ids: list[int]) -> set[int]:
+    """
+    Deletes the discounts of the given campaigns without sending per-row
+    signals. Returns the ids of the products that lost a discount.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM discounts WHERE campaign_id = ANY(%s) "
+            "RETURNING product_id;",
+            [campaign_ids],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+@transaction.atomic
+def sync_campaign_discounts(campaign: DiscountCampaign) -> None:
+    """
+    Replaces the discounts of a campaign with one discount per campaign
+    product and reprices the pending orders of every affected product.
+    """
+    product_ids = list(campaign.products.values_list("id", flat=True))
+    affected_product_ids = delete_campaign_discounts([campaign.id])
+
+    Discount.objects.bulk_create(
+        (
+            Discount(
+                campaign=campaign,
+                product_id=product_id,
+                created_by_id=campaign.created_by_id,
+                updated_by_id=campaign.updated_by_id,
+                discount_percentage=campaign.discount_percentage,
+                start_date=campaign.start_date,
+                end_date=campaign.end_date,
+                is_active=campaign.is_active,
+            )
+            for product_id in product_ids
+        ),
+        batch_size=1000,
+    )
+    apply_active_discounts_to_pending_orders(
+        affected_product_ids.union(product_ids)
+    )
+
+
+@transaction.atomic
+def create_discount_campaign(products, user: User, **data) -> DiscountCampaign:
+    """
+    Creates a campaign for the given products and their discounts in bulk.
+    """
+    campaign = DiscountCampaign.objects.create(
+        created_by=user, updated_by=user, **data
+    )
+    through_model = DiscountCampaign.products.through
+    through_model.objects.bulk_create(
+        (
+            through_model(
+                discountcampaign_id=campaign.id, product_id=product_id
+            )
+            for product_id in products.values_list("id", flat=True)
+        ),
+        batch_size=1000,
+    )
+    sync_campaign_discounts(campaign)
+    return campaign
+
+
+@transaction.atomic
+def delete_discount_campaigns(campaigns) -> None:
+    """
+    Deletes campaigns with their discounts and reprices pending orders.
+    """
+    product_ids = delete_campaign_discounts(
+        list(campaigns.values_list("id", flat=True))
+    )
+    campaigns.delete()
+    apply_active_discounts_to_pending_orders(product_ids)
+
+
 def order_item_values(order_id: int):
     """
     Retrieves the order items for a specific order using left join with condition.
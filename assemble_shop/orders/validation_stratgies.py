@@ -5,6 +5,9 @@ from abc import ABC, abstractmethod
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+from assemble_shop.orders.models import Discount
+from assemble_shop.utils.import_file import MB, get_reader
+
 
 class ValidationStrategy(ABC):
     @abstractmethod
@@ -44,38 +47,76 @@ class ValidateStartDateBeforeEndDate(ValidationStrategy):
             )
 
 
-class ValidateNoOverlappingDiscounts(ValidationStrategy):
+class ValidateNoOverlappingCampaignDiscounts(ValidationStrategy):
     def validate(self, data):
-        product = data.get("product")
+        products = data.get("products")
         instance = data.get("instance")
+        if not products:
+            return
+
+        overlapping_discounts = Discount.objects.overlapping(
+            data.get("start_date"), data.get("end_date")
+        ).filter(product__in=products)
+        if instance.pk:
+            overlapping_discounts = overlapping_discounts.exclude(
+                campaign_id=instance.pk
+            )
+        product_names = list(
+            overlapping_discounts.values_list(
+                "product__name", flat=True
+            ).distinct()[:5]
+        )
+
+        if product_names:
+            raise ValidationError(
+                _(
+                    "These products already have an overlapping discount: "
+                    f"{', '.join(product_names)}."
+                )
+            )
+
+
+class ValidateFileFormatImport(ValidationStrategy):
+    def validate(self, data):
+        if get_reader(data.name, getattr(data, "content_type", None)) is None:
+            raise ValidationError(
+                _(
+                    "Invalid file format. Please upload an Excel (.xlsx) or "
+                    "CSV (.csv) file."
+                )
+            )
 
-        latest_discount = product.discounts.filter(
-            start_date__lte=data.get("end_date"),
-            end_date__gte=data.get("start_date"),
-        ).exclude(id=instance.id)
 
-        if latest_discount.exists():
+class ValidateFileSizeImport(ValidationStrategy):
+    def validate(self, data):
+        reader = get_reader(data.name, getattr(data, "content_type", None))
+        if reader and data.size > reader.max_size:
             raise ValidationError(
-                _("This product already has an overlapping discount.")
+                _(
+                    f"{reader.extensions[0]} files should not exceed "
+                    f"{reader.max_size // MB}MB."
+                )
             )
 
 
-class ValidateFileFormatExcel(ValidationStrategy):
+class ValidateFileFormatImage(ValidationStrategy):
     def validate(self, data):
-        content_type = (
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
         content_type_file, info = mimetypes.guess_type(data.name)
         name, file_format = os.path.splitext(data.name)
 
-        if file_format.lower() != ".xlsx" or content_type != content_type_file:
+        if file_format.lower() not in (".jpg", ".jpeg", ".png", ".webp") or (
+            not content_type_file or not content_type_file.startswith("image/")
+        ):
             raise ValidationError(
-                _("Invalid file format. Please upload an Excel file (.xlsx).")
+                _(
+                    "Invalid image format. Please upload a JPEG, PNG or WebP "
+                    "image."
+                )
             )
 
 
-class ValidateFileSizeExcel(ValidationStrategy):
+class ValidateFileSizeImage(ValidationStrategy):
     def validate(self, data):
-        max_size = 5 * 1024 * 1024
+        max_size = 10 * 1024 * 1024
         if data.size > max_size:
-            raise ValidationError(_("File size should not exceed 5MB."))
+            raise ValidationError(_("Image size should not exceed 10MB."))
@@ -0,0 +1,114 @@
+/*
+ * Uploads the files of inputs marked with data-direct-upload straight to the
+ * storage bucket with a presigned POST, then reports the key to Django.
+ * Import files are uploaded when their form is submitted, images as soon as
+ * they are picked.
+ */
+(function () {
+  'use strict';
+
+  function postForm(url, form, data) {
+    var body = new URLSearchParams(data);
+    body.append(
+      'csrfmiddlewaretoken',
+      form.querySelector('[name=csrfmiddlewaretoken]').value,
+    );
+    return fetch(url, {
+      method: 'POST',
+      body: body,
+      credentials: 'same-origin',
+    }).then(function (response) {
+      return response.json().then(function (json) {
+        if (!response.ok) {
+          throw new Error(
+            Object.values(json.errors || {})
+              .flat()
+              .join(' ') || response.statusText,
+          );
+        }
+        return json;
+      });
+    });
+  }
+
+  function directUpload(input) {
+    var file = input.files[0];
+    var kind = input.dataset.directUpload;
+    return postForm(input.dataset.directUploadUrl, input.form, {
+      kind: kind,
+      file_name: file.name,
+      size: file.size,
+    })
+      .then(function (upload) {
+        var body = new FormData();
+        Object.entries(upload.fields).forEach(function (field) {
+          body.append(field[0], field[1]);
+        });
+        body.append('file', file);
+        return fetch(upload.url, { method: 'POST', body: body }).then(
+          function (response) {
+            if (!response.ok) {
+              throw new Error('The file could not be uploaded.');
+            }
+            return upload.key;
+          },
+        );
+      })
+      .then(function (key) {
+        return postForm(input.dataset.directUploadCompleteUrl, input.form, {
+          kind: kind,
+          key: key,
+          product: input.dataset.product || '',
+        });
+      });
+  }
+
+  function showStatus(input, message, isError) {
+    var status = input.parentNode.querySelector('.direct-upload-status');
+    if (!status) {
+      status = document.createElement('p');
+      status.className = 'direct-upload-status help';
+      input.parentNode.appendChild(status);
+    }
+    status.textContent = message;
+    status.classList.toggle('errornote', Boolean(isError));
+  }
+
+  function upload(input) {
+    showStatus(input, 'Uploading ' + input.files[0].name + '…');
+    return directUpload(input).then(
+      function (result) {
+        // The file is stored, the form must not send it again.
+        input.value = '';
+        showStatus(input, 'Uploaded.');
+        if (result.redirect_url) {
+          window.location.assign(result.redirect_url);
+        }
+      },
+      function (error) {
+        showStatus(input, error.message, true);
+      },
+    );
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    document
+      .querySelectorAll('input[type=file][data-direct-upload]')
+      .forEach(function (input) {
+        if (input.dataset.directUpload === 'IMAGE') {
+          input.addEventListener('change', function () {
+            if (input.files.length) {
+              upload(input);
+            }
+          });
+          return;
+        }
+        input.form.addEventListener('submit', function (event) {
+          if (input.files.length) {
+            event.preventDefault();
+            upload(input);
+          }
+        });
+      });
+  });
+})();
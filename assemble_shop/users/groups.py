@@ -24,6 +24,14 @@ PERMISIONS = {
         "view_discount",
         "delete_discount",
         "change_discount",
+        # DiscountCampaign
+        "add_discountcampaign",
+        "view_discountcampaign",
+        "delete_discountcampaign",
+        "change_discountcampaign",
+        # OrderExport
+        "add_orderexport",
+        "view_orderexport",
     ],
     STOREMANAGER: [
         # Product
@@ -42,6 +50,11 @@ PERMISIONS = {
         "view_discount",
         "delete_discount",
         "change_discount",
+        # DiscountCampaign
+        "add_discountcampaign",
+        "view_discountcampaign",
+        "delete_discountcampaign",
+        "change_discountcampaign",
     ],
     CUSTOMER: [
         # Product
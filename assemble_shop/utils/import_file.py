@@ -0,0 +1,144 @@
+"""
+Readers of import files, picked by content type.
+
+Every reader returns the header row and an iterator over the data rows, so
+rows are parsed while they are imported instead of up front. CSV is read
+with the csv module and is by far the fastest, Excel goes through openpyxl
+and Parquet needs the optional pyarrow package.
+"""
+
+import csv
+import io
+import mimetypes
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+
+import openpyxl
+from openpyxl.utils.exceptions import InvalidFileException
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+mimetypes.add_type("application/vnd.apache.parquet", ".parquet")
+
+MB = 1024 * 1024
+
+
+class ImportReader(ABC):
+    content_types: tuple[str, ...] = ()
+    extensions: tuple[str, ...] = ()
+    max_size = 5 * MB
+
+    @abstractmethod
+    def read(self, file) -> tuple[list[str], Iterator[tuple]]:
+        pass
+
+
+class ExcelReader(ImportReader):
+    content_types = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+    extensions = (".xlsx",)
+    # openpyxl parses the XML in Python, large sheets should be CSV.
+    max_size = 5 * MB
+
+    def read(self, file):
+        try:
+            wb = openpyxl.load_workbook(file, read_only=True)
+        except InvalidFileException:
+            raise ValueError("The uploaded file is not a valid file.")
+        sheet = wb.active
+        headers = [cell.value for cell in sheet[1] if cell.value]
+
+        def rows():
+            try:
+                yield from sheet.iter_rows(
+                    min_row=2, max_col=len(headers), values_only=True
+                )
+            finally:
+                wb.close()
+
+        return headers, rows()
+
+
+class CsvReader(ImportReader):
+    content_types = ("text/csv",)
+    extensions = (".csv",)
+    max_size = 100 * MB
+
+    def read(self, file):
+        # Django's uploaded files wrap the actual file object.
+        text = io.TextIOWrapper(
+            getattr(file, "file", file), encoding="utf-8-sig", newline=""
+        )
+        reader = csv.reader(text)
+        headers = [header for header in next(reader, []) if header]
+
+        def rows():
+            try:
+                for row in reader:
+                    # Empty cells are None, like in Excel.
+                    yield tuple(value or None for value in row)
+            finally:
+                # Closing the wrapper would close the uploaded file.
+                text.detach()
+
+        return headers, rows()
+
+
+class ParquetReader(ImportReader):
+    content_types = ("application/vnd.apache.parquet",)
+    extensions = (".parquet",)
+    max_size = 100 * MB
+    batch_size = 10_000
+
+    def read(self, file):
+        parquet_file = pq.ParquetFile(getattr(file, "file", file))
+        headers = parquet_file.schema_arrow.names
+
+        def rows():
+            for batch in parquet_file.iter_batches(batch_size=self.batch_size):
+                yield from zip(
+                    *(column.to_pylist() for column in batch.columns)
+                )
+
+        return headers, rows()
+
+
+READERS: list[ImportReader] = [ExcelReader(), CsvReader()]
+if pq is not None:
+    READERS.append(ParquetReader())
+
+
+def get_reader(file_name: str, content_type: str | None = None):
+    """
+    Returns the reader of a file, or None if its type isn't supported.
+
+    The content type is guessed from the file name first, browsers don't
+    agree on the type they send for CSV files.
+    """
+    guessed_type, _encoding = mimetypes.guess_type(file_name)
+    for reader in READERS:
+        if (guessed_type or content_type) in reader.content_types:
+            return reader
+    return None
+
+
+def get_data(file, file_name: str | None = None, content_type=None):
+    """
+    Reads an import file and returns the headers and an iterator over the
+    rows.
+    """
+    file_name = file_name or file.name
+    reader = get_reader(file_name, content_type)
+    if reader is None:
+        raise ValueError("The uploaded file is not a valid file.")
+    return reader.read(file)
+
+
+def get_accepted_extensions() -> str:
+    return ",".join(
+        extension for reader in READERS for extension in reader.extensions
+    )
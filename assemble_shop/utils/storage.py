@@ -1,47 +1,220 @@
+import io
+import logging
+import os
+import threading
+from collections.abc import Iterable
+
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+_clients: dict[tuple, object] = {}
+_clients_lock = threading.Lock()
 
-def client_storage(region_name="us-east-1"):
+
+def client_storage(region_name="us-east-1", endpoint_url=None):
     """
-    Creates and returns a boto3 client for Minio storage (S3 compatible).
+    Returns the boto3 client for Minio storage (S3 compatible) of this
+    process.
+
+    Clients are thread-safe, so one client and its connection pool are
+    shared by every thread instead of building a session, resolving
+    credentials and opening new sockets on each upload.
     """
-    config = Config(
-        retries={"max_attempts": 5, "mode": "standard"},
-        signature_version="s3v4",
+    endpoint_url = endpoint_url or settings.STORAGE_MEDIA_URL
+    key = (
+        endpoint_url,
+        settings.MINIO_STORAGE_ACCESS_KEY,
+        region_name,
     )
+    client = _clients.get(key)
+    if client is not None:
+        return client
 
-    client = boto3.client(
-        "s3",
-        endpoint_url=settings.STORAGE_MEDIA_URL,
-        aws_access_key_id=settings.MINIO_STORAGE_ACCESS_KEY,
-        aws_secret_access_key=settings.MINIO_STORAGE_SECRET_KEY,
-        config=config,
-        region_name=region_name,
+    with _clients_lock:
+        if key not in _clients:
+            config = Config(
+                retries={"max_attempts": 5, "mode": "standard"},
+                signature_version="s3v4",
+                max_pool_connections=settings.STORAGE_MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,
+            )
+            # The default boto3 session isn't thread-safe.
+            _clients[key] = boto3.session.Session().client(
+                "s3",
+                endpoint_url=endpoint_url,
+                aws_access_key_id=settings.MINIO_STORAGE_ACCESS_KEY,
+                aws_secret_access_key=settings.MINIO_STORAGE_SECRET_KEY,
+                config=config,
+                region_name=region_name,
+            )
+        return _clients[key]
+
+
+def get_transfer_config():
+    """
+    Files above the multipart threshold are uploaded in parts, several
+    parts at a time.
+    """
+    return TransferConfig(
+        multipart_threshold=settings.STORAGE_MULTIPART_THRESHOLD,
+        multipart_chunksize=settings.STORAGE_MULTIPART_CHUNKSIZE,
+        max_concurrency=settings.STORAGE_MAX_CONCURRENCY,
     )
-    return client
 
 
-def upload_file_in_storage(file, file_name):
+def upload_file_in_storage(file, file_name, bucket=None, content_type=None):
     """
-    Uploads a file to Minio storage.
+    Uploads a file-like object to Minio storage, reading it in chunks.
     """
+    extra_args = {"ContentType": content_type} if content_type else None
     try:
-        client = client_storage()
-
-        client.upload_fileobj(
+        client_storage().upload_fileobj(
             file,
-            settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            bucket or settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
             file_name,
+            ExtraArgs=extra_args,
+            Config=get_transfer_config(),
         )
-        print(f"File {file_name} uploaded successfully.")
+        logger.info("File %s uploaded successfully.", file_name)
 
     except ClientError as e:
-        raise Exception(f"Failed to upload file: {str(e)}")
+        raise Exception(f"Failed to upload file: {str(e)}") from e
 
     except Exception as e:
         raise Exception(
             f"An unexpected error occurred while uploading the file: {str(e)}"
+        ) from e
+
+
+def download_file_from_storage(file_name, file, bucket=None):
+    """
+    Downloads a stored object into a writable file object, large objects
+    are fetched in parts.
+    """
+    client_storage().download_fileobj(
+        bucket or settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+        file_name,
+        file,
+        Config=get_transfer_config(),
+    )
+    file.seek(0)
+    return file
+
+
+def delete_stored_file(file_name, bucket=None):
+    client_storage().delete_object(
+        Bucket=bucket or settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+        Key=file_name,
+    )
+
+
+def get_stored_file_size(file_name, bucket=None):
+    """
+    Returns the size of a stored object, or None if it doesn't exist.
+    """
+    try:
+        head = client_storage().head_object(
+            Bucket=bucket or settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            Key=file_name,
         )
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return head["ContentLength"]
+
+
+def generate_presigned_upload(file_name, content_type, max_size, bucket=None):
+    """
+    Returns the URL and form fields of a presigned POST that lets a browser
+    upload one file of at most max_size bytes straight to the bucket.
+
+    It's signed for STORAGE_PUBLIC_MEDIA_URL, the address browsers reach
+    the storage at.
+    """
+    return client_storage(
+        endpoint_url=settings.STORAGE_PUBLIC_MEDIA_URL
+    ).generate_presigned_post(
+        Bucket=bucket or settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+        Key=file_name,
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, max_size],
+        ],
+        ExpiresIn=settings.STORAGE_PRESIGNED_EXPIRES_IN,
+    )
+
+
+def generate_presigned_download(file_name, download_name, bucket=None):
+    """
+    Returns a URL that downloads a stored object as download_name, signed
+    for STORAGE_PUBLIC_MEDIA_URL like presigned uploads.
+    """
+    return client_storage(
+        endpoint_url=settings.STORAGE_PUBLIC_MEDIA_URL
+    ).generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": bucket or settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+            "Key": file_name,
+            "ResponseContentDisposition": (
+                f'attachment; filename="{download_name}"'
+            ),
+        },
+        ExpiresIn=settings.STORAGE_PRESIGNED_EXPIRES_IN,
+    )
+
+
+class IterStream(io.RawIOBase):
+    """
+    Read-only file object over an iterable of bytes chunks.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.leftover = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.leftover:
+            try:
+                self.leftover = next(self.chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self.leftover))
+        buffer[:size] = self.leftover[:size]
+        self.leftover = self.leftover[size:]
+        return size
+
+
+def upload_stream_in_storage(
+    chunks: Iterable[bytes], file_name, bucket=None, content_type=None
+):
+    """
+    Uploads generated content to Minio storage without holding all of it
+    in memory, large streams are sent as a multipart upload.
+    """
+    upload_file_in_storage(
+        io.BufferedReader(IterStream(chunks)),
+        file_name,
+        bucket=bucket,
+        content_type=content_type,
+    )
+
+
+def _forget_clients_after_fork():
+    # Sockets of the parent's connection pool can't be shared with a child.
+    global _clients_lock
+    _clients.clear()
+    _clients_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_clients_after_fork)
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from assemble_shop.utils import import_file, storage
+
+
+class TestStorage:
+    def test_client_shared_by_threads(self, s3):
+        """
+        Test that every thread gets the same client.
+        """
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            clients = set(
+                executor.map(lambda _: storage.client_storage(), range(8))
+            )
+
+        assert clients == {s3}
+
+    def test_upload_file(self, s3, settings):
+        """
+        Test that a file is uploaded with its content type.
+        """
+        storage.upload_file_in_storage(
+            BytesIO(b"name,price"), "products.csv", content_type="text/csv"
+        )
+
+        obj = s3.get_object(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME, Key="products.csv"
+        )
+        assert obj["Body"].read() == b"name,price"
+        assert obj["ContentType"] == "text/csv"
+
+    def test_upload_stream_in_parts(self, s3, settings):
+        """
+        Test that a stream larger than the multipart threshold is uploaded
+        in parts without being read up front.
+        """
+        settings.STORAGE_MULTIPART_THRESHOLD = 5 * 1024 * 1024
+        settings.STORAGE_MULTIPART_CHUNKSIZE = 5 * 1024 * 1024
+        chunks = [bytes([i]) * 1024 * 1024 for i in range(11)]
+
+        storage.upload_stream_in_storage(iter(chunks), "export.bin")
+
+        obj = s3.get_object(
+            Bucket=settings.MINIO_STORAGE_MEDIA_BUCKET_NAME, Key="export.bin"
+        )
+        assert obj["Body"].read() == b"".join(chunks)
+        # Multipart uploads get an ETag suffixed with the number of parts.
+        assert obj["ETag"].strip('"').endswith("-3")
+
+
+class TestImportFile:
+    def test_reader_from_file_name(self):
+        """
+        Test that the file name decides the reader over the content type
+        sent by the browser.
+        """
+        reader = import_file.get_reader(
+            "products.csv", "application/vnd.ms-excel"
+        )
+
+        assert isinstance(reader, import_file.CsvReader)
+        assert import_file.get_reader("products.xls") is None
+
+    def test_read_csv_lazily(self):
+        """
+        Test that CSV rows are parsed while they are iterated and the file
+        stays open afterwards.
+        """
+        file = BytesIO(b"\xef\xbb\xbfname,price\r\nChair,10\r\nDesk,\r\n")
+
+        headers, rows = import_file.get_data(file, "products.csv")
+
+        assert headers == ["name", "price"]
+        assert next(rows) == ("Chair", "10")
+        assert list(rows) == [("Desk", None)]
+        assert not file.closed
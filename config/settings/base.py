@@ -49,7 +49,14 @@ LOCALE_PATHS = [str(BASE_DIR / "locale")]
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#databases
 DATABASES = {"default": env.db("DATABASE_URL")}
-DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Views declare their transaction policy, see assemble_shop.base.transactions.
+DATABASES["default"]["ATOMIC_REQUESTS"] = False
+# Optional read replica used by reporting and read-only API queries.
+if env("DATABASE_REPLICA_URL", default=None):
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+# https://docs.djangoproject.com/en/dev/ref/settings/#database-routers
+DATABASE_ROUTERS = ["assemble_shop.base.routers.PrimaryReplicaRouter"]
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -69,6 +76,7 @@ DJANGO_APPS = [
     "django.contrib.sites",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # "django.contrib.humanize", # Handy template tags
     "assemble_shop.admin_panel.config.CustomAdminPanelConfig",
     "django.forms",
@@ -138,6 +146,7 @@ AUTH_PASSWORD_VALIDATORS = [
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "assemble_shop.base.routers.replica_pinning_middleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -197,6 +206,34 @@ MINIO_STORAGE_MEDIA_BACKUP_BUCKET = "backup"
 MINIO_STORAGE_MEDIA_BACKUP_FORMAT = "%c/"
 MINIO_STORAGE_AUTO_CREATE_MEDIA_BUCKET = True
 STORAGE_MEDIA_URL = env.str("MINIO_STORAGE_MEDIA_URL", "http://127.0.0.1:9000")
+# Shared boto3 client of assemble_shop.utils.storage, the connection pool must
+# fit the concurrent parts of the uploads running at the same time.
+STORAGE_MAX_POOL_CONNECTIONS = env.int(
+    "STORAGE_MAX_POOL_CONNECTIONS", default=20
+)
+STORAGE_MULTIPART_THRESHOLD = env.int(
+    "STORAGE_MULTIPART_THRESHOLD", default=8 * 1024 * 1024
+)
+STORAGE_MULTIPART_CHUNKSIZE = env.int(
+    "STORAGE_MULTIPART_CHUNKSIZE", default=8 * 1024 * 1024
+)
+STORAGE_MAX_CONCURRENCY = env.int("STORAGE_MAX_CONCURRENCY", default=4)
+# Presigned uploads go from the browser straight to the bucket, they are
+# signed for the address browsers reach the storage at.
+STORAGE_PUBLIC_MEDIA_URL = env.str(
+    "MINIO_STORAGE_PUBLIC_MEDIA_URL", default=STORAGE_MEDIA_URL
+)
+STORAGE_PRESIGNED_EXPIRES_IN = env.int(
+    "STORAGE_PRESIGNED_EXPIRES_IN", default=10 * 60
+)
+# Product import files are spooled here until a task archives them, the
+# directory must be shared by the web and worker containers.
+IMPORT_ARCHIVE_SPOOL_DIR = env.str(
+    "IMPORT_ARCHIVE_SPOOL_DIR", default=str(APPS_DIR / "media" / "import_spool")
+)
+IMPORT_ARCHIVE_RETENTION_DAYS = env.int(
+    "IMPORT_ARCHIVE_RETENTION_DAYS", default=90
+)
 
 
 # TEMPLATES
@@ -265,6 +302,15 @@ ADMIN_URL = "admin/"
 ADMINS = [("""Seyed_AliReza_Salehi""", "ali.r.salehi99@gmail.com")]
 # https://docs.djangoproject.com/en/dev/ref/settings/#managers
 MANAGERS = ADMINS
+# Rows per change list page, the per_page query parameter picks one of the
+# choices instead.
+ADMIN_LIST_PER_PAGE = env.int("ADMIN_LIST_PER_PAGE", default=10)
+ADMIN_LIST_PER_PAGE_CHOICES = (10, 25, 50, 100, 200)
+# Unfiltered change lists of tables estimated above this many rows show the
+# planner's estimate instead of counting every row.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int(
+    "ADMIN_ESTIMATED_COUNT_THRESHOLD", default=100_000
+)
 
 # LOGGING
 # ------------------------------------------------------------------------------
@@ -325,7 +371,23 @@ CELERY_BEAT_SCHEDULE = {
     "cancel-old-pending-order": {
         "task": "assemble_shop.orders.tasks.cancel_old_pending_order",
         "schedule": crontab(minute=0, hour="*"),  # every hour
-    }
+    },
+    "apply-scheduled-discounts": {
+        "task": "assemble_shop.orders.tasks.apply_scheduled_discounts",
+        "schedule": crontab(minute="*"),  # every minute
+    },
+    "rollup-daily-product-sales": {
+        "task": "assemble_shop.orders.tasks.rollup_daily_product_sales",
+        "schedule": crontab(minute=5, hour="*"),  # every hour
+    },
+    "refresh-leaderboards-views": {
+        "task": "assemble_shop.orders.tasks.refresh_leaderboards_views",
+        "schedule": crontab(minute="*/5"),  # every 5 minutes
+    },
+    "purge-import-archives": {
+        "task": "assemble_shop.orders.tasks.purge_import_archives",
+        "schedule": crontab(minute=30, hour=3),  # every day
+    },
 }
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-scheduler
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"